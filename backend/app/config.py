@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Dict
+from typing import Dict, Optional
 import json
 
 class Settings(BaseSettings):
@@ -20,7 +20,94 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: str = ""
     DYNAMODB_TABLE_EXPENSES: str = "expenses"
     DYNAMODB_TABLE_USERS: str = "users"
+    DYNAMODB_TABLE_EXPENSE_PARTICIPANTS: str = "expense_participants"
+    DYNAMODB_TABLE_BALANCES: str = "balances"
     S3_BUCKET_NAME: str = ""
+    S3_ENDPOINT_URL: str = ""  # e.g. http://localhost:5000 for a local moto_server; empty = AWS
+
+    # AWS client tuning (shared by DynamoDB, S3 and Textract)
+    AWS_MAX_POOL_CONNECTIONS: int = 50  # Keep >= the number of threads calling AWS at once
+    AWS_TCP_KEEPALIVE: bool = True
+    AWS_RETRY_MODE: str = "adaptive"  # legacy, standard or adaptive
+    AWS_MAX_ATTEMPTS: int = 5
+    AWS_CONNECT_TIMEOUT: float = 2.0  # seconds
+    AWS_READ_TIMEOUT: float = 10.0  # seconds
+    TEXTRACT_READ_TIMEOUT: float = 30.0  # AnalyzeExpense can take several seconds
+    TEXTRACT_POLL_INITIAL_SECONDS: float = 1.0  # First wait for a multi-page PDF job...
+    TEXTRACT_POLL_MAX_SECONDS: float = 10.0  # ...doubling up to this
+    TEXTRACT_ASYNC_TIMEOUT_SECONDS: int = 600  # Give up on a PDF job after this
+
+    # Offline stand-ins for Textract and S3 (see app/services/aws_replay.py)
+    AWS_CLIENT_MODE: str = "live"  # live, record or replay
+    AWS_FIXTURES_DIR: str = "fixtures/aws"  # Where record writes and replay reads
+    REPLAY_TEXTRACT_LATENCY_MS: float = 1500.0
+    REPLAY_S3_LATENCY_MS: float = 50.0  # Per request...
+    REPLAY_S3_MS_PER_MB: float = 400.0  # ...plus this per MB uploaded
+    REPLAY_LATENCY_JITTER: float = 0.2  # Latencies vary by up to +/- 20%
+    REPLAY_ERROR_RATE: float = 0.0  # Fraction of calls that fail (throttling, 5xx)
+    REPLAY_SEED: Optional[int] = None  # Set for repeatable runs
+
+    # Async data access
+    DYNAMODB_ASYNC_WORKERS: int = 50  # Threads running DynamoDB calls for async routes
+
+    # Expense cache (in-process, per worker)
+    EXPENSE_CACHE_ENABLED: bool = True
+    EXPENSE_CACHE_MAX_SIZE: int = 1024  # Expenses kept in memory
+    EXPENSE_CACHE_TTL_SECONDS: float = 30.0  # How stale another worker's write can look
+
+    # Conditional GETs (ETags from per-user change versions, per worker)
+    CHANGE_VERSION_MAX_USERS: int = 10000  # Users whose version is kept in memory
+    CHANGE_VERSION_TTL_SECONDS: float = 30.0  # How long another worker's write can go unnoticed
+
+    # Logging (see app/log.py)
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""  # Per-module overrides, e.g. "app.services.textract=DEBUG,app.routes.expenses=WARNING"
+    LOG_FORMAT: str = "json"  # json (one object per line) or text
+    LOG_DEBUG_SAMPLE_RATE: float = 1.0  # Fraction of DEBUG records kept (e.g. 0.01 on a busy server)
+    LOG_QUEUE_SIZE: int = 10000  # Records waiting to be written; more are dropped, never waited on
+
+    # Response compression (brotli or gzip, picked from Accept-Encoding)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_BYTES: int = 1024  # Smaller responses go out as-is
+    COMPRESSION_GZIP_LEVEL: int = 6  # 1 (fastest) - 9 (smallest)
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0 (fastest) - 11 (smallest); 4-5 suits per-request JSON
+
+    # Receipt processing jobs
+    RECEIPT_WORKERS: int = 4  # Receipts processed at the same time (per worker process)
+    RECEIPT_PDF_WORKERS: int = 2  # PDFs processed at the same time, on their own threads (Textract jobs can take minutes)
+    RECEIPT_JOB_STORE: str = "memory"  # memory or sqlite
+    RECEIPT_JOB_DB_PATH: str = "receipt_jobs.db"  # Used when RECEIPT_JOB_STORE=sqlite
+    RECEIPT_JOB_TTL_SECONDS: int = 3600  # Finished jobs are forgotten after this
+
+    # Receipt uploads (streamed in chunks, never read whole into memory)
+    RECEIPT_MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024  # 10MB (Textract's limit for images in S3)
+    RECEIPT_MAX_PDF_UPLOAD_BYTES: int = 50 * 1024 * 1024  # Multi-page PDFs (folios, invoices)
+    RECEIPT_UPLOAD_CHUNK_BYTES: int = 256 * 1024  # Read from the request this much at a time
+    RECEIPT_SPOOL_MEMORY_BYTES: int = 1024 * 1024  # Uploads bigger than this spill to a temp file
+    S3_MULTIPART_THRESHOLD_BYTES: int = 8 * 1024 * 1024  # Use multipart upload above this
+    S3_MULTIPART_CHUNK_BYTES: int = 8 * 1024 * 1024  # Part size (S3 minimum is 5MB)
+    S3_MULTIPART_CONCURRENCY: int = 4  # Parts uploaded at once per file
+    RECEIPT_OVERLAP_UPLOAD: bool = True  # Run Textract on the bytes while S3 upload runs
+    RECEIPT_OVERLAP_MAX_BYTES: int = 5 * 1024 * 1024  # Bigger images upload first, then Textract reads S3
+    RECEIPT_BATCH_MAX_FILES: int = 50  # Files per POST /api/receipts/batch
+    RECEIPT_BATCH_CONCURRENCY: int = 4  # Files from one batch processed at once (also capped by RECEIPT_WORKERS)
+
+    # Direct-to-S3 uploads (presigned POST + object-created events)
+    RECEIPT_PRESIGN_EXPIRES_SECONDS: int = 300
+    RECEIPT_EVENTS_TOKEN: str = ""  # Shared secret the S3 event forwarder sends; empty disables the endpoint
+
+    # Receipt image preprocessing (before S3 and Textract)
+    RECEIPT_PREPROCESS_ENABLED: bool = True
+    RECEIPT_MAX_DIMENSION: int = 2000  # Longest side in pixels after downscaling
+    RECEIPT_JPEG_QUALITY: int = 85
+    RECEIPT_GRAYSCALE: bool = True
+    RECEIPT_PREPROCESS_WORKERS: int = 2  # Worker processes (image work is CPU-bound)
+
+    # Receipt extraction cache (skips S3 + Textract for identical re-uploads)
+    RECEIPT_CACHE_ENABLED: bool = True
+    RECEIPT_CACHE_BACKEND: str = "memory"  # memory or sqlite
+    RECEIPT_CACHE_DB_PATH: str = "receipt_cache.db"  # Used when RECEIPT_CACHE_BACKEND=sqlite
+    RECEIPT_CACHE_MAX_ENTRIES: int = 5000
 
     # Users (manually added friends)
     USERS: str = '[]'
@@ -0,0 +1,218 @@
+"""
+Structured Logging
+==================
+Logging for the whole app: every module logs with
+logging.getLogger(__name__), and setup_logging() (called from main.py)
+decides where it goes.
+
+Why not print()?
+- print() writes to stdout synchronously inside the request. Under load
+  that's a blocking syscall (and a lock) on every expense listing and
+  receipt upload.
+- Here a log call only puts the record on a queue; a background thread
+  does the formatting and writing. If the queue is full the record is
+  dropped and counted - logging never makes a request wait.
+
+What you get:
+- One JSON object per line (LOG_FORMAT=json) or readable text
+  (LOG_FORMAT=text), with any `extra={...}` fields included
+- LOG_LEVEL for the app, LOG_LEVELS for per-module overrides:
+      LOG_LEVELS="app.services.textract=DEBUG,app.routes.expenses=WARNING"
+- LOG_DEBUG_SAMPLE_RATE: keep only this fraction of DEBUG records, so
+  debug logging can stay on for hot paths in production. A record can
+  set its own rate with extra={'sample_rate': 1.0}.
+- request_id on every record logged while handling a request (set by
+  RequestIdMiddleware, returned to the client as X-Request-ID). Work
+  handed to other threads keeps it when submitted with in_context().
+
+Usage:
+    logger = logging.getLogger(__name__)
+    logger.info("Expense created", extra={'expense_id': expense_id})
+    logger.debug("Listed %d expenses", count)     # %-args: only formatted if kept
+"""
+
+import atexit
+import contextvars
+import logging
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+import orjson
+from app.config import settings
+
+# The request being handled on this task/thread (None outside requests)
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('request_id', default=None)
+
+# Attributes every LogRecord has - anything else came from extra={...}
+STANDARD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {
+    'message', 'asctime', 'request_id', 'sample_rate',
+}
+
+_listener = None
+_handler = None
+
+
+def in_context(function):
+    """
+    Wrap a callable to run in a copy of the current context
+
+    Thread pools don't carry contextvars over, so without this anything
+    a request hands to a worker thread would log without its request_id.
+
+    Usage:
+        executor.submit(in_context(work), *args)
+    """
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(function, *args, **kwargs)
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """'app.services.textract=DEBUG, app.routes=WARNING' -> {name: level}"""
+    levels = {}
+    for part in spec.split(','):
+        name, _, level = part.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+# =============================================================================
+# FILTERS (run on the calling thread, before the record is queued)
+# =============================================================================
+
+class RequestIdFilter(logging.Filter):
+    """Stamp the current request ID on the record"""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class DebugSamplingFilter(logging.Filter):
+    """Keep a random fraction of DEBUG records (everything above DEBUG is kept)"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        rate = getattr(record, 'sample_rate', self.rate)
+        return rate >= 1.0 or random.random() < rate
+
+
+# =============================================================================
+# HANDLER + FORMATTER
+# =============================================================================
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops (and counts) records instead of waiting on a full queue"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Resolve the message and traceback now, on the calling thread, but
+        # keep the record's extra fields for the structured formatter
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StructuredFormatter(logging.Formatter):
+    """One JSON object per record, or 'time LEVEL [request] logger: message key=value'"""
+
+    def __init__(self, json_lines=True):
+        super().__init__()
+        self.json_lines = json_lines
+
+    def format(self, record):
+        fields = {key: value for key, value in vars(record).items() if key not in STANDARD_ATTRIBUTES}
+        timestamp = datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds')
+        message = record.getMessage()
+
+        if self.json_lines:
+            entry = {
+                'time': timestamp,
+                'level': record.levelname,
+                'logger': record.name,
+                'message': message,
+                'request_id': getattr(record, 'request_id', None),
+                **fields,
+            }
+            if record.exc_text:
+                entry['exception'] = record.exc_text
+            return orjson.dumps(entry, default=str).decode()
+
+        request_id = getattr(record, 'request_id', None) or '-'
+        line = f"{timestamp} {record.levelname:<7} [{request_id}] {record.name}: {message}"
+        if fields:
+            line += ' ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_text:
+            line += '\n' + record.exc_text
+        return line
+
+
+# =============================================================================
+# SETUP
+# =============================================================================
+
+def setup_logging():
+    """
+    Route the app's loggers through the background queue (safe to call twice)
+
+    Only the 'app' logger tree is configured - uvicorn keeps its own access
+    and error logs.
+    """
+    global _listener, _handler
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler()
+    output.setFormatter(StructuredFormatter(json_lines=settings.LOG_FORMAT != 'text'))
+
+    _handler = NonBlockingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    _handler.addFilter(DebugSamplingFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+    _handler.addFilter(RequestIdFilter())
+
+    app_logger = logging.getLogger('app')
+    app_logger.setLevel(settings.LOG_LEVEL.upper())
+    app_logger.addHandler(_handler)
+    app_logger.propagate = False
+
+    for name, level in parse_levels(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Write out whatever is still queued and stop the background thread"""
+    global _listener, _handler
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+    if _handler is not None:
+        logging.getLogger('app').removeHandler(_handler)
+        _handler = None
+
+
+def stats():
+    """Queue depth and drop count for /health"""
+    if _handler is None:
+        return {'enabled': False}
+    return {'enabled': True, 'queued': _handler.queue.qsize(), 'dropped': _handler.dropped}
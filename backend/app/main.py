@@ -1,13 +1,34 @@
+from app import log
+log.setup_logging()  # Before anything else: services log while the routes import them
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import auth, expenses, receipts, friends
+from app.routes import auth, expenses, receipts, friends, balances, settle_up
 from app.config import settings
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.request_size import RequestSizeLimitMiddleware
+from app.middleware.request_id import RequestIdMiddleware
+from app.responses import FastJSONResponse
+from app.services import async_dynamodb, dynamodb_service, image_preprocess, receipt_pipeline
+from app.services.receipt_cache import receipt_cache
+from app.services.receipt_jobs import receipt_job_queue
 
 # Create FastAPI application
 app = FastAPI(
     title="Expense Splitter API",
     description="Backend API for splitting expenses among friends and family",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse  # orjson rendering for every endpoint
+)
+
+# Request size limits - innermost, so a 413 still gets CORS and request ID headers.
+# Oversized receipt uploads are turned away before FastAPI parses (and spools) them
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    limits={
+        "/api/receipts/upload": receipts.max_request_bytes(1),
+        "/api/receipts/batch": receipts.max_request_bytes(settings.RECEIPT_BATCH_MAX_FILES),
+    },
 )
 
 # CORS middleware - allows React frontend to make requests
@@ -24,13 +45,37 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Request-ID"],  # Pagination token, conditional GETs, log correlation
 )
 
+# Compression - brotli/gzip for JSON, images and other encoded bodies pass through
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_BYTES,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+# Request IDs - outermost, so every log line from a request carries its ID
+app.add_middleware(RequestIdMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(expenses.router, prefix = "/api/expenses", tags = ["Expenses"])
 app.include_router(receipts.router, prefix="/api/receipts", tags=["Receipts"])
 app.include_router(friends.router, prefix="/api/friends", tags=["Friends"])
+app.include_router(balances.router, prefix="/api/balances", tags=["Balances"])
+app.include_router(settle_up.router, prefix="/api/settle-up", tags=["Balances"])
+
+# Stop the background thread pools cleanly on shutdown
+@app.on_event("shutdown")
+def shutdown_executors():
+    async_dynamodb.shutdown()
+    receipt_job_queue.shutdown()
+    receipt_pipeline.shutdown()
+    image_preprocess.shutdown()
+    log.shutdown_logging()
 
 # Root endpoint
 @app.get("/")
@@ -47,7 +92,12 @@ def read_root():
 @app.get("/health")
 def health_check():
     """Health check endpoint for monitoring"""
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "expense_cache": dynamodb_service.expense_cache.stats(),
+        "receipt_cache": receipt_cache.stats(),
+        "logging": log.stats()
+    }
 
 # Run with: uvicorn app.main:app --reload
 if __name__ == "__main__":
@@ -0,0 +1,254 @@
+"""
+Response Compression
+====================
+Compresses responses with brotli or gzip, whichever the client prefers in
+Accept-Encoding.
+
+Why?
+- Expense lists with receipt `items` and Textract extraction results are
+  repetitive JSON that shrinks 5-10x. On a phone connection that's most
+  of the response time.
+- Starlette's GZipMiddleware only speaks gzip at a fixed level. Brotli at
+  a low quality setting compresses JSON smaller than gzip at about the
+  same CPU cost.
+
+What is left alone:
+- Responses under COMPRESSION_MIN_BYTES (headers would eat the saving)
+- Anything already encoded (a Content-Encoding header is set)
+- Already-compressed media: images, video, audio, PDFs, archives
+- Server-Sent Events, which must reach the client one event at a time
+- 204/304 responses, which have no body
+
+Streaming responses (the NDJSON batch endpoint) are compressed chunk by
+chunk with a flush after each one, so every line still arrives as soon
+as it's ready.
+
+A compressed response's strong ETag becomes weak (W/"..."): the bytes
+differ from the uncompressed ones. If-None-Match compares weakly, so
+conditional GETs keep working.
+
+brotli is optional: without the package installed only gzip is offered.
+
+Usage:
+    app.add_middleware(CompressionMiddleware, minimum_size=1024, gzip_level=6, brotli_quality=4)
+
+Benchmark: python -m benchmarks.bench_compression
+"""
+
+import zlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is in requirements.txt
+    brotli = None
+
+# Content types that are compressed already (or must not be buffered)
+SKIPPED_TYPE_PREFIXES = ('image/', 'video/', 'audio/', 'font/woff')
+SKIPPED_TYPES = {
+    'application/pdf',
+    'application/zip',
+    'application/gzip',
+    'application/x-gzip',
+    'application/x-brotli',
+    'application/octet-stream',
+    'text/event-stream',
+}
+
+
+# =============================================================================
+# COMPRESSORS
+# =============================================================================
+
+class GzipCompressor:
+    """Streaming gzip (zlib with a gzip header)"""
+
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it so the client can decode it right away"""
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b'') -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class BrotliCompressor:
+    """Streaming brotli"""
+
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b'') -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+def supported_encodings():
+    """Encodings we can produce, in order of preference when q-values tie"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the encoding to use from an Accept-Encoding header
+
+    Honours q-values ("gzip;q=1.0, br;q=0.5" picks gzip), "*" and q=0
+    ("br;q=0" rules brotli out).
+
+    Returns:
+        str: 'br' or 'gzip', or None to send the response as-is
+    """
+    weights = {}
+    for part in accept_encoding.lower().split(','):
+        name, _, params = part.strip().partition(';')
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in supported_encodings():
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+
+    return best
+
+
+def is_compressible(headers: Headers) -> bool:
+    """Is this a response worth compressing (by its headers)?"""
+    if 'content-encoding' in headers:
+        return False
+
+    content_type = headers.get('content-type', '').split(';')[0].strip().lower()
+    if content_type in SKIPPED_TYPES or content_type.startswith(SKIPPED_TYPE_PREFIXES):
+        return False
+
+    return True
+
+
+# =============================================================================
+# MIDDLEWARE
+# =============================================================================
+
+class CompressionMiddleware:
+    """ASGI middleware: brotli/gzip with negotiation, size threshold and bypasses"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def compressor(self, encoding):
+        if encoding == 'br':
+            return BrotliCompressor(self.brotli_quality)
+        return GzipCompressor(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] == 'http':
+            encoding = choose_encoding(Headers(scope=scope).get('accept-encoding', ''))
+            if encoding:
+                responder = CompressionResponder(self.app, self, encoding)
+                await responder(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
+
+
+class CompressionResponder:
+    """Compresses one response (holds back the headers until the first body chunk)"""
+
+    def __init__(self, app: ASGIApp, middleware: CompressionMiddleware, encoding: str):
+        self.app = app
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send: Send = None
+        self.start_message: Message = {}
+        self.started = False
+        self.compressor = None  # Set once we decide to compress
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def compressed_headers(self):
+        headers = MutableHeaders(raw=self.start_message['headers'])
+        headers['Content-Encoding'] = self.encoding
+        headers.add_vary_header('Accept-Encoding')
+
+        # Different bytes than the identity response, so the ETag can't stay strong
+        etag = headers.get('etag')
+        if etag and not etag.startswith('W/'):
+            headers['ETag'] = 'W/' + etag
+
+        return headers
+
+    async def send_compressed(self, message: Message) -> None:
+        if message['type'] == 'http.response.start':
+            # Wait for the first body chunk: the size decides whether we compress
+            self.start_message = message
+            return
+
+        if message['type'] != 'http.response.body':
+            await self.send(message)
+            return
+
+        if self.started:
+            if self.compressor is not None:
+                body = message.get('body', b'')
+                if message.get('more_body', False):
+                    message['body'] = self.compressor.compress(body)
+                else:
+                    message['body'] = self.compressor.finish(body)
+            await self.send(message)
+            return
+
+        # First body chunk
+        self.started = True
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+        headers = Headers(raw=self.start_message['headers'])
+
+        if self.start_message['status'] in (204, 304) or not is_compressible(headers):
+            await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        if not more_body:
+            # Whole response in one piece - only compress if it's big enough and actually shrinks
+            compressed = None
+            if len(body) >= self.middleware.minimum_size:
+                compressed = self.middleware.compressor(self.encoding).finish(body)
+
+            if compressed is not None and len(compressed) < len(body):
+                self.compressed_headers()['Content-Length'] = str(len(compressed))
+                message['body'] = compressed
+            else:
+                # Sent as-is, but a bigger body might not be - caches must key on encoding
+                MutableHeaders(raw=self.start_message['headers']).add_vary_header('Accept-Encoding')
+
+            await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        # Streaming - total size unknown, so compress and flush chunk by chunk
+        self.compressor = self.middleware.compressor(self.encoding)
+        headers = self.compressed_headers()
+        del headers['Content-Length']
+        message['body'] = self.compressor.compress(body)
+
+        await self.send(self.start_message)
+        await self.send(message)
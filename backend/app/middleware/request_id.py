@@ -0,0 +1,67 @@
+"""
+Request IDs
+===========
+Gives every request an ID, makes it available to logging (see
+app/log.py) and returns it to the client as X-Request-ID.
+
+A client (or load balancer) that already sends X-Request-ID keeps its
+own ID, so one request can be followed across services; otherwise a
+random one is generated.
+
+Also logs one DEBUG line per finished request with its status and
+duration (sampled with the rest of DEBUG - see LOG_DEBUG_SAMPLE_RATE).
+"""
+
+import logging
+import time
+import uuid
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.log import request_id_var
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'X-Request-ID'
+MAX_LENGTH = 128  # Longer (or non-printable) incoming IDs are replaced
+
+
+def incoming_request_id(scope: Scope) -> str:
+    """The client's X-Request-ID if it's sane, otherwise a new one"""
+    request_id = Headers(scope=scope).get(HEADER, '')
+    if 0 < len(request_id) <= MAX_LENGTH and request_id.isprintable():
+        return request_id
+    return uuid.uuid4().hex
+
+
+class RequestIdMiddleware:
+    """ASGI middleware: set request_id_var for the request and echo it back"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request_id = incoming_request_id(scope)
+        token = request_id_var.set(request_id)
+        started = time.perf_counter()
+        status = None
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                MutableHeaders(scope=message)[HEADER] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            logger.debug(
+                "%s %s -> %s",
+                scope['method'], scope['path'], status,
+                extra={'duration_ms': round((time.perf_counter() - started) * 1000, 1)}
+            )
+            request_id_var.reset(token)
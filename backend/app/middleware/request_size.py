@@ -0,0 +1,89 @@
+"""
+Request Size Limits
+===================
+Turns away oversized request bodies before the app reads them.
+
+Why?
+- FastAPI parses a multipart upload completely (spooling every file)
+  before the route handler runs. A size check in the handler only fires
+  after a 1GB upload has been received and written out.
+- Here the limit is checked on the way in:
+    1. A Content-Length over the limit gets a 413 straight away - the
+       body is never read
+    2. Without Content-Length (chunked uploads), bytes are counted as the
+       app reads them, and reading stops with a 413 once they cross it
+
+Limits are per path and cover the whole body (every file plus multipart
+framing). Per-file limits (photos vs PDFs) are still checked by the
+route (see app/services/upload_stream.py).
+
+Usage:
+    app.add_middleware(RequestSizeLimitMiddleware, limits={"/api/receipts/upload": 50 * 1024 * 1024})
+"""
+
+from typing import Dict
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class RequestTooLargeError(Exception):
+    """More of the body arrived than the path allows"""
+
+
+class RequestSizeLimitMiddleware:
+    """ASGI middleware: 413 for bodies over the limit set for their path"""
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        max_bytes = self.limits.get(scope['path']) if scope['type'] == 'http' else None
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get('content-length', '')
+        if content_length.isdigit() and int(content_length) > max_bytes:
+            await self.too_large(max_bytes)(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def receive_limited() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > max_bytes:
+                    exceeded = True
+                    raise RequestTooLargeError()
+            return message
+
+        async def send_unless_exceeded(message: Message) -> None:
+            nonlocal response_started
+            # Once the limit trips, whatever the app makes of the aborted
+            # body (usually a 400 from the form parser) is replaced below
+            if exceeded:
+                return
+            response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive_limited, send_unless_exceeded)
+        except RequestTooLargeError:
+            pass
+
+        if exceeded and not response_started:
+            await self.too_large(max_bytes)(scope, receive, send)
+
+    @staticmethod
+    def too_large(max_bytes: int) -> JSONResponse:
+        return JSONResponse(
+            status_code = 413,
+            content = {"detail": f"Request body exceeds {max_bytes // (1024 * 1024)}MB limit."},
+            headers = {"Connection": "close"}  # Don't read the rest of the body
+        )
@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+class CounterpartyBalance(BaseModel):
+    """Net balance with one other person"""
+    email: str
+    amount: float  # > 0: they owe you, < 0: you owe them
+
+class BalanceSummary(BaseModel):
+    """Everything the current user is owed and owes"""
+    owed_to_you: float
+    you_owe: float
+    net: float
+    balances: List[CounterpartyBalance]
+
+class Transfer(BaseModel):
+    """One payment in a settle-up plan"""
+    from_email: str = Field(..., alias="from")  # "from" is a Python keyword
+    to_email: str = Field(..., alias="to")
+    amount: float
+
+class SettleUpPlan(BaseModel):
+    """Fewest payments that clear every pending debt in the user's groups"""
+    transfers: List[Transfer]
+    your_transfers: List[Transfer]  # Just the payments the current user sends or receives
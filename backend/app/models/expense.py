@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, computed_field
 from typing import List, Optional
 from datetime import datetime
 
@@ -17,7 +17,10 @@ class ExpenseCreate(BaseModel):
     """Request to create a new expense"""
     description: str
     total_amount: float
-    participants: List[Participant]
+    # An expense is saved in one DynamoDB transaction (at most 100 writes):
+    # the expense, an index item for the creator and each participant, and
+    # a balance ledger update per participant
+    participants: List[Participant] = Field(..., max_length=49)
     receipt_url: str | None = None
     # Receipt details (optional)
     items: Optional[List[ReceiptItem]] = None
@@ -32,3 +35,36 @@ class Expense(ExpenseCreate):
     created_by_name: str  # Creator's name for display
     created_at: str
     status: str = "pending"  # pending, settled
+
+class ExpenseSummary(BaseModel):
+    """Slim expense for list views - no receipt line items or breakdown"""
+    id: str
+    user_id: str
+    created_by_name: str
+    description: str
+    total_amount: float
+    status: str = "pending"
+    created_at: str
+    receipt_url: str | None = None
+    participants: List[Participant]
+    item_count: int = 0
+
+    @computed_field
+    @property
+    def participant_count(self) -> int:
+        return len(self.participants)
+
+class BulkExpenseCreate(BaseModel):
+    """Request to create many expenses at once (e.g. a trip import)"""
+    expenses: List[ExpenseCreate] = Field(..., min_length=1, max_length=100)
+
+class BulkExpenseDelete(BaseModel):
+    """Request to delete many expenses at once"""
+    ids: List[str] = Field(..., min_length=1, max_length=100)
+
+class BulkDeleteResult(BaseModel):
+    """Outcome of a bulk delete, per expense ID"""
+    deleted: List[str]
+    not_found: List[str]
+    forbidden: List[str]
+    conflict: List[str] = []  # Kept changing while we tried - safe to retry
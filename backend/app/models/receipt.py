@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+class ReceiptJob(BaseModel):
+    """Status of a background receipt processing job"""
+    id: str
+    filename: Optional[str] = None
+    status: str  # queued, processing, done, failed
+    stage: str  # queued, preprocessing, uploading, analyzing, done, failed
+    result: Optional[Dict] = None  # Extracted data once done
+    error: Optional[str] = None
+    created_at: str
+    updated_at: str
+
+
+class PresignRequest(BaseModel):
+    """Ask for a direct-to-S3 upload"""
+    filename: str
+    content_type: str  # image/jpeg, image/jpg or image/png
+
+
+class PresignedUpload(BaseModel):
+    """Where and how to POST the file straight to S3"""
+    url: str
+    fields: Dict[str, str]  # Form fields to send before the file
+    key: str  # Look up the result with GET /api/receipts/by-key?key=...
+    expires_in: int  # Seconds until the upload form stops working
+
+
+class ReceiptEventResult(BaseModel):
+    """Jobs started by an S3 object-created event"""
+    job_ids: List[str]
@@ -0,0 +1,21 @@
+# BALANCES API
+# "Who owes whom" for the current user, read straight from the balance ledger.
+# The ledger is kept up to date whenever expenses are created, settled or deleted.
+
+from fastapi import APIRouter, Depends
+from app.models.balance import BalanceSummary
+from app.middleware.auth import get_current_user
+from app.services import async_dynamodb, balance_ledger
+
+router = APIRouter()
+
+
+@router.get("/", response_model = BalanceSummary)
+async def get_balances(user = Depends(get_current_user)):
+    """
+    Get the current user's net balance with everyone they share expenses with
+
+    Reads the precomputed ledger (no expense scans), so the cost depends
+    only on how many people the user shares expenses with.
+    """
+    return await async_dynamodb.run(balance_ledger.get_balances, user["email"])
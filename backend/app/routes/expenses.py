@@ -1,16 +1,21 @@
 
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from typing import List, Literal, Optional, Union
 from datetime import datetime
-from decimal import Decimal
+import asyncio
+import logging
 import uuid
 from pydantic import BaseModel
-from app.models.expense import Expense, ExpenseCreate
+from app.models.expense import Expense, ExpenseCreate, ExpenseSummary, BulkExpenseCreate, BulkExpenseDelete, BulkDeleteResult
 from app.middleware.auth import get_current_user
-from app.services import dynamodb_service
+from app.responses import REVALIDATE, FastJSONResponse, etag_matches, make_etag, not_modified
+from app.services import async_dynamodb, dynamodb_service
+from app.services.change_versions import change_versions
+from app.services.expense_codec import expense_codec
 
 # Create a router (group of realted endpoints)
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # Using DynamoDB for persistent storage!
 # Data now persists across server restarts
@@ -19,23 +24,9 @@ router = APIRouter()
 class StatusUpdate(BaseModel):
     status: str
 
-# Helper function to convert all floats to Decimal (DynamoDB requirement)
-def convert_floats_to_decimal(obj):
-    """Recursively convert all float values to Decimal in nested structures"""
-    if isinstance(obj, list):
-        return [convert_floats_to_decimal(item) for item in obj]
-    elif isinstance(obj, dict):
-        return {key: convert_floats_to_decimal(value) for key, value in obj.items()}
-    elif isinstance(obj, float):
-        return Decimal(str(obj))
-    else:
-        return obj
-
-# CREATE EXPENSE ENDPOINT
-
-@router.post("/", response_model = Expense)
-def create_expense(expense: ExpenseCreate, user = Depends(get_current_user)):
-    """Create a new expense"""
+# Helper function to turn a create request into the item we store
+def build_expense_data(expense: ExpenseCreate, user):
+    """Build a new DynamoDB expense item owned by the current user"""
     # Generate a unique ID
     expense_id = str(uuid.uuid4())
 
@@ -60,150 +51,231 @@ def create_expense(expense: ExpenseCreate, user = Depends(get_current_user)):
         "subtotal": expense.subtotal
     }
 
-    # Convert ALL floats to Decimal (DynamoDB requirement)
-    expense_data = convert_floats_to_decimal(expense_data)
+    # Money fields -> cent Decimals (DynamoDB won't take floats)
+    return expense_codec.encode(expense_data)
+
+# Helper function: can this user view or delete the expense?
+def is_involved(expense, email):
+    """True if the user created the expense or is one of its participants"""
+    return expense["user_id"] == email or any(
+        participant["email"] == email
+        for participant in expense["participants"]
+    )
+
+# CREATE EXPENSE ENDPOINT
+
+@router.post("/", response_model = Expense)
+async def create_expense(expense: ExpenseCreate, user = Depends(get_current_user)):
+    """Create a new expense"""
+    expense_data = build_expense_data(expense, user)
 
     # Save to DynamoDB
-    dynamodb_service.create_expense(expense_data)
+    await async_dynamodb.create_expense(expense_data)
 
-    # DEBUG: Log what was saved
-    print(f"\n🔹 EXPENSE CREATED by {user['email']}")
-    print(f"🔹 Participants: {[p['email'] for p in expense_data['participants']]}")
-    print(f"🔹 Saved to DynamoDB\n")
+    logger.info(
+        "Expense created",
+        extra={'expense_id': expense_data['id'], 'user_id': user['email'], 'participants': len(expense_data['participants'])}
+    )
 
     return expense_data
 
 
-# GET ALL EXPENSES ENDPOINT
-@router.get("/", response_model = List[Expense])
-def get_expenses(user = Depends(get_current_user)):
+# BULK CREATE ENDPOINT
+@router.post("/bulk", response_model = List[Expense])
+async def create_expenses_bulk(bulk: BulkExpenseCreate, user = Depends(get_current_user)):
+    """
+    Create up to 100 expenses in one request (e.g. importing a trip)
+
+    Saved in a few DynamoDB transactions (many expenses each) instead of
+    one HTTP request and one write per expense.
+    """
+    expenses_data = [build_expense_data(expense, user) for expense in bulk.expenses]
 
-    """Get all expenses for the current user"""
+    await async_dynamodb.batch_create_expenses(expenses_data)
 
-    # Get expenses created by this user from DynamoDB
-    current_user_email = user["email"]
+    logger.info("Expenses created in bulk", extra={'count': len(expenses_data), 'user_id': user['email']})
+
+    return expenses_data
+
+
+# BULK DELETE ENDPOINT
+@router.post("/bulk-delete", response_model = BulkDeleteResult)
+async def delete_expenses_bulk(bulk: BulkExpenseDelete, user = Depends(get_current_user)):
+    """
+    Delete up to 100 expenses in one request
 
-    print(f"\n[DEBUG] Getting expenses for: {current_user_email}")
+    Same rule as single delete: anyone involved can delete. IDs the user
+    isn't involved in are reported as forbidden and left untouched.
 
-    # Get expenses where user is the creator
-    created_expenses = dynamodb_service.get_user_expenses(current_user_email)
+    Each expense is a conditional delete of its own, so the permission
+    check happens in DynamoDB with the write, as it does for a single
+    delete. One BatchGetItem up front saves a lookup per expense.
+    """
+    expense_ids = list(dict.fromkeys(bulk.ids))
+    expenses = {expense["id"]: expense for expense in await async_dynamodb.batch_get_expenses(expense_ids)}
+
+    async def delete_one(expense_id):
+        if expense_id not in expenses:
+            return "not_found"
+        try:
+            await async_dynamodb.delete_expense(expense_id, user["email"], expenses[expense_id])
+        except dynamodb_service.ExpenseNotFoundError:
+            return "not_found"
+        except dynamodb_service.ExpenseForbiddenError:
+            return "forbidden"
+        except dynamodb_service.ExpenseConflictError:
+            return "conflict"
+        return "deleted"
+
+    outcomes = await asyncio.gather(*(delete_one(expense_id) for expense_id in expense_ids))
+
+    result = BulkDeleteResult(deleted = [], not_found = [], forbidden = [], conflict = [])
+    for expense_id, outcome in zip(expense_ids, outcomes):
+        getattr(result, outcome).append(expense_id)
+    return result
 
-    # Also need to get expenses where user is a participant
-    # For now, get all expenses and filter (we'll optimize this later with another index)
-    all_expenses = dynamodb_service.get_all_expenses()
 
-    user_expenses = []
+# GET ALL EXPENSES ENDPOINT
+@router.get("/", response_model = Union[List[ExpenseSummary], List[Expense]])
+async def get_expenses(
+    limit: Optional[int] = Query(None, ge = 1, le = 100, description = "Page size (omit to get everything)"),
+    cursor: Optional[str] = Query(None, description = "X-Next-Cursor value from the previous page"),
+    view: Literal["summary", "full"] = Query("summary", description = "summary skips receipt line items; full returns whole expenses"),
+    if_none_match: Optional[str] = Header(None),
+    user = Depends(get_current_user)
+):
 
-    # Add expenses created by user
-    user_expenses.extend(created_expenses)
+    """
+    Get all expenses for the current user, newest first
 
-    # Add expenses where user is a participant (but not creator)
-    for expense in all_expenses:
-        # Skip if already added (user is creator)
-        if expense["user_id"] == current_user_email:
-            continue
+    By default returns slim summaries (no receipt `items`, `tax`, `tip` or
+    `subtotal` - use GET /api/expenses/{id} for those). Pass `view=full`
+    to get whole expenses.
 
-        # Check if user is a participant
-        is_participant = any(
-            participant["email"] == current_user_email
-            for participant in expense["participants"]
-        )
-        if is_participant:
-            print(f"[DEBUG]   ✅ User is PARTICIPANT - including expense")
-            user_expenses.append(expense)
+    Pass `limit` to get one page at a time. When more pages exist, the
+    response carries an `X-Next-Cursor` header - send it back as `cursor`
+    to get the next page.
 
-    print(f"[DEBUG] Found {len(user_expenses)} expenses")
+    Responses carry an `ETag`. Send it back as `If-None-Match` and you get
+    a 304 with no body until one of your expenses changes.
+    """
 
-    return user_expenses
+    current_user_email = user["email"]
+    summary = view == "summary"
+
+    # The ETag comes from the user's change version, not the body, so an
+    # unchanged poll is answered before touching DynamoDB. Read the version
+    # BEFORE querying: a write that lands mid-query bumps it, and the next
+    # poll refetches
+    etag = make_etag(change_versions.current(current_user_email), view, limit, cursor)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    headers = {"ETag": etag, "Cache-Control": REVALIDATE}
+
+    # One query on the participant index covers expenses the user created
+    # AND expenses they were added to as a participant
+    if limit is None:
+        user_expenses = await async_dynamodb.get_participant_expenses(current_user_email, summary)
+    else:
+        try:
+            user_expenses, next_cursor = await async_dynamodb.get_participant_expenses_page(current_user_email, limit, cursor, summary)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+
+    # Every dashboard poll lands here - DEBUG, and sampled (LOG_DEBUG_SAMPLE_RATE)
+    logger.debug("Listed %d expenses", len(user_expenses), extra={'user_id': current_user_email, 'view': view})
+
+    # Both shapes would pass either model, so we validate against the one
+    # the client asked for ourselves instead of leaving it to response_model.
+    # Each item is validated once here and dumped once by the orjson
+    # renderer - no jsonable_encoder pass in between
+    model = ExpenseSummary if summary else Expense
+    return FastJSONResponse(
+        content = [model.model_validate(expense) for expense in user_expenses],
+        headers = headers
+    )
 
 
 # GET ONE EXPENSE ENDPOINT
 @router.get("/{expense_id}", response_model = Expense)
 
-def get_expense(expense_id: str, user = Depends(get_current_user)):
+async def get_expense(expense_id: str, user = Depends(get_current_user)):
 
-    """Get a single expense by ID"""
+    """Get a single expense by ID - anyone involved can view it"""
 
     # Get expense from DynamoDB
-    expense = dynamodb_service.get_expense_by_id(expense_id)
+    expense = await async_dynamodb.get_expense_by_id(expense_id)
 
     if not expense:
         raise HTTPException(status_code=404, detail="Expense not found")
 
-    if expense["user_id"] != user["email"]:
+    if not is_involved(expense, user["email"]):
         raise HTTPException(status_code=403, detail="Not authorized to view this expense")
 
-    return expense
+    # Plain floats for the response model instead of a generic Decimal walk
+    return expense_codec.decode(expense)
+
+
+# Helper function: turn a failed conditional write into the right HTTP error
+def raise_for_write_error(error):
+    """Map dynamodb_service conditional-write errors to 404/403/409"""
+    if isinstance(error, dynamodb_service.ExpenseNotFoundError):
+        raise HTTPException(status_code=404, detail=str(error))
+    if isinstance(error, dynamodb_service.ExpenseForbiddenError):
+        raise HTTPException(status_code=403, detail=str(error))
+    if isinstance(error, dynamodb_service.ExpenseConflictError):
+        raise HTTPException(status_code=409, detail=str(error))
+    raise error
 
 
 # UPDATE EXPENSE STATUS ENDPOINT
-@router.patch("/{expense_id}/status")
-def update_expense_status(expense_id: str, status_update: StatusUpdate, user = Depends(get_current_user)):
+@router.patch("/{expense_id}/status", response_model = Expense)
+async def update_expense_status(expense_id: str, status_update: StatusUpdate, user = Depends(get_current_user)):
     """
     Update expense status (e.g., 'pending' -> 'settled')
 
-    Only the creator can mark as settled
-    Participants can mark their own payment status (future feature)
-    """
-    # Get the expense to verify ownership
-    expense = dynamodb_service.get_expense_by_id(expense_id)
-
-    if not expense:
-        raise HTTPException(status_code=404, detail="Expense not found")
+    - Only the creator can mark as settled
+    - Only participants can mark as pending_review
+    - Anyone involved can change back to pending
 
+    These rules are checked by DynamoDB in the same call as the update
+    (see dynamodb_service.STATUS_TRANSITIONS): 404 if the expense is gone,
+    403 if the user may not set this status, 409 if the current status
+    can't move to the new one.
+    """
     # Validate status value
-    valid_statuses = ["pending", "pending_review", "settled"]
+    valid_statuses = list(dynamodb_service.STATUS_TRANSITIONS)
     if status_update.status not in valid_statuses:
         raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {valid_statuses}")
 
-    # Authorization checks:
-    # - Only creator can mark as settled
-    # - Only participants can mark as pending_review
-    # - Anyone can change back to pending
-    if status_update.status == "settled" and expense["user_id"] != user["email"]:
-        raise HTTPException(status_code=403, detail="Only the creator can mark expense as settled")
-
-    if status_update.status == "pending_review":
-        # Check if user is a participant (not creator)
-        is_participant = any(
-            participant["email"] == user["email"]
-            for participant in expense["participants"]
-        )
-        is_creator = expense["user_id"] == user["email"]
-        if not is_participant or is_creator:
-            raise HTTPException(status_code=403, detail="Only participants can mark expense as pending review")
+    # Check permissions and update status in one DynamoDB call
+    try:
+        updated_expense = await async_dynamodb.update_expense_status(expense_id, status_update.status, user["email"])
+    except dynamodb_service.ExpenseWriteError as e:
+        raise_for_write_error(e)
 
-    # Update status in DynamoDB
-    updated_expense = dynamodb_service.update_expense_status(expense_id, status_update.status)
+    logger.info("Expense status updated", extra={'expense_id': expense_id, 'status': status_update.status, 'user_id': user['email']})
 
-    print(f"\n✅ Expense {expense_id[:8]}... status updated to: {status_update.status}")
-
-    return updated_expense
+    # update_expense_status builds this from the stored (ALL_OLD) item, so it
+    # also has storage-only attributes - the model drops them
+    return expense_codec.decode(updated_expense)
 
 
 # DELETE EXPENSE ENDPOINT
 @router.delete("/{expense_id}")
-def delete_expense(expense_id: str, user = Depends(get_current_user)):
+async def delete_expense(expense_id: str, user = Depends(get_current_user)):
     """Delete an expense by ID - anyone involved can delete"""
 
-    # First, get the expense to check if it exists
-    expense = dynamodb_service.get_expense_by_id(expense_id)
-
-    if not expense:
-        raise HTTPException(status_code=404, detail="Expense not found")
-
-    # Check if user is either the creator OR a participant
-    is_creator = expense["user_id"] == user["email"]
-    is_participant = any(
-        participant["email"] == user["email"]
-        for participant in expense["participants"]
-    )
-
-    if not is_creator and not is_participant:
-        raise HTTPException(status_code=403, detail="Not authorized to delete this expense")
-
-    # Delete from DynamoDB
-    dynamodb_service.delete_expense(expense_id)
+    # DynamoDB checks the expense exists and the user is the creator OR
+    # a participant, in the same call as the delete
+    try:
+        await async_dynamodb.delete_expense(expense_id, user["email"])
+    except dynamodb_service.ExpenseWriteError as e:
+        raise_for_write_error(e)
 
     return {"message": "Expense deleted"}
 
@@ -2,10 +2,12 @@
 # Returns the shared network of friends for participant selection
 # To add/remove friends: Just edit the FRIENDS_LIST below!
 
-from fastapi import APIRouter, Depends
-from typing import List, Dict
+from fastapi import APIRouter, Depends, Header, Response
+from typing import List, Dict, Optional
 from app.middleware.auth import get_current_user
+from app.responses import REVALIDATE, etag_matches, make_etag, not_modified
 from datetime import datetime
+import json
 
 router = APIRouter()
 
@@ -55,16 +57,38 @@ FRIENDS_LIST = [
 ]
 
 
+# The list only changes when this file does (i.e. on a restart). Friends'
+# created_at is when it was loaded - fixed, so every response under one
+# (strong) ETag is byte-for-byte the same
+FRIENDS_LOADED_AT = datetime.utcnow().isoformat()
+
+# "Change version": a fingerprint of the list and its load time, taken once
+FRIENDS_VERSION = make_etag(json.dumps(FRIENDS_LIST, sort_keys=True), FRIENDS_LOADED_AT)
+
+
 @router.get("/")
-async def get_all_friends(user: Dict = Depends(get_current_user)) -> List[Dict]:
+async def get_all_friends(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    user: Dict = Depends(get_current_user)
+) -> List[Dict]:
     """
     Get all friends in the shared network
 
     Returns: List of friends with name, email, phone, initials
+    (304 Not Modified if If-None-Match still matches the ETag)
 
     To add/remove friends: Edit the FRIENDS_LIST above in this file!
     """
 
+    # Each user sees the list minus themselves, so the ETag is per user
+    etag = make_etag(FRIENDS_VERSION, user['email'].lower())
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE
+
     # Transform friends list to include auto-generated fields
     friends_with_metadata = []
 
@@ -102,7 +126,7 @@ async def get_all_friends(user: Dict = Depends(get_current_user)) -> List[Dict]:
             'email': friend_email,
             'phone': friend.get('phone', ''),
             'initials': initials,
-            'created_at': datetime.utcnow().isoformat()
+            'created_at': FRIENDS_LOADED_AT
         })
 
     return friends_with_metadata
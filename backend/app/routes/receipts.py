@@ -1,11 +1,20 @@
+
 # EXTRACTS DATA FROM IMAGES AND PDFS USING AWS TEXTRACT AND RETURNS THE DATA IN JSON FORMAT
 
-from fastapi import APIRouter, File, UploadFile, Depends, HTTPException
+import asyncio
+import hmac
+import json
+import logging
+from fastapi import APIRouter, File, UploadFile, Depends, HTTPException, Query, Header
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.config import settings
 from app.middleware.auth import get_current_user
+from app.models.receipt import ReceiptJob, PresignRequest, PresignedUpload, ReceiptEventResult
+from app.services import receipt_events, receipt_pipeline
+from app.services.receipt_jobs import receipt_job_queue, stored_job_id, FINISHED_STATUSES
 from app.services.s3 import s3_service
-from app.services.textract import textract_service
-from app.config import settings
-from typing import Dict
+from app.services.upload_stream import spool_upload, UploadTooLargeError
+from typing import Dict, List
 
 # API Router: Creates a router (the switchboard)
 # File: Tells FastAPI "this parameter is a file"
@@ -14,57 +23,299 @@ from typing import Dict
 # HTTPException: For sending error messages (404, 401, etc.)
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# How often the event stream checks a job for changes
+JOB_EVENT_POLL_SECONDS = 0.5
+
+ALLOWED_TYPES = ['image/jpeg', 'image/jpg', 'image/png', 'application/pdf']
+
+# Allowance per file for multipart boundaries and part headers
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+
+
 @router.post("/upload")
 
-async def upload_and_process_receipt(file: UploadFile = File(...), user: Dict = Depends(get_current_user)) -> Dict:
+async def upload_and_process_receipt(
+    file: UploadFile = File(...),
+    wait: bool = Query(False, description = "true: hold the request open until the receipt is processed"),
+    user: Dict = Depends(get_current_user)
+) -> Dict:
 
-    """ Upload receipt image, process with Textract, return extracted data
+    """ Upload receipt image (or multi-page PDF), process with Textract, return extracted data
         Flow:
-            1. Validate file
-            2. Upload to S3
-            3. Process with Textract
-            4. Return extracted data
+            1. Validate file type (the declared type must match the file's
+               bytes) and size (bodies over the request limit get a 413
+               before they're read - see RequestSizeLimitMiddleware)
+            2. Queue a processing job (S3 upload + Textract on a worker thread)
+            3. wait=false (default): return 202 with the job ID - poll
+               GET /api/receipts/jobs/{id} (or stream its events) for
+               progress and the result
+               wait=true: wait for the job and return extracted data
+               (not for PDFs - Textract can take minutes on those, so
+               they always get the 202)
     """
 
     # Step 1: Validate file type
-    allowed_types = ['image/jpeg', 'image/jpg', 'image/png']
-    if file.content_type not in allowed_types:
+    if file.content_type not in ALLOWED_TYPES:
         raise HTTPException(
             status_code = 400,
-            detail = f"Invalid file type. Allowed: {', '.join(allowed_types)}"
+            detail = f"Invalid file type. Allowed: {', '.join(ALLOWED_TYPES)}"
+        )
+
+    # Step 2: Copy the file out of the request in chunks, checking its size limit
+    upload, pdf = await receive_receipt(file)
+
+    # Step 3: Queue the S3 upload + Textract work on a background worker
+    job = receipt_job_queue.submit(upload.file, file.filename, user['email'], upload.digest, pdf=pdf)
+    logger.debug("Receipt queued", extra={'job_id': job['id'], 'user_id': user['email'], 'bytes': upload.size, 'pdf': pdf})
+
+    if not wait or pdf:
+        return JSONResponse(
+            status_code = 202,
+            content = {
+                "job_id": job['id'],
+                "status": job['status'],
+                "status_url": f"/api/receipts/jobs/{job['id']}"
+            }
         )
 
-    # Step 2: Validate file size (max 5MB)
-    MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
-    file_bytes = await file.read()
+    # Step 4: Wait for the job without blocking the event loop
+    job = await receipt_job_queue.wait(job['id'])
+
+    if job['status'] == 'failed':
+        logger.warning("Receipt upload failed", extra={'job_id': job['id'], 'error': job['error']})
+        raise HTTPException(status_code = 502, detail = f"Receipt processing failed: {job['error']}")
+
+    # Step 5: Return extracted data
+    return job['result']
+
 
-    if len(file_bytes) > MAX_FILE_SIZE:
+@router.post("/batch")
+async def upload_receipt_batch(
+    files: List[UploadFile] = File(...),
+    user: Dict = Depends(get_current_user)
+):
+    """
+    Upload many receipts at once and stream back each result as it finishes
+
+    Flow:
+        1. Validate the batch size, then every file's type and size
+           (a bad file becomes an error line - it doesn't fail the batch)
+        2. Process up to RECEIPT_BATCH_CONCURRENCY files at a time, each as
+           a receipt job (so it can also be polled by job ID)
+        3. Stream one JSON object per line (NDJSON) in completion order:
+           {"index": 0, "filename": "dinner.jpg", "status": "done", "job_id": "...", "result": {...}}
+           {"index": 1, "filename": "notes.txt", "status": "failed", "job_id": null, "error": "..."}
+    """
+
+    # Step 1: Validate the batch, then copy each file out of the request
+    # (the request's files are closed before the response streams)
+    if len(files) > settings.RECEIPT_BATCH_MAX_FILES:
         raise HTTPException(
             status_code = 400,
-            detail = "File size exceeds 5MB limit."
+            detail = f"Too many files. Maximum per batch: {settings.RECEIPT_BATCH_MAX_FILES}"
         )
-    
-    # Step 3: Upload file to S3
-    print(f"Uploading receipt for user: {user['email']}")
-
-    s3_url = s3_service.upload_file(
-        file_bytes = file_bytes,
-        file_name = file.filename,
-        user_id = user['email']
-    )
 
-    # Step 4: Extract data with Textract
-    print(f"Processing receipt with Textract: {s3_url}")
-    s3_key = s3_url.split('.amazonaws.com/')[-1]  # Extract key from URL
+    received = []
+    for index, file in enumerate(files):
+        if file.content_type not in ALLOWED_TYPES:
+            received.append((index, file.filename, None, False, f"Invalid file type. Allowed: {', '.join(ALLOWED_TYPES)}"))
+            continue
+        try:
+            received.append((index, file.filename, *await receive_receipt(file), None))
+        except HTTPException as e:
+            received.append((index, file.filename, None, False, e.detail))
 
-    extracted_data = textract_service.analyze_receipt(
-        s3_bucket = settings.S3_BUCKET_NAME,
-        s3_key = s3_key
+    logger.info("Receipt batch received", extra={'user_id': user['email'], 'files': len(files)})
+
+    # Step 2: Run the files through the job queue, a few at a time
+    semaphore = asyncio.Semaphore(settings.RECEIPT_BATCH_CONCURRENCY)
+
+    async def process_one(index, filename, upload, pdf, error):
+        line = {"index": index, "filename": filename, "status": "failed", "job_id": None}
+        if error:
+            return {**line, "error": error}
+
+        submitted = False
+        try:
+            async with semaphore:
+                job = receipt_job_queue.submit(upload.file, filename, user['email'], upload.digest, pdf=pdf)
+                submitted = True  # The job owns (and closes) the file now
+                job = await receipt_job_queue.wait(job['id'])
+        finally:
+            if not submitted:
+                upload.file.close()
+
+        if job['status'] == 'failed':
+            return {**line, "job_id": job['id'], "error": job['error']}
+        return {**line, "status": "done", "job_id": job['id'], "result": job['result']}
+
+    # Step 3: Stream results in the order they finish
+    async def results():
+        tasks = [asyncio.create_task(process_one(*item)) for item in received]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(await finished) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()  # Client went away - don't start the files still waiting
+
+    return StreamingResponse(results(), media_type = "application/x-ndjson")
+
+
+@router.post("/presign", response_model = PresignedUpload)
+async def presign_receipt_upload(request: PresignRequest, user: Dict = Depends(get_current_user)):
+    """
+    Get a presigned POST to upload a receipt straight to S3
+
+    Flow:
+        1. Client POSTs the file to `url` with `fields` (the file goes last)
+        2. S3's object-created event reaches POST /api/receipts/events and
+           starts processing
+        3. Client polls GET /api/receipts/by-key?key=... for the result
+
+    The file never passes through the API. S3 enforces the content type,
+    the size limit and the receipts/{your email}/ prefix.
+    """
+    if request.content_type not in ALLOWED_TYPES:
+        raise HTTPException(
+            status_code = 400,
+            detail = f"Invalid file type. Allowed: {', '.join(ALLOWED_TYPES)}"
+        )
+
+    # Signing is local computation - no call to AWS
+    presigned = s3_service.presign_upload(
+        request.filename,
+        user['email'],
+        request.content_type,
+        max_upload_bytes(request.content_type)
     )
 
-    # Step 5: Add receipt URL to response
-    extracted_data['receipt_url'] = s3_url
+    return {**presigned, "expires_in": settings.RECEIPT_PRESIGN_EXPIRES_SECONDS}
+
+
+@router.post("/events", response_model = ReceiptEventResult)
+async def receive_s3_event(event: Dict, x_receipt_events_token: str = Header("")):
+    """
+    Start processing receipts uploaded with a presigned POST
+
+    Called by whatever forwards the bucket's object-created events, with
+    the shared RECEIPT_EVENTS_TOKEN in the X-Receipt-Events-Token header
+    (there's no user session here).
+    """
+    if not settings.RECEIPT_EVENTS_TOKEN:
+        raise HTTPException(status_code = 404, detail = "Not Found")
+    if not hmac.compare_digest(x_receipt_events_token, settings.RECEIPT_EVENTS_TOKEN):
+        logger.warning("Rejected S3 event with an invalid events token")
+        raise HTTPException(status_code = 403, detail = "Invalid events token")
+
+    jobs = receipt_events.handle_s3_event(event)
+    return {"job_ids": [job['id'] for job in jobs]}
+
+
+@router.get("/by-key", response_model = ReceiptJob)
+async def get_receipt_by_key(key: str, user: Dict = Depends(get_current_user)):
+    """Get the processing job for a receipt uploaded with a presigned POST"""
+    job = None
+    if key.startswith(f"receipts/{user['email']}/"):
+        job = receipt_job_queue.get(stored_job_id(key))
+
+    if not job:
+        # Also what you see before S3's event arrives - keep polling
+        raise HTTPException(status_code = 404, detail = "No processed receipt for this key yet")
+
+    return job
+
+
+def max_upload_bytes(content_type: str) -> int:
+    """Multi-page PDFs get a bigger limit than photos"""
+    if content_type == 'application/pdf':
+        return settings.RECEIPT_MAX_PDF_UPLOAD_BYTES
+    return settings.RECEIPT_MAX_UPLOAD_BYTES
+
+
+def max_request_bytes(files: int) -> int:
+    """Largest request body for `files` files (see RequestSizeLimitMiddleware)"""
+    largest_file = max(settings.RECEIPT_MAX_UPLOAD_BYTES, settings.RECEIPT_MAX_PDF_UPLOAD_BYTES)
+    return files * (largest_file + MULTIPART_OVERHEAD_BYTES)
+
+
+async def receive_receipt(file: UploadFile):
+    """
+    Copy an upload out of the request, checking it against its type's limit
+
+    The type is sniffed from the file's first bytes before anything is
+    copied. A declared type that disagrees with them is a 400 - otherwise
+    a non-PDF labelled application/pdf would get the PDF limit and then go
+    down the image path. So is a file over its type's limit.
+
+    Returns:
+        tuple: (SpooledUpload, whether it's a PDF)
+    """
+    pdf = await file.read(len(receipt_pipeline.PDF_SIGNATURE)) == receipt_pipeline.PDF_SIGNATURE
+    await file.seek(0)
+
+    if pdf != (file.content_type == 'application/pdf'):
+        raise HTTPException(
+            status_code = 400,
+            detail = f"File content doesn't match its type ({file.content_type})."
+        )
 
-    # Step 6: Return extracted data
-    print(f"[SUCCESS] Receipt processed: {extracted_data['merchant']}")
-    return extracted_data
\ No newline at end of file
+    try:
+        return await spool_upload(file, max_bytes = max_upload_bytes(file.content_type)), pdf
+    except UploadTooLargeError as e:
+        raise HTTPException(
+            status_code = 400,
+            detail = f"File size exceeds {e.max_bytes // (1024 * 1024)}MB limit."
+        )
+
+
+def get_user_job(job_id: str, user: Dict) -> Dict:
+    """Look up a job, hiding other users' jobs behind a 404"""
+    job = receipt_job_queue.get(job_id)
+
+    if not job or job['user_id'] != user['email']:
+        raise HTTPException(status_code = 404, detail = "Job not found")
+
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model = ReceiptJob)
+async def get_receipt_job(job_id: str, user: Dict = Depends(get_current_user)):
+    """Get the progress of a receipt processing job (and its result once done)"""
+    return get_user_job(job_id, user)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_receipt_job(job_id: str, user: Dict = Depends(get_current_user)):
+    """
+    Stream a job's progress as Server-Sent Events
+
+    Sends the job record every time its stage changes, and closes the
+    stream once the job is done or failed.
+    """
+    job = get_user_job(job_id, user)
+
+    async def events():
+        last_sent = None
+        current = job
+
+        while True:
+            snapshot = (current['status'], current['stage'])
+            if snapshot != last_sent:
+                last_sent = snapshot
+                payload = ReceiptJob(**current).model_dump()
+                yield f"event: {current['status']}\ndata: {json.dumps(payload)}\n\n"
+
+            if current['status'] in FINISHED_STATUSES:
+                return
+
+            await asyncio.sleep(JOB_EVENT_POLL_SECONDS)
+            current = receipt_job_queue.get(job_id) or current
+
+    return StreamingResponse(
+        events(),
+        media_type = "text/event-stream",
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
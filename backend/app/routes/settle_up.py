@@ -0,0 +1,36 @@
+# SETTLE-UP API
+# Suggests the fewest payments that clear every pending expense the current
+# user is involved in (see app/services/settle_up.py for the algorithm).
+
+from fastapi import APIRouter, Depends
+from app.models.balance import SettleUpPlan
+from app.middleware.auth import get_current_user
+from app.services import async_dynamodb, balance_ledger, dynamodb_service, settle_up
+
+router = APIRouter()
+
+
+def build_plan(email):
+    """Load the user's expenses and plan payments (blocking - run off the event loop)"""
+    expenses = dynamodb_service.iter_participant_expenses(email, summary=True)
+    balances = settle_up.net_balances(balance_ledger.outstanding_debts(expenses))
+    transfers = settle_up.plan_transfers(balances)
+
+    return {
+        "transfers": transfers,
+        "your_transfers": [
+            transfer for transfer in transfers
+            if email in (transfer["from"], transfer["to"])
+        ],
+    }
+
+
+@router.get("/", response_model = SettleUpPlan)
+async def get_settle_up_plan(user = Depends(get_current_user)):
+    """
+    Get a settle-up plan for everyone in the current user's pending expenses
+
+    Debts are netted per person first, so chains like "A owes B, B owes C"
+    collapse into a single payment from A to C.
+    """
+    return await async_dynamodb.run(build_plan, user["email"])
@@ -0,0 +1,117 @@
+"""
+Async DynamoDB Service Layer
+============================
+Awaitable versions of the dynamodb_service functions, for async routes.
+
+Why?
+- boto3 is blocking. A sync route ties up one of anyio's 40 shared
+  threads for the whole DynamoDB round trip, so a few slow calls can
+  starve every other request.
+- Here each blocking call runs on a dedicated, separately sized thread
+  pool. The event loop stays free, so one worker can hold hundreds of
+  in-flight requests - extra ones simply wait their turn for a thread.
+
+Usage:
+    from app.services import async_dynamodb
+
+    expense = await async_dynamodb.get_expense_by_id(expense_id)
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.config import settings
+from app.log import in_context
+from app.services import dynamodb_service
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Return the thread pool used for DynamoDB calls
+
+    Sized by DYNAMODB_ASYNC_WORKERS - keep it at or below
+    AWS_MAX_POOL_CONNECTIONS so threads never wait for a connection.
+    """
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.DYNAMODB_ASYNC_WORKERS,
+                    thread_name_prefix='dynamodb'
+                )
+
+    return _executor
+
+
+def shutdown():
+    """Stop the thread pool (called when the app shuts down)"""
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+async def run(function, *args, **kwargs):
+    """
+    Run a blocking function on the DynamoDB thread pool and await it
+
+    Args:
+        function: Any blocking callable (usually from dynamodb_service)
+        *args, **kwargs: Arguments for it
+
+    Returns:
+        Whatever the function returns
+    """
+    loop = asyncio.get_running_loop()
+    # in_context: run_in_executor doesn't carry contextvars over, so the
+    # call's logs would lose the request ID
+    call = in_context(functools.partial(function, *args, **kwargs))
+    return await loop.run_in_executor(get_executor(), call)
+
+
+# =============================================================================
+# ASYNC WRAPPERS (same names and arguments as dynamodb_service)
+# =============================================================================
+
+async def create_expense(expense_data):
+    return await run(dynamodb_service.create_expense, expense_data)
+
+
+async def get_user_expenses(user_id):
+    return await run(dynamodb_service.get_user_expenses, user_id)
+
+
+async def get_expense_by_id(expense_id):
+    return await run(dynamodb_service.get_expense_by_id, expense_id)
+
+
+async def get_participant_expenses(email, summary=False):
+    return await run(dynamodb_service.get_participant_expenses, email, summary)
+
+
+async def get_participant_expenses_page(email, limit, cursor=None, summary=False):
+    return await run(dynamodb_service.get_participant_expenses_page, email, limit, cursor, summary)
+
+
+async def delete_expense(expense_id, user_email=None, expense=None):
+    return await run(dynamodb_service.delete_expense, expense_id, user_email, expense)
+
+
+async def update_expense_status(expense_id, new_status, user_email):
+    return await run(dynamodb_service.update_expense_status, expense_id, new_status, user_email)
+
+
+async def batch_get_expenses(expense_ids, summary=False):
+    return await run(dynamodb_service.batch_get_expenses, expense_ids, summary)
+
+
+async def batch_create_expenses(expenses):
+    return await run(dynamodb_service.batch_create_expenses, expenses)
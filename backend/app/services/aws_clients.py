@@ -0,0 +1,179 @@
+"""
+AWS Client Registry
+===================
+One shared place to build boto3 clients and resources.
+
+Why a registry?
+- Creating a boto3 client/resource is slow (it loads service models and
+  opens new TLS connections), so we build each one once per process
+- All services share the same connection pool, retry and timeout settings
+- Settings are tunable from .env without touching service code
+
+Usage:
+    from app.services import aws_clients
+
+    s3 = aws_clients.get_client('s3')
+    dynamodb = aws_clients.get_resource('dynamodb')
+
+Local stand-ins:
+    S3_ENDPOINT_URL points the S3 client at a local server (moto_server,
+    MinIO, LocalStack) so uploads can be exercised without AWS.
+    AWS_CLIENT_MODE=record/replay swaps the Textract and S3 clients for
+    recording/replaying ones (see aws_replay.py).
+"""
+
+import threading
+import boto3
+from botocore.config import Config
+from app.config import settings
+from app.services import aws_replay
+
+# boto3 sessions aren't thread-safe while creating clients, so building is
+# guarded by a lock. The finished clients are thread-safe and shared.
+_lock = threading.Lock()
+_session = None
+_clients = {}
+_resources = {}
+
+
+def get_session():
+    """
+    Return the process-wide boto3 session
+
+    Empty credentials in .env fall back to boto3's default chain
+    (environment, ~/.aws, instance role).
+    """
+    global _session
+
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = boto3.session.Session(
+                    region_name=settings.AWS_REGION,
+                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID or None,
+                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY or None
+                )
+
+    return _session
+
+
+def build_config(**overrides):
+    """
+    Build the botocore Config shared by every client
+
+    Args:
+        **overrides: Per-service tweaks, e.g. read_timeout=30 for Textract
+
+    Returns:
+        botocore Config
+    """
+    options = {
+        'region_name': settings.AWS_REGION,
+        'max_pool_connections': settings.AWS_MAX_POOL_CONNECTIONS,  # Connections kept open per client
+        'tcp_keepalive': settings.AWS_TCP_KEEPALIVE,
+        'connect_timeout': settings.AWS_CONNECT_TIMEOUT,
+        'read_timeout': settings.AWS_READ_TIMEOUT,
+        'retries': {
+            'mode': settings.AWS_RETRY_MODE,  # 'adaptive' also rate-limits the client when throttled
+            'max_attempts': settings.AWS_MAX_ATTEMPTS,
+        },
+    }
+    options.update(overrides)
+
+    return Config(**options)
+
+
+def endpoint_url(service_name):
+    """Custom endpoint for a service, or None for the real AWS endpoint"""
+    if service_name == 's3':
+        return settings.S3_ENDPOINT_URL or None
+    return None
+
+
+def get_client(service_name, **config_overrides):
+    """
+    Return the shared low-level client for an AWS service
+
+    Args:
+        service_name (str): e.g. 's3', 'textract'
+        **config_overrides: Config options that differ for this service
+
+    Returns:
+        boto3 client
+    """
+    key = (service_name, tuple(sorted(config_overrides.items())))
+
+    client = _clients.get(key)
+    if client is None:
+        session = get_session()
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _build_client(session, service_name, config_overrides)
+                _clients[key] = client
+
+    return client
+
+
+def _build_client(session, service_name, config_overrides):
+    """Real client, or its record/replay stand-in per AWS_CLIENT_MODE"""
+    mode = settings.AWS_CLIENT_MODE
+    if mode == 'replay' and service_name in aws_replay.REPLAYABLE_OPERATIONS:
+        return aws_replay.replay_client(service_name)
+
+    url = endpoint_url(service_name)
+    if url and service_name == 's3':
+        # Local servers don't resolve bucket.host names
+        config_overrides.setdefault('s3', {'addressing_style': 'path'})
+    client = session.client(
+        service_name,
+        endpoint_url=url,
+        config=build_config(**config_overrides)
+    )
+
+    if mode == 'record' and aws_replay.REPLAYABLE_OPERATIONS.get(service_name):
+        return aws_replay.RecordingClient(
+            client,
+            service_name,
+            settings.AWS_FIXTURES_DIR,
+            aws_replay.REPLAYABLE_OPERATIONS[service_name]
+        )
+    return client
+
+
+def get_resource(service_name, **config_overrides):
+    """
+    Return the shared high-level resource for an AWS service
+
+    Args:
+        service_name (str): e.g. 'dynamodb'
+        **config_overrides: Config options that differ for this service
+
+    Returns:
+        boto3 ServiceResource
+    """
+    key = (service_name, tuple(sorted(config_overrides.items())))
+
+    resource = _resources.get(key)
+    if resource is None:
+        session = get_session()
+        with _lock:
+            resource = _resources.get(key)
+            if resource is None:
+                resource = session.resource(service_name, config=build_config(**config_overrides))
+                _resources[key] = resource
+
+    return resource
+
+
+def reset():
+    """
+    Forget every cached client (e.g. after changing settings, or in a
+    forked worker process that must not share sockets with its parent)
+    """
+    global _session
+
+    with _lock:
+        _session = None
+        _clients.clear()
+        _resources.clear()
@@ -0,0 +1,271 @@
+"""
+AWS Record / Replay
+===================
+Stand-ins for the Textract and S3 clients so the receipt path can be
+load-tested on a laptop, without AWS.
+
+Modes (AWS_CLIENT_MODE, applied by aws_clients.get_client):
+- 'live':   real clients (default)
+- 'record': real clients, and every Textract response is also saved as a
+            JSON fixture under AWS_FIXTURES_DIR
+- 'replay': no AWS at all. Textract answers from the saved fixtures and
+            S3 accepts uploads without storing them. Both sleep for a
+            configurable latency and fail at a configurable rate.
+
+Fixtures live at {AWS_FIXTURES_DIR}/{service}/{operation}/{request hash}.json.
+Replay looks up the exact request first (same image bytes or S3 key); if
+it was never recorded, it serves the recorded responses round-robin, so
+a handful of real receipts can stand in for any upload.
+
+Multi-page PDF jobs (StartExpenseAnalysis + GetExpenseAnalysis) are
+recorded as their finished result pages, under the hash of the request
+that started the job (job IDs change every run):
+{AWS_FIXTURES_DIR}/textract/get_expense_analysis/{request hash}-{page}.json.
+Replay serves those pages in order, and falls back to a recorded
+AnalyzeExpense response as a one-page job if no PDF was recorded.
+
+Usage:
+    AWS_CLIENT_MODE=record  -> upload some real receipts
+    AWS_CLIENT_MODE=replay REPLAY_TEXTRACT_LATENCY_MS=1500 REPLAY_ERROR_RATE=0.02
+    python -m benchmarks.bench_receipt_load
+"""
+
+import hashlib
+import itertools
+import json
+import logging
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Dict
+from botocore.exceptions import ClientError
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Replayed failures, picked at random - the errors Textract/S3 really return under load
+REPLAY_ERRORS = ['ThrottlingException', 'ProvisionedThroughputExceededException', 'InternalServerError']
+
+
+def request_hash(params: Dict) -> str:
+    """Stable hash of an API call's parameters (bytes are hashed by content)"""
+    def default(value):
+        if isinstance(value, (bytes, bytearray)):
+            return hashlib.sha256(value).hexdigest()
+        return str(value)
+
+    canonical = json.dumps(params, sort_keys=True, default=default)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+def _strip_metadata(response: Dict) -> Dict:
+    return {key: value for key, value in response.items() if key != 'ResponseMetadata'}
+
+
+# =============================================================================
+# RECORDING
+# =============================================================================
+
+class RecordingClient:
+    """Wraps a real client and saves the responses of chosen operations"""
+
+    def __init__(self, client, service_name, fixtures_dir, operations):
+        self._client = client
+        self._directory = Path(fixtures_dir) / service_name
+        self._operations = set(operations)
+        self._jobs = {}  # JobId -> [hash of the request that started it, next page number]
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if name not in self._operations:
+            return attribute
+
+        def record(**params):
+            response = attribute(**params)
+
+            if name == 'start_expense_analysis':
+                # Nothing worth saving yet - remember which document the job reads
+                with self._lock:
+                    self._jobs[response['JobId']] = [request_hash(params), 0]
+                return response
+
+            if name == 'get_expense_analysis':
+                if response.get('JobStatus') == 'IN_PROGRESS':
+                    return response  # Polls of a running job aren't replayed
+                with self._lock:
+                    job = self._jobs.setdefault(params['JobId'], [request_hash({'JobId': params['JobId']}), 0])
+                    fixture = f"{job[0]}-{job[1]:04d}"
+                    job[1] += 1
+            else:
+                fixture = request_hash(params)
+
+            self._save(name, fixture, response)
+            return response
+
+        return record
+
+    def _save(self, operation, fixture, response):
+        path = self._directory / operation / f"{fixture}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(_strip_metadata(response), indent=2, default=str))
+        logger.info("Recorded %s fixture", operation, extra={'path': str(path)})
+
+
+# =============================================================================
+# REPLAY
+# =============================================================================
+
+class ReplayClient:
+    """Shared latency and error injection for the replay clients"""
+
+    def __init__(self, service_name, latency_ms, jitter, error_rate, seed=None):
+        self.service_name = service_name
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()  # random.Random isn't safe to share across threads
+
+    def _simulate(self, operation, extra_ms=0.0):
+        """Sleep like the real call would, then maybe fail like it can"""
+        with self._lock:
+            spread = 1 + self._random.uniform(-self.jitter, self.jitter)
+            fails = self._random.random() < self.error_rate
+            code = self._random.choice(REPLAY_ERRORS)
+
+        time.sleep(max(0.0, (self.latency_ms + extra_ms) * spread) / 1000)
+
+        if fails:
+            raise ClientError(
+                {'Error': {'Code': code, 'Message': f"Replayed {code}"}},
+                operation
+            )
+
+
+class ReplayTextractClient(ReplayClient):
+    """Answers Textract calls from recorded fixtures"""
+
+    def __init__(self, fixtures_dir, **options):
+        super().__init__('textract', **options)
+        self._directory = Path(fixtures_dir) / 'textract'
+        self._rotations = {}
+        self._jobs = {}
+
+    def _fixture(self, operation, params):
+        exact = self._directory / operation / f"{request_hash(params)}.json"
+        if exact.exists():
+            return json.loads(exact.read_text())
+
+        with self._lock:
+            if operation not in self._rotations:
+                recorded = sorted((self._directory / operation).glob('*.json'))
+                if not recorded:
+                    raise FileNotFoundError(
+                        f"No recorded {operation} fixtures in {self._directory / operation} - "
+                        f"record some with AWS_CLIENT_MODE=record"
+                    )
+                self._rotations[operation] = itertools.cycle([json.loads(path.read_text()) for path in recorded])
+            return next(self._rotations[operation])
+
+    def _recorded_job(self, params):
+        """Result pages of a recorded PDF job (this document's, else the next in rotation)"""
+        directory = self._directory / 'get_expense_analysis'
+        job = request_hash(params)
+
+        if not any(directory.glob(f"{job}-*.json")):
+            with self._lock:
+                if 'get_expense_analysis' not in self._rotations:
+                    jobs = sorted({path.stem.rsplit('-', 1)[0] for path in directory.glob('*.json')})
+                    self._rotations['get_expense_analysis'] = itertools.cycle(jobs) if jobs else None
+                rotation = self._rotations['get_expense_analysis']
+                if rotation is None:
+                    return None
+                job = next(rotation)
+
+        return [json.loads(path.read_text()) for path in sorted(directory.glob(f"{job}-*.json"))]
+
+    def analyze_expense(self, **params):
+        self._simulate('AnalyzeExpense')
+        return self._fixture('analyze_expense', params)
+
+    # Multi-page PDFs: the job "finishes" by the first poll and serves its
+    # recorded result pages, NextToken by NextToken. Without recorded PDF
+    # jobs, a recorded AnalyzeExpense response is its only page.
+
+    def start_expense_analysis(self, **params):
+        pages = self._recorded_job(params)
+        if pages is None:
+            pages = [{**self._fixture('analyze_expense', params), 'JobStatus': 'SUCCEEDED'}]
+
+        job_id = request_hash({**params, 'started': time.time()})
+        with self._lock:
+            self._jobs[job_id] = pages
+        return {'JobId': job_id}
+
+    def get_expense_analysis(self, JobId, NextToken=None, **params):
+        with self._lock:
+            pages = self._jobs.get(JobId)
+        if pages is None:
+            raise ClientError({'Error': {'Code': 'InvalidJobIdException', 'Message': JobId}}, 'GetExpenseAnalysis')
+
+        try:
+            self._simulate('GetExpenseAnalysis')
+        except ClientError:
+            with self._lock:
+                self._jobs.pop(JobId, None)
+            raise
+
+        index = int(NextToken) if NextToken else 0
+        page = {key: value for key, value in pages[index].items() if key != 'NextToken'}
+        if index + 1 < len(pages):
+            page['NextToken'] = str(index + 1)
+        else:
+            with self._lock:
+                self._jobs.pop(JobId, None)
+        return page
+
+
+class ReplayS3Client(ReplayClient):
+    """Accepts S3 calls without storing anything; latency grows with size"""
+
+    def __init__(self, ms_per_mb, **options):
+        super().__init__('s3', **options)
+        self.ms_per_mb = ms_per_mb
+
+    def put_object(self, Body=b'', **params):
+        self._simulate('PutObject', self.ms_per_mb * len(Body) / (1024 * 1024))
+        return {'ETag': f'"{hashlib.md5(Body).hexdigest()}"'}
+
+    def upload_fileobj(self, fileobj, bucket, key, ExtraArgs=None, Config=None, **kwargs):
+        size = 0
+        for chunk in iter(lambda: fileobj.read(1024 * 1024), b''):
+            size += len(chunk)
+        self._simulate('PutObject', self.ms_per_mb * size / (1024 * 1024))
+
+    def generate_presigned_post(self, Bucket, Key, Fields=None, Conditions=None, ExpiresIn=3600):
+        return {'url': f"http://replay.invalid/{Bucket}", 'fields': {**(Fields or {}), 'key': Key}}
+
+
+def replay_client(service_name):
+    """Build the replay client for a service from settings"""
+    options = {
+        'jitter': settings.REPLAY_LATENCY_JITTER,
+        'error_rate': settings.REPLAY_ERROR_RATE,
+        'seed': settings.REPLAY_SEED,
+    }
+
+    if service_name == 'textract':
+        return ReplayTextractClient(settings.AWS_FIXTURES_DIR, latency_ms=settings.REPLAY_TEXTRACT_LATENCY_MS, **options)
+    if service_name == 's3':
+        return ReplayS3Client(settings.REPLAY_S3_MS_PER_MB, latency_ms=settings.REPLAY_S3_LATENCY_MS, **options)
+
+    raise ValueError(f"No replay client for {service_name}")
+
+
+# Which clients record/replay swap out, and the operations worth recording
+REPLAYABLE_OPERATIONS = {
+    'textract': ['analyze_expense', 'start_expense_analysis', 'get_expense_analysis'],
+    's3': [],
+}
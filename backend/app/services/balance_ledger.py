@@ -0,0 +1,253 @@
+"""
+Balance Ledger Service
+======================
+Keeps a running "who owes whom" total, so balances never require reading
+every expense.
+
+Ledger table items look like:
+    {'creditor': 'winston@gmail.com',    # partition key - who is owed
+     'debtor': 'longhe58@gmail.com',     # sort key - who owes
+     'amount': Decimal('42.50')}
+
+Every expense still outstanding (pending or pending_review) adds each
+participant's share to (creator, participant). Settling or deleting it
+subtracts the share again. Updates use DynamoDB's ADD, which is atomic
+per item, so concurrent requests never lose each other's changes.
+
+The ledger updates go into the same TransactWriteItems call as the
+expense write (see dynamodb_service), so an expense change and its
+ledger change land together or not at all. If the ledger is edited by
+hand or otherwise looks wrong, run `python rebuild_balances.py` to
+recompute it.
+"""
+
+from decimal import Decimal
+from boto3.dynamodb.conditions import Key
+from app.config import settings
+from app.services import aws_clients
+
+# Statuses where the participants still owe the creator
+OUTSTANDING_STATUSES = {'pending', 'pending_review'}
+
+
+def get_ledger_table():
+    """Return the balances table"""
+    return aws_clients.get_resource('dynamodb').Table(settings.DYNAMODB_TABLE_BALANCES)
+
+
+def _iter_items(operation, **kwargs):
+    """Yield every item of a query/scan, following LastEvaluatedKey"""
+    while True:
+        response = operation(**kwargs)
+        yield from response['Items']
+        if 'LastEvaluatedKey' not in response:
+            return
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def expense_debts(expense):
+    """
+    List the debts one expense creates
+
+    Args:
+        expense (dict): Expense item
+
+    Returns:
+        list: (creditor, debtor, amount) tuples - one per participant
+            other than the creator with a non-zero share
+    """
+    creditor = expense['user_id']
+    debts = []
+
+    for participant in expense.get('participants') or []:
+        amount = Decimal(str(participant.get('amount') or 0))
+        if participant['email'] != creditor and amount:
+            debts.append((creditor, participant['email'], amount))
+
+    return debts
+
+
+def outstanding_debts(expenses):
+    """
+    Yield the debts of every outstanding expense
+
+    Args:
+        expenses: Iterable of expense items
+
+    Yields:
+        tuple: (creditor, debtor, amount)
+    """
+    for expense in expenses:
+        if expense.get('status', 'pending') in OUTSTANDING_STATUSES:
+            yield from expense_debts(expense)
+
+
+def _signed_debts(expense, sign):
+    """(creditor, debtor, sign * share) for every debt of an expense"""
+    return [(creditor, debtor, amount * sign) for creditor, debtor, amount in expense_debts(expense)]
+
+
+def transact_items(changes):
+    """
+    Turn ledger changes into TransactWriteItems Update items
+
+    Changes to the same pair are summed first - a transaction can't
+    touch one item twice.
+
+    Args:
+        changes: Iterable of (creditor, debtor, delta) tuples
+
+    Returns:
+        list: One ADD per pair whose total isn't zero
+    """
+    totals = {}
+    for creditor, debtor, delta in changes:
+        totals[(creditor, debtor)] = totals.get((creditor, debtor), Decimal('0')) + delta
+
+    return [
+        {'Update': {
+            'TableName': settings.DYNAMODB_TABLE_BALANCES,
+            'Key': {'creditor': creditor, 'debtor': debtor},
+            'UpdateExpression': 'ADD amount :delta',  # Atomic - creates the item if missing
+            'ExpressionAttributeValues': {':delta': delta},
+        }}
+        for (creditor, debtor), delta in totals.items()
+        if delta
+    ]
+
+
+# =============================================================================
+# LEDGER CHANGES (dynamodb_service writes them with the expense change)
+# =============================================================================
+
+def created_changes(expense):
+    """A new expense is being saved"""
+    if expense.get('status', 'pending') in OUTSTANDING_STATUSES:
+        return _signed_debts(expense, 1)
+    return []
+
+
+def deleted_changes(expense):
+    """An expense is being deleted - an outstanding one no longer counts"""
+    if expense.get('status', 'pending') in OUTSTANDING_STATUSES:
+        return _signed_debts(expense, -1)
+    return []
+
+
+def status_changes(expense, old_status):
+    """
+    An expense's status is changing (e.g. pending -> settled)
+
+    Args:
+        expense (dict): The expense AFTER the update
+        old_status (str): Status before the update
+    """
+    was_outstanding = old_status in OUTSTANDING_STATUSES
+    is_outstanding = expense.get('status') in OUTSTANDING_STATUSES
+
+    if was_outstanding and not is_outstanding:
+        return _signed_debts(expense, -1)
+    if is_outstanding and not was_outstanding:
+        return _signed_debts(expense, 1)
+    return []
+
+
+# =============================================================================
+# READ OPERATIONS
+# =============================================================================
+
+def get_balances(email):
+    """
+    Get a user's net balance with everyone they share expenses with
+
+    Two queries (what others owe me + what I owe others via the
+    debtor-index), no matter how many expenses exist.
+
+    Args:
+        email (str): User's email address
+
+    Returns:
+        dict: {
+            'owed_to_you': Decimal,   # Sum of positive balances
+            'you_owe': Decimal,       # Sum of negative balances (as a positive number)
+            'net': Decimal,           # owed_to_you - you_owe
+            'balances': [{'email': ..., 'amount': Decimal}, ...]
+                # amount > 0: they owe you, amount < 0: you owe them
+        }
+    """
+    table = get_ledger_table()
+    net_by_person = {}
+
+    for item in _iter_items(table.query, KeyConditionExpression=Key('creditor').eq(email)):
+        net_by_person[item['debtor']] = net_by_person.get(item['debtor'], Decimal('0')) + item['amount']
+
+    for item in _iter_items(table.query, IndexName='debtor-index', KeyConditionExpression=Key('debtor').eq(email)):
+        net_by_person[item['creditor']] = net_by_person.get(item['creditor'], Decimal('0')) - item['amount']
+
+    balances = [
+        {'email': person, 'amount': amount}
+        for person, amount in sorted(net_by_person.items(), key=lambda pair: pair[1], reverse=True)
+        if amount
+    ]
+    owed_to_you = sum((balance['amount'] for balance in balances if balance['amount'] > 0), Decimal('0'))
+    you_owe = -sum((balance['amount'] for balance in balances if balance['amount'] < 0), Decimal('0'))
+
+    return {
+        'owed_to_you': owed_to_you,
+        'you_owe': you_owe,
+        'net': owed_to_you - you_owe,
+        'balances': balances,
+    }
+
+
+# =============================================================================
+# REBUILD (repair drift)
+# =============================================================================
+
+def compute_ledger(expenses):
+    """
+    Recompute every (creditor, debtor) total from scratch
+
+    Args:
+        expenses: Iterable of expense items (e.g. iter_all_expenses())
+
+    Returns:
+        dict: {(creditor, debtor): Decimal}
+    """
+    totals = {}
+
+    for creditor, debtor, amount in outstanding_debts(expenses):
+        totals[(creditor, debtor)] = totals.get((creditor, debtor), Decimal('0')) + amount
+
+    return totals
+
+
+def rebuild(expenses):
+    """
+    Overwrite the ledger with totals recomputed from the expenses
+
+    Run while the app is quiet - writes that land mid-rebuild can be lost.
+
+    Args:
+        expenses: Iterable of every expense item
+
+    Returns:
+        tuple: (pairs written, stale pairs deleted)
+    """
+    table = get_ledger_table()
+    totals = compute_ledger(expenses)
+
+    # Find pairs that exist in the ledger but no longer owe anything
+    stale_keys = [
+        {'creditor': item['creditor'], 'debtor': item['debtor']}
+        for item in _iter_items(table.scan, ProjectionExpression='creditor, debtor')
+        if (item['creditor'], item['debtor']) not in totals
+    ]
+
+    with table.batch_writer() as batch:
+        for (creditor, debtor), amount in totals.items():
+            batch.put_item(Item={'creditor': creditor, 'debtor': debtor, 'amount': amount})
+        for key in stale_keys:
+            batch.delete_item(Key=key)
+
+    return len(totals), len(stale_keys)
@@ -0,0 +1,132 @@
+"""
+In-Process Cache
+================
+A small thread-safe LRU cache with optional per-entry time-to-live.
+
+Why not functools.lru_cache?
+- We need to update/invalidate single keys when data is written
+- Entries must expire so other workers' writes show up eventually
+- We want hit/miss counters to see whether the cache is earning its keep
+
+Usage:
+    cache = LRUCache(max_size=1024, ttl_seconds=30)
+
+    value = cache.get(key)          # None on miss
+    cache.set(key, value)
+    cache.invalidate(key)           # also tells invalidation listeners
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Least-recently-used cache with TTL expiry and hit/miss counters"""
+
+    def __init__(self, max_size=1024, ttl_seconds=None, enabled=True):
+        """
+        Args:
+            max_size (int): Most entries kept before the oldest is evicted
+            ttl_seconds (float, optional): Entry lifetime (None = never expire)
+            enabled (bool): When False every get() misses and set() is a no-op
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+
+        self._entries = OrderedDict()  # key -> (expires_at, value), oldest first
+        self._lock = threading.Lock()
+        self._listeners = []
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the cached value, or None if missing/expired"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entry if full"""
+        if not self.enabled:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key, notify=True):
+        """
+        Drop one key
+
+        Args:
+            key: The key to drop
+            notify (bool): Call the invalidation listeners. Pass False when
+                applying an invalidation that came FROM a listener (e.g. a
+                message from another worker) so it isn't echoed back.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+        if notify:
+            for listener in list(self._listeners):
+                listener(key)
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def add_invalidation_listener(self, listener):
+        """
+        Register a callback run with the key on every invalidate()
+
+        Multi-worker deployments use this to broadcast invalidations
+        (e.g. publish to Redis/SNS) so other workers drop stale copies.
+        """
+        self._listeners.append(listener)
+
+    def remove_invalidation_listener(self, listener):
+        """Unregister a callback added with add_invalidation_listener()"""
+        self._listeners.remove(listener)
+
+    def stats(self):
+        """Return counters for monitoring"""
+        with self._lock:
+            size = len(self._entries)
+
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'size': size,
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
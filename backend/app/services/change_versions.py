@@ -0,0 +1,74 @@
+"""
+Per-User Change Versions
+========================
+A version token per user that changes whenever an expense they're involved
+in is created, updated or deleted. GET /api/expenses builds its ETag from
+it, so a poll whose If-None-Match still matches is answered with a 304
+before any DynamoDB call or serialization.
+
+Why not hash the response body?
+- Hashing means running the query and encoding the list first - the exact
+  work a conditional GET is supposed to skip.
+
+Versions are random tokens, not counters: a restart (or another worker)
+never re-issues a token a client saw before, so a stale ETag can't match
+by accident.
+
+Running several workers? Each keeps its own versions. A write on one
+worker doesn't bump the others, so - like the expense cache - their
+versions expire after CHANGE_VERSION_TTL_SECONDS and are re-minted; that
+is how long another worker's write can take to show. Register a listener
+with change_versions.add_invalidation_listener() to broadcast bumps, and
+call change_versions.bump(email, notify=False) when one arrives.
+
+Usage:
+    change_versions.bump_expense(expense)       # after any expense write
+    version = change_versions.current(email)    # before reading
+"""
+
+import uuid
+from typing import Dict, Iterable
+from app.config import settings
+from app.services.cache import LRUCache
+
+
+class ChangeVersions:
+    """Random version token per user, re-minted on every change"""
+
+    def __init__(self, max_users, ttl_seconds):
+        # An evicted or expired user just gets a fresh token: clients refetch once
+        self._versions = LRUCache(max_size=max_users, ttl_seconds=ttl_seconds)
+
+    def current(self, email: str) -> str:
+        """The user's version token (minted on first use)"""
+        version = self._versions.get(email)
+        if version is None:
+            version = uuid.uuid4().hex
+            self._versions.set(email, version)
+        return version
+
+    def bump(self, email: str, notify: bool = True):
+        """Something the user can see changed - invalidate their ETags"""
+        self._versions.invalidate(email, notify=notify)
+
+    def bump_all(self, emails: Iterable[str]):
+        """Bump several users (each once)"""
+        for email in set(emails):
+            self.bump(email)
+
+    def bump_expense(self, expense: Dict):
+        """Bump the creator and every participant of an expense"""
+        self.bump_all(
+            [expense['user_id']] +
+            [participant['email'] for participant in expense.get('participants') or []]
+        )
+
+    def add_invalidation_listener(self, listener):
+        """listener(email) is called on every local bump"""
+        self._versions.add_invalidation_listener(listener)
+
+
+change_versions = ChangeVersions(
+    max_users=settings.CHANGE_VERSION_MAX_USERS,
+    ttl_seconds=settings.CHANGE_VERSION_TTL_SECONDS
+)
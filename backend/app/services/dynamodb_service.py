@@ -14,15 +14,35 @@ Your Task:
 - Test each function as you complete it
 """
 
-import boto3
-from boto3.dynamodb.conditions import Key
+import base64
+import json
+import time
+from boto3.dynamodb.conditions import Attr, ConditionExpressionBuilder, Key
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
 from decimal import Decimal
 from app.config import settings
+from app.services import aws_clients, balance_ledger
+from app.services.cache import LRUCache
+from app.services.change_versions import change_versions
 
 # =============================================================================
 # HELPER FUNCTION: Get DynamoDB Table
 # =============================================================================
 
+def get_dynamodb():
+    """
+    Return the shared connection to the DynamoDB service
+
+    The resource comes from the AWS client registry, so it is built once
+    per process and reuses pooled keep-alive connections.
+
+    Returns:
+        boto3 DynamoDB ServiceResource
+    """
+    return aws_clients.get_resource('dynamodb')
+
+
 def get_table():
     """
     Connect to DynamoDB and return the expenses table
@@ -33,12 +53,7 @@ def get_table():
         boto3 Table object
     """
     # Step 1: Create a connection to DynamoDB service
-    dynamodb = boto3.resource(
-        'dynamodb',
-        region_name=settings.AWS_REGION,  # TODO: Get from settings (what AWS region?)
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,  # TODO: Get AWS credentials from settings
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY  # TODO: Get AWS secret key from settings
-    )
+    dynamodb = get_dynamodb()
 
     # Step 2: Get the specific table we want to use
     table = dynamodb.Table(settings.DYNAMODB_TABLE_EXPENSES)  # TODO: What's the table name? (from settings)
@@ -46,6 +61,254 @@ def get_table():
     return table
 
 
+def get_participants_table():
+    """
+    Return the participant index table
+
+    Every expense gets one small index item per person involved in it
+    (the creator plus each participant):
+
+        {'email': 'longhe58@gmail.com',                  # partition key
+         'sort_key': '2025-12-28T10:00:00#abc-123',      # sort key (by creation time)
+         'expense_id': 'abc-123',
+         'created_at': '2025-12-28T10:00:00',
+         'role': 'participant'}
+
+    Querying one email therefore reads only that user's expenses,
+    no matter how big the expenses table gets. Sorting on created_at
+    lets us list newest first.
+
+    Returns:
+        boto3 Table object
+    """
+    return get_dynamodb().Table(settings.DYNAMODB_TABLE_EXPENSE_PARTICIPANTS)
+
+
+# =============================================================================
+# EXPENSE CACHE
+# =============================================================================
+# Routes look an expense up before every read/update/delete, so recently
+# used expenses are kept in memory. Writes below update or invalidate the
+# cached copy. Cached dicts are shared - treat them as read-only.
+#
+# Running several workers? Each has its own cache. Register a listener with
+# expense_cache.add_invalidation_listener() to broadcast invalidations, and
+# call expense_cache.invalidate(expense_id, notify=False) when one arrives.
+
+expense_cache = LRUCache(
+    max_size=settings.EXPENSE_CACHE_MAX_SIZE,
+    ttl_seconds=settings.EXPENSE_CACHE_TTL_SECONDS,
+    enabled=settings.EXPENSE_CACHE_ENABLED
+)
+
+
+# =============================================================================
+# PARTICIPANT INDEX HELPERS
+# =============================================================================
+
+def participant_index_items(expense):
+    """
+    Build the participant index items for one expense
+
+    The creator is indexed too, so a single query answers
+    "every expense this user is involved in".
+
+    Args:
+        expense (dict): Expense item (needs id, user_id, created_at, participants)
+
+    Returns:
+        list: Index items, one per distinct email
+    """
+    sort_key = f"{expense['created_at']}#{expense['id']}"
+
+    roles = {expense['user_id']: 'creator'}
+    for participant in expense.get('participants') or []:
+        roles.setdefault(participant['email'], 'participant')
+
+    return [
+        {
+            'email': email,
+            'sort_key': sort_key,
+            'expense_id': expense['id'],
+            'created_at': expense['created_at'],
+            'role': role,
+        }
+        for email, role in roles.items()
+    ]
+
+
+# The attributes list views need. Receipt line items are left out - for
+# long receipts they are most of the item's size. item_count is stored on
+# each expense because a ProjectionExpression can't count a list.
+SUMMARY_ATTRIBUTES = [
+    'id', 'user_id', 'created_by_name', 'description', 'total_amount',
+    'status', 'created_at', 'receipt_url', 'participants', 'item_count',
+]
+
+# ProjectionExpression with placeholders for every name ('status' is a
+# reserved word, and placeholders keep us safe from future ones too)
+SUMMARY_PROJECTION = {
+    'ProjectionExpression': ', '.join(f'#a{i}' for i in range(len(SUMMARY_ATTRIBUTES))),
+    'ExpressionAttributeNames': {f'#a{i}': name for i, name in enumerate(SUMMARY_ATTRIBUTES)},
+}
+
+
+def derived_attributes(expense):
+    """
+    Attributes computed from the rest of the expense and stored with it
+
+    - participant_emails: flat list that condition expressions can check
+      with contains(), which they can't do on the `participants` list of maps
+    - item_count: number of receipt line items, for summary views
+    """
+    return {
+        'participant_emails': participant_emails(expense),
+        'item_count': len(expense.get('items') or []),
+    }
+
+
+def participant_emails(expense):
+    """List the participant emails of an expense (no duplicates, in order)"""
+    return list(dict.fromkeys(participant['email'] for participant in expense.get('participants') or []))
+
+
+def index_expense_participants(expense):
+    """
+    Write the participant index items for an expense
+
+    Args:
+        expense (dict): The expense that was just saved
+    """
+    with get_participants_table().batch_writer(overwrite_by_pkeys=['email', 'sort_key']) as batch:
+        for index_item in participant_index_items(expense):
+            batch.put_item(Item=index_item)
+
+
+# =============================================================================
+# TRANSACTIONS
+# =============================================================================
+# An expense, its participant index items and its balance ledger updates
+# are written with one TransactWriteItems call, so they land together or
+# not at all - a failure can't leave an expense nobody can list, index
+# items pointing nowhere, or a ledger out of step with the expenses.
+# A transaction takes at most 100 writes, which caps participants per
+# expense (see ExpenseCreate).
+
+TRANSACT_LIMIT = 100
+
+# Cancellation reasons that go away on their own (another transaction was
+# touching the same item, or throttling) - the transaction is retried
+RETRYABLE_CANCELLATIONS = {'TransactionConflict', 'ThrottlingError', 'ProvisionedThroughputExceeded'}
+
+
+def _condition_params(condition):
+    """
+    Turn a boto3 condition into request parameters for a transaction item
+
+    TransactWriteItems goes through the low-level client, which takes
+    expression strings rather than Attr(...) objects.
+    """
+    built = ConditionExpressionBuilder().build_expression(condition)
+    params = {
+        'ConditionExpression': built.condition_expression,
+        'ExpressionAttributeNames': built.attribute_name_placeholders,
+    }
+    if built.attribute_value_placeholders:
+        params['ExpressionAttributeValues'] = built.attribute_value_placeholders
+    return params
+
+
+def expense_puts(expense):
+    """Transaction items that save an expense and its participant index items"""
+    return [{'Put': {'TableName': settings.DYNAMODB_TABLE_EXPENSES, 'Item': expense}}] + [
+        {'Put': {'TableName': settings.DYNAMODB_TABLE_EXPENSE_PARTICIPANTS, 'Item': index_item}}
+        for index_item in participant_index_items(expense)
+    ]
+
+
+def expense_deletes(expense, condition):
+    """
+    Transaction items that delete an expense and its participant index items
+
+    Args:
+        expense (dict): The expense as currently stored
+        condition: Condition on the expense item - the whole transaction
+            is cancelled if it fails
+    """
+    delete = {
+        'TableName': settings.DYNAMODB_TABLE_EXPENSES,
+        'Key': {'id': expense['id']},
+        'ReturnValuesOnConditionCheckFailure': 'ALL_OLD',
+        **_condition_params(condition),
+    }
+    return [{'Delete': delete}] + [
+        {'Delete': {
+            'TableName': settings.DYNAMODB_TABLE_EXPENSE_PARTICIPANTS,
+            'Key': {'email': index_item['email'], 'sort_key': index_item['sort_key']},
+        }}
+        for index_item in participant_index_items(expense)
+    ]
+
+
+def _transaction_batches(groups):
+    """
+    Pack groups of writes into as few transactions as they fit in
+
+    Each group (one expense's writes) stays whole within one transaction.
+
+    Args:
+        groups: Iterable of (transaction items, ledger changes) pairs
+
+    Yields:
+        list: Transaction items, at most TRANSACT_LIMIT of them
+    """
+    items, changes = [], []
+
+    for group_items, group_changes in groups:
+        pairs = {(creditor, debtor) for creditor, debtor, _ in changes + group_changes}
+        if items and len(items) + len(group_items) + len(pairs) > TRANSACT_LIMIT:
+            yield items + balance_ledger.transact_items(changes)
+            items, changes = [], []
+        items += group_items
+        changes += group_changes
+
+    if items:
+        yield items + balance_ledger.transact_items(changes)
+
+
+def _cancellation_codes(error):
+    """Reason codes of a cancelled transaction ('None' marks items that were fine)"""
+    if error.response.get('Error', {}).get('Code') != 'TransactionCanceledException':
+        return []
+    return [reason.get('Code') for reason in error.response.get('CancellationReasons') or []]
+
+
+def _transact(items):
+    """
+    Run one TransactWriteItems call, retrying conflicts and throttling
+
+    Raises:
+        ClientError: Any other failure - including a failed condition,
+            which the caller reads with _condition_failure()
+    """
+    if len(items) > TRANSACT_LIMIT:
+        raise ValueError(f"A transaction takes at most {TRANSACT_LIMIT} writes, got {len(items)}")
+
+    client = get_dynamodb().meta.client
+    attempt = 0
+
+    while True:
+        try:
+            client.transact_write_items(TransactItems=items)
+            return
+        except ClientError as e:
+            failed = set(_cancellation_codes(e)) - {'None'}
+            if not failed or not failed <= RETRYABLE_CANCELLATIONS or attempt >= BATCH_MAX_RETRIES:
+                raise
+            _backoff(attempt)
+            attempt += 1
+
+
 # =============================================================================
 # CREATE OPERATION
 # =============================================================================
@@ -68,21 +331,130 @@ def create_expense(expense_data):
     Returns:
         dict: The saved expense (same as input)
     """
-    # Step 1: Get the table
-    table = get_table()
+    # Step 1: Add the attributes computed from the rest of the expense
+    expense_data.update(derived_attributes(expense_data))
+
+    # Step 2: Save the expense, index it under the creator and every
+    # participant, and add each participant's share to the balance ledger -
+    # one transaction, so all of it lands or none of it does
+    ledger_items = balance_ledger.transact_items(balance_ledger.created_changes(expense_data))
+    _transact(expense_puts(expense_data) + ledger_items)
 
-    # Step 2: Save the item to DynamoDB
-    # put_item() adds a new item to the table
-    table.put_item(Item= expense_data)  # TODO: What do we save? (hint: it's the parameter)
+    # Step 3: The next lookup is probably right around the corner
+    expense_cache.set(expense_data['id'], expense_data)
 
-    # Step 3: Return the expense we just saved
+    # Step 4: Everyone involved has a new expense to see (new ETags)
+    change_versions.bump_expense(expense_data)
+
+    # Step 5: Return the expense we just saved
     return expense_data  # TODO: What should we return?
 
 
+# =============================================================================
+# PAGINATION HELPERS
+# =============================================================================
+# DynamoDB returns at most 1 MB per query/scan call. When there is more,
+# the response carries a LastEvaluatedKey that we pass back as
+# ExclusiveStartKey to get the next page. These generators follow that
+# chain lazily, so callers only hold one page in memory at a time.
+
+def iter_pages(operation, **kwargs):
+    """
+    Yield every page of a query/scan call
+
+    Args:
+        operation: A bound Table method, e.g. table.query or table.scan
+        **kwargs: Arguments for that method
+
+    Yields:
+        tuple: (items, last_evaluated_key) - last key is None on the final page
+    """
+    while True:
+        response = operation(**kwargs)
+        last_key = response.get('LastEvaluatedKey')
+        yield response['Items'], last_key
+
+        if not last_key:
+            return
+        kwargs['ExclusiveStartKey'] = last_key
+
+
+def iter_items(operation, **kwargs):
+    """
+    Yield every item of a query/scan call, one at a time
+
+    Args:
+        operation: A bound Table method, e.g. table.query or table.scan
+        **kwargs: Arguments for that method
+    """
+    for items, _ in iter_pages(operation, **kwargs):
+        yield from items
+
+
+def encode_cursor(last_key):
+    """
+    Turn a LastEvaluatedKey into an opaque next-page token
+
+    Args:
+        last_key (dict or None): LastEvaluatedKey from DynamoDB
+
+    Returns:
+        str or None: URL-safe token, or None when there are no more pages
+    """
+    if not last_key:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(last_key).encode()).decode()
+
+
+def decode_cursor(cursor, email):
+    """
+    Turn a next-page token back into an ExclusiveStartKey
+
+    Args:
+        cursor (str): Token from encode_cursor()
+        email (str): The user the page is for - a token minted for
+            someone else's listing is rejected
+
+    Returns:
+        dict: ExclusiveStartKey for the participant index query
+
+    Raises:
+        ValueError: If the token is malformed or belongs to another user
+    """
+    try:
+        last_key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(last_key, dict) or set(last_key) != {'email', 'sort_key'} or last_key['email'] != email:
+        raise ValueError("Invalid cursor")
+
+    return last_key
+
+
 # =============================================================================
 # READ OPERATIONS
 # =============================================================================
 
+def iter_user_expenses(user_id):
+    """
+    Yield every expense created by a specific user, page by page
+
+    This uses the user_id-index we created in setup!
+
+    Args:
+        user_id (str): User's email address
+    """
+    table = get_table()
+
+    # We're searching: "Find all expenses where user_id = X"
+    yield from iter_items(
+        table.query,
+        IndexName='user_id-index',
+        KeyConditionExpression=Key('user_id').eq(user_id)
+    )
+
+
 def get_user_expenses(user_id):
     """
     Get ALL expenses created by a specific user
@@ -102,32 +474,25 @@ def get_user_expenses(user_id):
         #     {'id': '456', 'description': 'Lunch', ...}
         # ]
     """
-    # Step 1: Get the table
-    table = get_table()
-
-    # Step 2: Query the index
-    # We're searching: "Find all expenses where user_id = X"
-    response = table.query(
-        IndexName='user_id-index',  # TODO: What's the index name? (hint: we created 'user_id-index')
-        KeyConditionExpression=Key('user_id').eq(user_id)  # TODO: Equal to what? (hint: function parameter)
-    )
-
-    # Step 3: Extract items from response
-    # DynamoDB returns: {'Items': [...], 'Count': 5, 'ScannedCount': 5}
-    # We only want the Items list
-    return response['Items']  # TODO: Which key has the list of items?
+    return list(iter_user_expenses(user_id))
 
 
 def get_expense_by_id(expense_id):
     """
     Get ONE specific expense by its ID
 
+    Checks the in-process expense cache first.
+
     Args:
         expense_id (str): The expense ID to look up
 
     Returns:
         dict or None: The expense if found, None if not found
     """
+    cached = expense_cache.get(expense_id)
+    if cached is not None:
+        return cached
+
     # Step 1: Get the table
     table = get_table()
 
@@ -140,7 +505,26 @@ def get_expense_by_id(expense_id):
     # Step 3: Return the item (or None if not found)
     # DynamoDB returns: {'Item': {...}} if found
     # or just {} if not found
-    return response.get('Item')  # .get() returns None if key doesn't exist
+    expense = response.get('Item')  # .get() returns None if key doesn't exist
+
+    # Only real items are cached - a "not found" could be created any moment
+    if expense is not None:
+        expense_cache.set(expense_id, expense)
+
+    return expense
+
+
+def iter_all_expenses():
+    """
+    Yield ALL expenses in the database, page by page
+
+    WARNING: This still reads the entire table - it just doesn't
+    hold it all in memory at once. Use for scripts and backfills.
+    """
+    table = get_table()
+
+    # scan() reads EVERYTHING (expensive operation!)
+    yield from iter_items(table.scan)
 
 
 def get_all_expenses():
@@ -153,40 +537,216 @@ def get_all_expenses():
     Returns:
         list: All expenses
     """
-    # Step 1: Get the table
-    table = get_table()
+    return list(iter_all_expenses())
+
+
+def _participant_index_query(email):
+    """Query arguments for a user's participant index items, newest first"""
+    return {
+        'KeyConditionExpression': Key('email').eq(email),
+        'ScanIndexForward': False,
+    }
+
+
+def iter_participant_expenses(email, summary=False):
+    """
+    Yield every expense a user is involved in (as creator OR participant)
+
+    Each page of index items is turned into one BatchGetItem call, so
+    memory stays bounded by the page size.
+
+    Args:
+        email (str): User's email address
+        summary (bool): Only read the SUMMARY_ATTRIBUTES of each expense
+    """
+    table = get_participants_table()
+
+    for index_items, _ in iter_pages(table.query, **_participant_index_query(email)):
+        yield from batch_get_expenses([index_item['expense_id'] for index_item in index_items], summary=summary)
+
+
+def get_participant_expenses(email, summary=False):
+    """
+    Get every expense a user is involved in (as creator OR participant)
+
+    Uses the participant index table, so the cost is one query for the
+    user's index items plus one BatchGetItem per 100 expenses - it grows
+    with the user's history, not with the whole table.
+
+    Args:
+        email (str): User's email address
+        summary (bool): Only read the SUMMARY_ATTRIBUTES of each expense
+
+    Returns:
+        list: Expense dictionaries, newest first
+    """
+    return list(iter_participant_expenses(email, summary))
+
+
+def get_participant_expenses_page(email, limit, cursor=None, summary=False):
+    """
+    Get ONE page of the expenses a user is involved in
+
+    Args:
+        email (str): User's email address
+        limit (int): Maximum number of expenses to return
+        cursor (str, optional): Token from a previous page
+        summary (bool): Only read the SUMMARY_ATTRIBUTES of each expense
+
+    Returns:
+        tuple: (expenses newest first, next cursor or None)
+
+    Raises:
+        ValueError: If the cursor is invalid
+    """
+    table = get_participants_table()
+    query_args = _participant_index_query(email)
+    query_args['Limit'] = limit
+
+    if cursor:
+        query_args['ExclusiveStartKey'] = decode_cursor(cursor, email)
+
+    response = table.query(**query_args)
+    expense_ids = [index_item['expense_id'] for index_item in response['Items']]
+
+    return batch_get_expenses(expense_ids, summary=summary), encode_cursor(response.get('LastEvaluatedKey'))
+
+
+# =============================================================================
+# CONDITIONAL WRITE ERRORS
+# =============================================================================
+# Status updates and deletes check permissions INSIDE DynamoDB with a
+# ConditionExpression on the write, so there's no window where the item
+# can change between "check" and "write". When the condition fails,
+# DynamoDB hands back the current item and we work out why.
+#
+# The ledger and index changes that go with the write are worked out from
+# a copy of the expense (usually cached), so the condition also checks
+# that copy's status is still current. If it isn't, we retry with the
+# current item.
+
+class ExpenseWriteError(Exception):
+    """Base class for conditional write failures"""
+
+
+class ExpenseNotFoundError(ExpenseWriteError):
+    """The expense doesn't exist"""
+
+
+class ExpenseForbiddenError(ExpenseWriteError):
+    """The user isn't allowed to make this change"""
+
+
+class ExpenseConflictError(ExpenseWriteError):
+    """The expense's current status doesn't allow this change"""
 
-    # Step 2: Scan the entire table
-    # scan() reads EVERYTHING (expensive operation!)
-    response = table.scan()
 
-    # Step 3: Return all items
-    return response['Items']
+_deserializer = TypeDeserializer()
+
+
+def _deserialize_item(raw_item):
+    """Error responses skip boto3's type conversion, so we deserialize by hand"""
+    if not raw_item:
+        return None
+    return {key: _deserializer.deserialize(value) for key, value in raw_item.items()}
+
+
+def _condition_failure(error):
+    """
+    Check whether a transaction failed on its first item's condition
+
+    Needs ReturnValuesOnConditionCheckFailure='ALL_OLD' on that item.
+
+    Returns:
+        tuple: (failed, current item or None if it doesn't exist)
+    """
+    codes = _cancellation_codes(error)
+    if not codes or codes[0] != 'ConditionalCheckFailed':
+        return False, None
+    return True, _deserialize_item(error.response['CancellationReasons'][0].get('Item'))
+
+
+def _status_unchanged(expense):
+    """Condition: the stored status is still the one in this copy of the expense"""
+    if 'status' in expense:
+        return Attr('status').eq(expense['status'])
+    return Attr('status').not_exists()
+
+
+def _is_involved(expense, user_email):
+    return expense['user_id'] == user_email or user_email in expense.get('participant_emails', [])
 
 
 # =============================================================================
 # DELETE OPERATION
 # =============================================================================
 
-def delete_expense(expense_id):
+# How many times a write is re-sent after the expense changed under it
+WRITE_MAX_ATTEMPTS = 3
+
+
+def delete_expense(expense_id, user_email=None, expense=None):
     """
-    Delete an expense from DynamoDB
+    Delete an expense (and its participant index items) from DynamoDB
+
+    The index items and ledger changes to remove come from a copy of the
+    expense (usually cached). The delete only goes through if that copy's
+    status is still current - otherwise it's retried with the current item.
 
     Args:
         expense_id (str): ID of expense to delete
+        user_email (str, optional): Only delete if this user created the
+            expense or is a participant (checked by DynamoDB in the same
+            call). Leave out for admin scripts.
+        expense (dict, optional): The expense, if the caller already
+            fetched it - saves a lookup
 
     Returns:
         bool: True if deleted successfully
-    """
-    # Step 1: Get the table
-    table = get_table()
 
-    # Step 2: Delete the item
-    table.delete_item(
-        Key={'id': expense_id}  # TODO: What's the key to delete?
-    )
-
-    # Step 3: Return success
+    Raises:
+        ExpenseNotFoundError: The expense doesn't exist
+        ExpenseForbiddenError: user_email isn't involved in the expense
+        ExpenseConflictError: The expense kept changing while we tried
+    """
+    # Step 1: Get the expense (the index keys are built from it)
+    current = expense if expense is not None else get_expense_by_id(expense_id)
+
+    for _ in range(WRITE_MAX_ATTEMPTS):
+        if current is None:
+            expense_cache.invalidate(expense_id)
+            raise ExpenseNotFoundError("Expense not found")
+
+        # Step 2: Delete it and its index items - but only if it exists,
+        # the user is involved and it hasn't changed since we read it
+        condition = Attr('id').exists() & _status_unchanged(current)
+        if user_email is not None:
+            condition = condition & (Attr('user_id').eq(user_email) | Attr('participant_emails').contains(user_email))
+
+        # ...and take an outstanding expense out of the balance ledger
+        ledger_items = balance_ledger.transact_items(balance_ledger.deleted_changes(current))
+
+        try:
+            _transact(expense_deletes(current, condition) + ledger_items)
+            break
+        except ClientError as e:
+            failed, current = _condition_failure(e)
+            if not failed:
+                raise
+
+        # The condition failed - the item as it is now says why
+        if current is not None and user_email is not None and not _is_involved(current, user_email):
+            expense_cache.set(expense_id, current)
+            raise ExpenseForbiddenError("Not authorized to delete this expense")
+    else:
+        expense_cache.invalidate(expense_id)
+        raise ExpenseConflictError("Expense changed while it was being deleted - try again")
+
+    # Step 3: Drop any cached copy (and tell other workers)
+    expense_cache.invalidate(expense_id)
+    change_versions.bump_expense(current)
+
+    # Step 4: Return success
     return True
 
 
@@ -194,35 +754,207 @@ def delete_expense(expense_id):
 # UPDATE OPERATION (Advanced - Optional)
 # =============================================================================
 
-def update_expense_status(expense_id, new_status):
+# Who may set each status, and which statuses it may replace:
+# - Only the creator marks an expense settled
+# - Only a participant (not the creator) marks it pending_review ("I paid")
+# - Anyone involved can reopen it as pending
+STATUS_TRANSITIONS = {
+    'pending': {'from': ['pending_review', 'settled'], 'by': 'involved'},
+    'pending_review': {'from': ['pending'], 'by': 'participant'},
+    'settled': {'from': ['pending', 'pending_review'], 'by': 'creator'},
+}
+
+
+def _status_condition(new_status, user_email):
+    """Build the ConditionExpression enforcing STATUS_TRANSITIONS"""
+    rule = STATUS_TRANSITIONS[new_status]
+
+    if rule['by'] == 'creator':
+        allowed_user = Attr('user_id').eq(user_email)
+    elif rule['by'] == 'participant':
+        allowed_user = Attr('user_id').ne(user_email) & Attr('participant_emails').contains(user_email)
+    else:
+        allowed_user = Attr('user_id').eq(user_email) | Attr('participant_emails').contains(user_email)
+
+    return Attr('id').exists() & allowed_user & Attr('status').is_in(rule['from'])
+
+
+def _status_failure_reason(current, new_status, user_email):
+    """Turn a failed status condition into the matching exception"""
+    if current is None:
+        return ExpenseNotFoundError("Expense not found")
+
+    rule = STATUS_TRANSITIONS[new_status]
+    is_creator = current['user_id'] == user_email
+
+    if rule['by'] == 'creator' and not is_creator:
+        return ExpenseForbiddenError("Only the creator can mark expense as settled")
+    if rule['by'] == 'participant' and (is_creator or user_email not in current.get('participant_emails', [])):
+        return ExpenseForbiddenError("Only participants can mark expense as pending review")
+    if rule['by'] == 'involved' and not _is_involved(current, user_email):
+        return ExpenseForbiddenError("Not authorized to update this expense")
+
+    if current.get('status') not in rule['from']:
+        return ExpenseConflictError(f"Cannot change status from '{current.get('status')}' to '{new_status}'")
+
+    return None  # The change is allowed - the copy we wrote against was stale
+
+
+def update_expense_status(expense_id, new_status, user_email):
     """
-    Update the status of an expense (e.g., 'pending' -> 'paid')
+    Update the status of an expense (e.g., 'pending' -> 'settled')
 
-    This is an ADVANCED operation - come back to this later!
+    Permission and transition rules (STATUS_TRANSITIONS) are checked by
+    DynamoDB in the same transaction as the balance ledger update. The
+    ledger change depends on the old status, taken from a copy of the
+    expense (usually cached) - if that copy was stale, we retry.
 
     Args:
         expense_id (str): ID of expense to update
-        new_status (str): New status value
+        new_status (str): New status value (a key of STATUS_TRANSITIONS)
+        user_email (str): Who is making the change
 
     Returns:
         dict: Updated expense
+
+    Raises:
+        ExpenseNotFoundError: The expense doesn't exist
+        ExpenseForbiddenError: The user may not set this status
+        ExpenseConflictError: The current status can't change to new_status
+            (or kept changing while we tried)
     """
-    table = get_table()
+    current = get_expense_by_id(expense_id)
+
+    for _ in range(WRITE_MAX_ATTEMPTS):
+        if current is None:
+            expense_cache.invalidate(expense_id)
+            raise ExpenseNotFoundError("Expense not found")
+
+        # UpdateExpression is like SQL UPDATE SET
+        update = {
+            'TableName': settings.DYNAMODB_TABLE_EXPENSES,
+            'Key': {'id': expense_id},
+            'UpdateExpression': 'SET #status = :new_status',
+            'ReturnValuesOnConditionCheckFailure': 'ALL_OLD',  # On failure, so we can say why
+            **_condition_params(_status_condition(new_status, user_email) & _status_unchanged(current)),
+        }
+        update['ExpressionAttributeNames']['#status'] = 'status'  # 'status' is a reserved word, so we use a placeholder
+        update['ExpressionAttributeValues'] = {**update.get('ExpressionAttributeValues', {}), ':new_status': new_status}
+
+        # The old status tells the ledger whether the debt was settled or reopened
+        updated_expense = {**current, 'status': new_status}
+        ledger_items = balance_ledger.transact_items(balance_ledger.status_changes(updated_expense, current.get('status')))
+
+        try:
+            _transact([{'Update': update}] + ledger_items)
+            break
+        except ClientError as e:
+            failed, current = _condition_failure(e)
+            if not failed:
+                raise
+
+        if current is not None:
+            expense_cache.set(expense_id, current)
+            reason = _status_failure_reason(current, new_status, user_email)
+            if reason is not None:
+                raise reason
+    else:
+        expense_cache.invalidate(expense_id)
+        raise ExpenseConflictError("Expense changed while its status was being updated - try again")
+
+    # Other workers still hold the old status - invalidate, then cache the new copy here
+    expense_cache.invalidate(expense_id)
+    expense_cache.set(expense_id, updated_expense)
+    change_versions.bump_expense(updated_expense)
+
+    return updated_expense
 
-    # UpdateExpression is like SQL UPDATE SET
-    response = table.update_item(
-        Key={'id': expense_id},
-        UpdateExpression='SET #status = :new_status',
-        ExpressionAttributeNames={
-            '#status': 'status'  # 'status' is a reserved word, so we use a placeholder
-        },
-        ExpressionAttributeValues={
-            ':new_status': new_status
-        },
-        ReturnValues='ALL_NEW'  # Return the updated item
-    )
 
-    return response['Attributes']
+# =============================================================================
+# BATCH OPERATIONS
+# =============================================================================
+# BatchGetItem takes at most 100 keys per call. Under throttling DynamoDB
+# processes only part of a batch and hands the rest back as "unprocessed",
+# so we retry those with backoff. Batch writes go through transactions
+# (see TRANSACTIONS above).
+
+BATCH_GET_LIMIT = 100
+BATCH_MAX_RETRIES = 8
+
+
+class BatchIncompleteError(Exception):
+    """Raised when DynamoDB keeps returning unprocessed batch items"""
+
+
+def _backoff(attempt):
+    """Sleep before retrying unprocessed items or a conflicting transaction (50ms, 100ms, ... capped at 2s)"""
+    if attempt >= BATCH_MAX_RETRIES:
+        raise BatchIncompleteError(f"Batch still had unprocessed items after {BATCH_MAX_RETRIES} retries")
+    time.sleep(min(0.05 * (2 ** attempt), 2.0))
+
+
+def batch_get_expenses(expense_ids, summary=False):
+    """
+    Fetch many expenses by ID with BatchGetItem (100 keys per call)
+
+    Args:
+        expense_ids (list): Expense IDs, in the order the caller wants them back
+        summary (bool): Only read the SUMMARY_ATTRIBUTES of each expense
+
+    Returns:
+        list: Expenses that exist, in the same order as expense_ids
+    """
+    dynamodb = get_dynamodb()
+    table_name = settings.DYNAMODB_TABLE_EXPENSES
+    unique_ids = list(dict.fromkeys(expense_ids))  # BatchGetItem rejects duplicate keys
+    found = {}
+
+    for start in range(0, len(unique_ids), BATCH_GET_LIMIT):
+        request = {table_name: {'Keys': [{'id': expense_id} for expense_id in unique_ids[start:start + BATCH_GET_LIMIT]]}}
+        if summary:
+            request[table_name].update(SUMMARY_PROJECTION)
+
+        # DynamoDB may hand back some keys as "unprocessed" when throttled - retry those
+        attempt = 0
+        while request:
+            response = dynamodb.batch_get_item(RequestItems=request)
+            for item in response['Responses'].get(table_name, []):
+                found[item['id']] = item
+
+            request = response.get('UnprocessedKeys') or None
+            if request:
+                _backoff(attempt)
+                attempt += 1
+
+    return [found[expense_id] for expense_id in expense_ids if expense_id in found]
+
+
+def batch_create_expenses(expenses):
+    """
+    Save many new expenses (and their participant index items) at once
+
+    Expenses are packed into as few transactions as fit, each holding
+    whole expenses with their index items and ledger updates - so an
+    expense is never saved without its index items or balances.
+
+    Args:
+        expenses (list): Expense dicts, same shape as create_expense() takes
+
+    Returns:
+        list: The saved expenses
+    """
+    for expense in expenses:
+        expense.update(derived_attributes(expense))
+
+    groups = ((expense_puts(expense), balance_ledger.created_changes(expense)) for expense in expenses)
+    for items in _transaction_batches(groups):
+        _transact(items)
+
+    for expense in expenses:
+        expense_cache.set(expense['id'], expense)
+        change_versions.bump_expense(expense)
+
+    return expenses
 
 
 # =============================================================================
@@ -0,0 +1,173 @@
+"""
+Expense Codec
+=============
+Converts expenses between API shape (floats) and DynamoDB items
+(Decimals), touching only the numeric fields the models declare.
+
+Why?
+- DynamoDB won't take floats, so every expense used to go through
+  convert_floats_to_decimal: a recursive walk over every key of every
+  nested dict and list (ids, names, emails...) looking for floats. A
+  receipt with hundreds of line items meant hundreds of recursive calls
+  for a few hundred prices.
+- The models already say where the numbers are. The codec reads that
+  once at import time - top-level money fields, counts, and which lists
+  hold sub-models with money of their own - and each conversion is then
+  a flat loop over exactly those fields.
+- Money is stored as a Decimal quantized to cents (12.5 -> 12.50,
+  33.333 -> 33.33), so repr noise and sub-cent float artifacts never
+  reach the table and totals add up exactly on the way back out.
+
+Usage:
+    item = expense_codec.encode(expense_data)   # floats -> Decimal, for put_item
+    data = expense_codec.decode(item)           # Decimal -> float/int, for responses
+
+Benchmark: python -m benchmarks.bench_expense_codec
+"""
+
+import types
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, List, Tuple, Union, get_args, get_origin
+from pydantic import BaseModel
+from app.models.expense import Expense, ExpenseSummary
+
+CENT = Decimal('0.01')
+
+
+def to_money(value) -> Decimal:
+    """Float (or int/Decimal) -> Decimal rounded to the cent, half up"""
+    if isinstance(value, float):
+        # Fast path: amounts already in whole cents (almost all of them)
+        cents = value * 100
+        whole = round(cents)
+        if abs(cents - whole) < 1e-6:
+            return Decimal(whole).scaleb(-2)
+        # str() gives the shortest repr (2.675, not 2.67499999...), so
+        # rounding happens on the number the client actually sent
+        value = Decimal(str(value))
+    elif not isinstance(value, Decimal):
+        value = Decimal(value)
+    return value.quantize(CENT, rounding = ROUND_HALF_UP)
+
+
+# =============================================================================
+# SCHEMA
+# =============================================================================
+
+def _unwrap_optional(annotation):
+    """Optional[X] / X | None -> X"""
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+class FieldPlan:
+    """Which fields of one model hold money, counts and money-bearing sub-model lists"""
+
+    def __init__(self, *models):
+        self.money: Tuple[str, ...] = ()
+        self.counts: Tuple[str, ...] = ()
+        self.lists: Tuple[Tuple[str, 'FieldPlan'], ...] = ()
+
+        for model in models:
+            for name, field in model.model_fields.items():
+                annotation = _unwrap_optional(field.annotation)
+
+                if annotation is float and name not in self.money:
+                    self.money += (name,)
+                elif annotation is int and name not in self.counts:
+                    self.counts += (name,)
+                elif get_origin(annotation) in (list, List):
+                    (entry,) = get_args(annotation)
+                    if isinstance(entry, type) and issubclass(entry, BaseModel) and name not in dict(self.lists):
+                        nested = FieldPlan(entry)
+                        if nested.money or nested.counts:
+                            self.lists += ((name, nested),)
+
+
+# =============================================================================
+# CODEC
+# =============================================================================
+
+class ExpenseCodec:
+    """Encode/decode the numeric fields of an expense in one flat pass"""
+
+    def __init__(self, *models):
+        plan = FieldPlan(*models)
+        self.money = plan.money
+        self.counts = plan.counts
+        # One level of nesting is all the models have (participants, items);
+        # a deeper model would need its own plan entry, not recursion
+        self.lists = tuple((name, nested.money, nested.counts) for name, nested in plan.lists)
+
+    def encode(self, expense: Dict) -> Dict:
+        """
+        API dict -> DynamoDB item (in place): money -> cent Decimals
+
+        Args:
+            expense (dict): Expense with float amounts
+
+        Returns:
+            dict: The same dict, ready for put_item
+        """
+        for name in self.money:
+            value = expense.get(name)
+            if value is not None:
+                expense[name] = to_money(value)
+
+        for name, money, counts in self.lists:
+            for entry in expense.get(name) or ():
+                for field in money:
+                    value = entry.get(field)
+                    if value is not None:
+                        entry[field] = to_money(value)
+
+        return expense
+
+    def decode(self, item: Dict) -> Dict:
+        """
+        DynamoDB item -> API dict (a copy): money -> float, counts -> int
+
+        Args:
+            item (dict): Expense as DynamoDB returned it
+
+        Returns:
+            dict: New dict safe to hand to the models or a JSON encoder
+        """
+        expense = dict(item)
+
+        for name in self.money:
+            value = expense.get(name)
+            if value is not None:
+                expense[name] = float(value)
+
+        for name in self.counts:
+            value = expense.get(name)
+            if value is not None:
+                expense[name] = int(value)
+
+        for name, money, counts in self.lists:
+            entries = expense.get(name)
+            if not entries:
+                continue
+            decoded = []
+            for entry in entries:
+                entry = dict(entry)
+                for field in money:
+                    value = entry.get(field)
+                    if value is not None:
+                        entry[field] = float(value)
+                for field in counts:
+                    value = entry.get(field)
+                    if value is not None:
+                        entry[field] = int(value)
+                decoded.append(entry)
+            expense[name] = decoded
+
+        return expense
+
+
+# Covers both full expenses and summaries (item_count comes from the latter)
+expense_codec = ExpenseCodec(Expense, ExpenseSummary)
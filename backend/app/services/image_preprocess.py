@@ -0,0 +1,137 @@
+"""
+Receipt Image Preprocessing
+===========================
+Shrinks phone photos before they go to S3 and Textract.
+
+Why?
+- Phone cameras produce 4-12 megapixel photos (3-8MB). Textract reads a
+  receipt just as well at ~2000px on the long side, so the extra pixels
+  only cost upload time, storage and OCR latency.
+
+Steps (in a worker process - this is CPU work that would hold the GIL):
+    1. Rotate upright using the EXIF orientation tag (phones store photos
+       sideways and set a flag instead of rotating the pixels)
+    2. Convert to grayscale (receipts are black on white anyway)
+    3. Downscale so the long side is at most RECEIPT_MAX_DIMENSION
+    4. Re-encode as JPEG at RECEIPT_JPEG_QUALITY
+
+JPEG is the only output format: Textract reads JPEG, PNG, TIFF and PDF,
+but not WebP.
+
+If the image can't be decoded, or preprocessing wouldn't make it
+smaller, the original bytes are used unchanged.
+
+The worker processes are spawned, not forked: the pool starts on a
+receipt worker thread while the logging listener and the DynamoDB and
+upload thread pools are running, and a forked child can inherit a lock
+one of those threads was holding and hang on it.
+
+Usage:
+    from app.services import image_preprocess
+
+    file_bytes, report = image_preprocess.preprocess(file_bytes)
+    # report = {'original_bytes': 4812391, 'processed_bytes': 402113, 'width': 1500, 'height': 2000, ...}
+"""
+
+import io
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Tuple
+from PIL import Image, ImageOps
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def preprocess_image(file_bytes: bytes, max_dimension: int, quality: int, grayscale: bool) -> Tuple[bytes, Dict]:
+    """
+    Auto-orient, grayscale, downscale and recompress one image
+
+    Pure function of its arguments, so it can run in a worker process.
+
+    Returns:
+        tuple: (image bytes, report dict)
+    """
+    report = {'original_bytes': len(file_bytes), 'processed_bytes': len(file_bytes), 'applied': False}
+
+    try:
+        with Image.open(io.BytesIO(file_bytes)) as image:
+            report['original_size'] = image.size
+
+            # Step 1: Rotate upright (drops the orientation tag)
+            image = ImageOps.exif_transpose(image)
+
+            # Step 2: Grayscale (or plain RGB - JPEG can't hold alpha)
+            image = image.convert('L' if grayscale else 'RGB')
+
+            # Step 3: Downscale, keeping the aspect ratio
+            image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+            # Step 4: Re-encode
+            output = io.BytesIO()
+            image.save(output, format='JPEG', quality=quality, optimize=True)
+            processed = output.getvalue()
+            report['processed_size'] = image.size
+    except Exception as e:
+        # Runs in a worker process, whose logging isn't set up - the caller logs it
+        report['error'] = str(e)
+        return file_bytes, report
+
+    if len(processed) >= len(file_bytes):
+        return file_bytes, report  # Already small - don't make it worse
+
+    report.update(processed_bytes=len(processed), applied=True)
+    return processed, report
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Worker processes for preprocessing (created on first use, spawned - see above)"""
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.RECEIPT_PREPROCESS_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
+
+
+def shutdown():
+    """Stop the worker processes"""
+    global _pool
+
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def preprocess(file_bytes: bytes) -> Tuple[bytes, Dict]:
+    """
+    Preprocess an image in the process pool using the configured settings
+
+    Blocks the calling thread until done - call it from a worker thread
+    (the receipt pipeline), never from the event loop.
+
+    Returns:
+        tuple: (image bytes, report dict)
+    """
+    future = get_pool().submit(
+        preprocess_image,
+        file_bytes,
+        settings.RECEIPT_MAX_DIMENSION,
+        settings.RECEIPT_JPEG_QUALITY,
+        settings.RECEIPT_GRAYSCALE
+    )
+    processed, report = future.result()
+
+    if 'error' in report:
+        logger.warning("Could not preprocess image, using original: %s", report['error'])
+
+    return processed, report
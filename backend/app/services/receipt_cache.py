@@ -0,0 +1,168 @@
+"""
+Receipt Extraction Cache
+========================
+Remembers what Textract extracted from each receipt image, keyed by the
+SHA-256 of the image bytes.
+
+Why?
+- People re-upload the same photo (retries, editing an expense, a friend
+  sending it twice). Each upload used to pay for a new S3 object and a
+  full AnalyzeExpense call that takes seconds.
+- With the hash as the key, an identical upload returns the stored
+  extraction and S3 location in milliseconds.
+
+Entries are scoped per user, so one person's upload never hands out a
+receipt stored under someone else's S3 prefix.
+
+Backends:
+- 'memory': LRU dict in this process (default)
+- 'sqlite': file on disk - survives restarts, shared by local workers
+
+Both evict the least recently used entry beyond RECEIPT_CACHE_MAX_ENTRIES.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from app.config import settings
+from app.services.cache import LRUCache
+
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class MemoryBackend:
+    """In-process LRU (no expiry - an image's extraction never changes)"""
+
+    def __init__(self, max_entries):
+        self._cache = LRUCache(max_size=max_entries)
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self._cache.get(key)
+
+    def put(self, key: str, entry: Dict):
+        self._cache.set(key, entry)
+
+    def size(self) -> int:
+        return self._cache.stats()['size']
+
+
+class SQLiteBackend:
+    """SQLite table with a last_used column for LRU eviction"""
+
+    def __init__(self, path, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS receipt_cache ('
+            'key TEXT PRIMARY KEY, entry TEXT NOT NULL, last_used REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS receipt_cache_last_used ON receipt_cache (last_used)')
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute('SELECT entry FROM receipt_cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE receipt_cache SET last_used = ? WHERE key = ?', (time.time(), key))
+            self._conn.commit()
+
+        return json.loads(row[0])
+
+    def put(self, key: str, entry: Dict):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO receipt_cache (key, entry, last_used) VALUES (?, ?, ?)',
+                (key, json.dumps(entry), time.time())
+            )
+            # Evict the least recently used entries beyond the limit
+            self._conn.execute(
+                'DELETE FROM receipt_cache WHERE key IN ('
+                'SELECT key FROM receipt_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM receipt_cache').fetchone()[0]
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+class ReceiptCache:
+    """Content-addressed store of receipt extractions with hit/miss counters"""
+
+    def __init__(self, backend, enabled=True):
+        self.backend = backend
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(user_id: str, digest: str) -> str:
+        return f"{user_id}:{digest}"
+
+    def get(self, user_id: str, digest: str) -> Optional[Dict]:
+        """
+        Look up an earlier extraction of the same image
+
+        Returns:
+            dict or None: {'extraction': {...}, 's3_key': ..., 's3_url': ...}
+        """
+        if not self.enabled:
+            return None
+
+        entry = self.backend.get(self._key(user_id, digest))
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return entry
+
+    def put(self, user_id: str, digest: str, extraction: Dict, s3_key: str, s3_url: str):
+        """Remember a successful extraction and where the image is stored"""
+        if not self.enabled:
+            return
+
+        self.backend.put(self._key(user_id, digest), {
+            'extraction': extraction,
+            's3_key': s3_key,
+            's3_url': s3_url,
+        })
+
+    def stats(self) -> Dict:
+        """Return counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'backend': type(self.backend).__name__,
+            'size': self.backend.size(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def create_receipt_cache():
+    """Build the cache chosen by RECEIPT_CACHE_BACKEND ('memory' or 'sqlite')"""
+    if settings.RECEIPT_CACHE_BACKEND == 'sqlite':
+        backend = SQLiteBackend(settings.RECEIPT_CACHE_DB_PATH, settings.RECEIPT_CACHE_MAX_ENTRIES)
+    else:
+        backend = MemoryBackend(settings.RECEIPT_CACHE_MAX_ENTRIES)
+
+    return ReceiptCache(backend, enabled=settings.RECEIPT_CACHE_ENABLED)
+
+
+receipt_cache = create_receipt_cache()
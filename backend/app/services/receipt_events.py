@@ -0,0 +1,79 @@
+"""
+Receipt Upload Events
+=====================
+Starts receipt processing when a file lands in S3 via a presigned POST.
+
+Why?
+- With presigned uploads the bytes go browser -> S3 directly; the API
+  never sees them. S3 tells us a receipt arrived with an object-created
+  event, forwarded to POST /api/receipts/events (by a small Lambda, an
+  EventBridge API destination, or a test script).
+
+Accepted event shapes:
+- S3 notification: {"Records": [{"eventName": "ObjectCreated:Post",
+  "s3": {"bucket": {"name": ...}, "object": {"key": ...}}}]}
+  (keys are URL-encoded in this format)
+- EventBridge: {"detail-type": "Object Created",
+  "detail": {"bucket": {"name": ...}, "object": {"key": ...}}}
+
+Only objects in our bucket under receipts/{user_id}/ are processed; the
+owner is read from the key, which the presigned POST forced to start
+with the uploader's prefix.
+"""
+
+import logging
+from typing import Dict, List, Tuple
+from urllib.parse import unquote_plus
+from app.config import settings
+from app.services.receipt_jobs import receipt_job_queue
+
+logger = logging.getLogger(__name__)
+
+
+def created_objects(event: Dict) -> List[Tuple[str, str]]:
+    """
+    Pull (bucket, key) pairs for created objects out of an event
+
+    Returns:
+        list: [(bucket, key), ...] - empty for events we don't handle
+    """
+    if event.get('detail-type') == 'Object Created':
+        detail = event.get('detail', {})
+        return [(detail.get('bucket', {}).get('name'), detail.get('object', {}).get('key'))]
+
+    objects = []
+    for record in event.get('Records', []):
+        if not record.get('eventName', '').startswith('ObjectCreated:'):
+            continue
+        s3 = record.get('s3', {})
+        objects.append((s3.get('bucket', {}).get('name'), unquote_plus(s3.get('object', {}).get('key', ''))))
+
+    return objects
+
+
+def receipt_owner(key: str):
+    """User ID from receipts/{user_id}/{file}, or None for other keys"""
+    parts = (key or '').split('/')
+    if len(parts) != 3 or parts[0] != 'receipts' or not parts[1] or not parts[2]:
+        return None
+    return parts[1]
+
+
+def handle_s3_event(event: Dict) -> List[Dict]:
+    """
+    Queue processing for every new receipt in an S3 event
+
+    Returns:
+        list: Job records (existing ones for keys already seen)
+    """
+    jobs = []
+
+    for bucket, key in created_objects(event):
+        user_id = receipt_owner(key)
+        if bucket != settings.S3_BUCKET_NAME or user_id is None:
+            logger.info("Skipping S3 event: not a receipt upload", extra={'bucket': bucket, 's3_key': key})
+            continue
+
+        jobs.append(receipt_job_queue.submit_stored(key, user_id))
+
+    return jobs
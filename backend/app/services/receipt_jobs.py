@@ -0,0 +1,293 @@
+"""
+Receipt Job Queue
+=================
+Runs receipt processing in the background so uploads return right away.
+
+Why?
+- S3 upload + Textract often takes several seconds. Holding the HTTP
+  request open that long ties up workers and makes mobile clients time out.
+- Instead, an upload becomes a job: the client gets a job ID immediately
+  and polls GET /api/receipts/jobs/{id} (or streams its events).
+
+Pieces:
+- Job stores: where job status lives. InMemoryJobStore for a single
+  worker/dev, SQLiteJobStore so several workers on one machine share jobs
+  and jobs survive restarts. Neither needs AWS.
+- ReceiptJobQueue: thread pools that run receipt_pipeline.process_receipt
+  (or process_stored_receipt, for direct-to-S3 uploads) and record
+  progress in the store. PDFs get their own pool (RECEIPT_PDF_WORKERS):
+  Textract's asynchronous analysis can keep a thread waiting for minutes,
+  and a few folios must not stall every photo queued behind them.
+
+Job records look like:
+    {'id': '...', 'user_id': 'winston@gmail.com', 'filename': 'dinner.jpg',
+     'status': 'processing',      # queued -> processing -> done / failed
+     'stage': 'analyzing',        # queued, preprocessing, uploading, analyzing, done, failed
+     'result': None,              # extracted data once done
+     'error': None,               # message if failed
+     'created_at': '...', 'updated_at': '...'}
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import IO, Dict, Optional
+from app.config import settings
+from app.log import in_context
+from app.services import receipt_pipeline
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = {'done', 'failed'}
+
+
+def _now():
+    return datetime.utcnow().isoformat()
+
+
+def stored_job_id(s3_key: str) -> str:
+    """Stable job ID for a receipt uploaded straight to S3"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"s3://{settings.S3_BUCKET_NAME}/{s3_key}"))
+
+
+# =============================================================================
+# JOB STORES
+# =============================================================================
+
+class InMemoryJobStore:
+    """Keeps jobs in a dict - fine for one worker process"""
+
+    def __init__(self, ttl_seconds):
+        self.ttl_seconds = ttl_seconds
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: Dict):
+        with self._lock:
+            self._prune()
+            self._jobs[job['id']] = dict(job)
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields, updated_at=_now())
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _prune(self):
+        """Forget jobs older than the TTL (called under the lock)"""
+        cutoff = (datetime.utcnow() - timedelta(seconds=self.ttl_seconds)).isoformat()
+        for job_id in [job_id for job_id, job in self._jobs.items() if job['created_at'] < cutoff]:
+            del self._jobs[job_id]
+
+
+class SQLiteJobStore:
+    """Keeps jobs in a SQLite file - shared by workers on the same machine"""
+
+    COLUMNS = ['id', 'user_id', 'filename', 'status', 'stage', 'result', 'error', 'created_at', 'updated_at']
+
+    def __init__(self, path, ttl_seconds):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')  # Readers don't block the writer
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS receipt_jobs ('
+            'id TEXT PRIMARY KEY, user_id TEXT, filename TEXT, status TEXT, stage TEXT, '
+            'result TEXT, error TEXT, created_at TEXT, updated_at TEXT)'
+        )
+        self._conn.commit()
+
+    def create(self, job: Dict):
+        cutoff = (datetime.utcnow() - timedelta(seconds=self.ttl_seconds)).isoformat()
+        row = [json.dumps(job[column]) if column == 'result' else job[column] for column in self.COLUMNS]
+
+        with self._lock:
+            self._conn.execute('DELETE FROM receipt_jobs WHERE created_at < ?', (cutoff,))
+            self._conn.execute(f'INSERT INTO receipt_jobs VALUES ({", ".join("?" * len(self.COLUMNS))})', row)
+            self._conn.commit()
+
+    def update(self, job_id: str, **fields):
+        fields['updated_at'] = _now()
+        if 'result' in fields:
+            fields['result'] = json.dumps(fields['result'])
+
+        assignments = ', '.join(f'{column} = ?' for column in fields)
+        with self._lock:
+            self._conn.execute(f'UPDATE receipt_jobs SET {assignments} WHERE id = ?', [*fields.values(), job_id])
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                f'SELECT {", ".join(self.COLUMNS)} FROM receipt_jobs WHERE id = ?', (job_id,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        job = dict(zip(self.COLUMNS, row))
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+
+def create_job_store():
+    """Build the job store chosen by RECEIPT_JOB_STORE ('memory' or 'sqlite')"""
+    if settings.RECEIPT_JOB_STORE == 'sqlite':
+        return SQLiteJobStore(settings.RECEIPT_JOB_DB_PATH, settings.RECEIPT_JOB_TTL_SECONDS)
+    return InMemoryJobStore(settings.RECEIPT_JOB_TTL_SECONDS)
+
+
+# =============================================================================
+# JOB QUEUE
+# =============================================================================
+
+class ReceiptJobQueue:
+    """Runs receipt processing jobs on bounded pools of worker threads (photos, PDFs)"""
+
+    def __init__(self, store, max_workers, pdf_workers):
+        self.store = store
+        self.max_workers = max_workers
+        self.pdf_workers = pdf_workers
+        self._executors = {}  # 'receipts' / 'receipts-pdf' -> ThreadPoolExecutor
+        self._futures = {}  # job_id -> Future, for jobs started by this process
+        self._lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+
+    def _get_executor(self, pdf=False):
+        name = 'receipts-pdf' if pdf else 'receipts'
+        with self._lock:
+            if name not in self._executors:
+                self._executors[name] = ThreadPoolExecutor(
+                    max_workers=self.pdf_workers if pdf else self.max_workers,
+                    thread_name_prefix=name
+                )
+            return self._executors[name]
+
+    def submit(self, file: IO[bytes], file_name: str, user_id: str, digest: str, pdf: bool = False) -> Dict:
+        """
+        Queue a receipt for processing
+
+        The job takes ownership of `file` and closes it when it finishes.
+        PDFs (pdf=True) run on the PDF workers.
+
+        Returns:
+            dict: The new job record (status 'queued')
+        """
+        return self._start(
+            str(uuid.uuid4()),
+            file_name,
+            user_id,
+            lambda report: receipt_pipeline.process_receipt(file, file_name, user_id, digest, report_stage=report),
+            cleanup=file.close,  # Deletes the spooled temp file, if it spilled to disk
+            pdf=pdf
+        )
+
+    def submit_stored(self, s3_key: str, user_id: str) -> Dict:
+        """
+        Queue a receipt that's already in S3 (uploaded with a presigned POST)
+
+        The job ID is derived from the key, so S3 delivering the same event
+        twice doesn't process the receipt twice, and results can be looked
+        up by key.
+
+        Returns:
+            dict: The job record (existing one if this key was already queued)
+        """
+        job_id = stored_job_id(s3_key)
+
+        with self._submit_lock:
+            existing = self.store.get(job_id)
+            if existing:
+                return existing
+
+            return self._start(
+                job_id,
+                s3_key.rsplit('/', 1)[-1],
+                user_id,
+                lambda report: receipt_pipeline.process_stored_receipt(
+                    settings.S3_BUCKET_NAME, s3_key, report_stage=report
+                ),
+                pdf=s3_key.lower().endswith('.pdf')
+            )
+
+    def _start(self, job_id, file_name, user_id, work, cleanup=None, pdf=False) -> Dict:
+        """Record a queued job and hand `work(report_stage)` to a worker"""
+        now = _now()
+        job = {
+            'id': job_id,
+            'user_id': user_id,
+            'filename': file_name,
+            'status': 'queued',
+            'stage': 'queued',
+            'result': None,
+            'error': None,
+            'created_at': now,
+            'updated_at': now,
+        }
+        self.store.create(job)
+
+        # in_context: the worker's logs carry the request ID of the upload
+        future = self._get_executor(pdf).submit(in_context(self._run), job['id'], work, cleanup)
+        with self._lock:
+            self._futures[job['id']] = future
+        future.add_done_callback(lambda _: self._forget(job['id']))
+
+        return job
+
+    async def wait(self, job_id: str) -> Optional[Dict]:
+        """
+        Wait (without blocking the event loop) until a job started by this
+        process finishes, then return its record
+        """
+        with self._lock:
+            future = self._futures.get(job_id)
+
+        if future is not None:
+            try:
+                await asyncio.wrap_future(future)
+            except Exception:
+                pass  # The failure is recorded on the job
+
+        return self.store.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self.store.get(job_id)
+
+    def shutdown(self):
+        with self._lock:
+            executors, self._executors = list(self._executors.values()), {}
+        for executor in executors:
+            executor.shutdown(wait=True)
+
+    def _forget(self, job_id):
+        with self._lock:
+            self._futures.pop(job_id, None)
+
+    def _run(self, job_id, work, cleanup):
+        """Worker thread: process the receipt and record progress"""
+        self.store.update(job_id, status='processing')
+
+        try:
+            result = work(lambda stage: self.store.update(job_id, stage=stage))
+        except Exception as e:
+            logger.exception("Receipt job failed", extra={'job_id': job_id})
+            self.store.update(job_id, status='failed', stage='failed', error=str(e))
+            raise
+        finally:
+            if cleanup:
+                cleanup()
+
+        self.store.update(job_id, status='done', stage='done', result=result)
+        return result
+
+
+receipt_job_queue = ReceiptJobQueue(create_job_store(), settings.RECEIPT_WORKERS, settings.RECEIPT_PDF_WORKERS)
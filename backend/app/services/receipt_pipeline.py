@@ -0,0 +1,267 @@
+"""
+Receipt Processing Pipeline
+===========================
+The steps that turn an uploaded receipt image into extracted data.
+
+Flow:
+    1. Hash the image - if this user uploaded the same bytes before,
+       return the cached extraction and stop
+    2. Shrink the photo: EXIF rotate, grayscale, downscale, recompress
+       (see image_preprocess.py - skipped if RECEIPT_PREPROCESS_ENABLED=false)
+    3. Upload the image to S3
+    4. Run Textract AnalyzeExpense on the image
+    5. Cache and return the extracted data with the receipt URL attached
+
+Steps 3 and 4 run one of two ways:
+- Overlapped (RECEIPT_OVERLAP_UPLOAD, default): Textract gets the image
+  bytes inline while the S3 upload runs on another thread. Latency is
+  about max(upload, OCR) instead of upload + OCR.
+- Sequential: upload first, then point Textract at the S3 object. Used
+  when overlap is off, or when the image is bigger than
+  RECEIPT_OVERLAP_MAX_BYTES (Textract accepts less inline than from S3).
+
+PDFs (multi-page folios and invoices) skip preprocessing and overlap:
+they're uploaded first, then read with Textract's asynchronous expense
+analysis, which handles any number of pages.
+
+Either way the receipt is always stored: if Textract fails the result is
+an 'error' extraction that still carries receipt_url, so the image isn't
+orphaned in S3.
+
+This runs on background workers (see receipt_jobs.py), never on the
+event loop - both steps are blocking AWS calls that can take seconds.
+"""
+
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Callable, Dict, Optional, Tuple
+from app.config import settings
+from app.log import in_context
+from app.services import image_preprocess
+from app.services.receipt_cache import receipt_cache
+from app.services.s3 import s3_service
+from app.services.textract import textract_service
+
+logger = logging.getLogger(__name__)
+
+_upload_executor = None
+_upload_executor_lock = threading.Lock()
+
+
+def get_upload_executor() -> ThreadPoolExecutor:
+    """Threads that run S3 uploads alongside Textract (one per receipt worker)"""
+    global _upload_executor
+
+    with _upload_executor_lock:
+        if _upload_executor is None:
+            _upload_executor = ThreadPoolExecutor(
+                max_workers=settings.RECEIPT_WORKERS,
+                thread_name_prefix='receipt-upload'
+            )
+        return _upload_executor
+
+
+def shutdown():
+    """Wait for in-flight uploads and stop the upload threads"""
+    global _upload_executor
+
+    with _upload_executor_lock:
+        executor, _upload_executor = _upload_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def _file_size(file: IO[bytes]) -> int:
+    """Size of a rewound file object (leaves it rewound)"""
+    file.seek(0, io.SEEK_END)
+    size = file.tell()
+    file.seek(0)
+    return size
+
+
+# Every PDF starts with this - the declared content type is up to the client
+PDF_SIGNATURE = b'%PDF-'
+
+
+def is_pdf(file: IO[bytes]) -> bool:
+    """Sniff the PDF signature (leaves the file rewound)"""
+    header = file.read(len(PDF_SIGNATURE))
+    file.seek(0)
+    return header == PDF_SIGNATURE
+
+
+def _s3_key(s3_url: str) -> str:
+    return s3_service.key_from_url(s3_url)
+
+
+def shrink_image(file: IO[bytes], file_name: str) -> Tuple[IO[bytes], str, Dict]:
+    """
+    Preprocess the image in the process pool
+
+    The worker process needs the image's bytes, so this is the one step
+    that reads a spooled upload into memory whole. That is bounded by
+    RECEIPT_MAX_UPLOAD_BYTES, checked while the upload was spooled (PDFs,
+    which may be bigger, skip this step), and the worker decodes the
+    full bitmap anyway. If preprocessing doesn't shrink the image, the
+    spooled file is handed back instead of keeping a second copy.
+
+    Returns:
+        tuple: (file object to upload, its file name, before/after report)
+    """
+    processed, report = image_preprocess.preprocess(file.read())
+
+    if not report['applied']:
+        file.seek(0)
+        return file, file_name, report
+
+    file_name = f"{file_name.rsplit('.', 1)[0]}.jpg"
+    logger.debug("Preprocessed receipt image", extra={'original_bytes': report['original_bytes'], 'processed_bytes': report['processed_bytes']})
+
+    return io.BytesIO(processed), file_name, report
+
+
+def upload_then_analyze(file: IO[bytes], file_name: str, user_id: str, report, pdf=False) -> Tuple[str, Dict]:
+    """
+    Upload to S3, then run Textract on the stored object
+    (asynchronous multi-page analysis for PDFs)
+
+    Returns:
+        tuple: (s3_url, extracted_data)
+    """
+    report('uploading')
+
+    s3_url = s3_service.upload_fileobj(
+        fileobj = file,
+        file_name = file_name,
+        user_id = user_id
+    )
+
+    report('analyzing')
+
+    analyze = textract_service.analyze_document_async if pdf else textract_service.analyze_receipt
+    extracted_data = analyze(
+        s3_bucket = settings.S3_BUCKET_NAME,
+        s3_key = _s3_key(s3_url)
+    )
+
+    return s3_url, extracted_data
+
+
+def upload_and_analyze(file: IO[bytes], file_name: str, user_id: str, report) -> Tuple[str, Dict]:
+    """
+    Run the S3 upload and Textract (on the inline bytes) at the same time
+
+    Returns:
+        tuple: (s3_url, extracted_data)
+
+    Raises:
+        Exception: If the S3 upload fails (Textract failures don't raise)
+    """
+    report('analyzing')
+
+    file_bytes = file.read()  # Small enough to hold - see RECEIPT_OVERLAP_MAX_BYTES
+    upload = get_upload_executor().submit(
+        in_context(s3_service.upload_fileobj),  # Its logs keep the request ID
+        fileobj = io.BytesIO(file_bytes),
+        file_name = file_name,
+        user_id = user_id
+    )
+
+    try:
+        extracted_data = textract_service.analyze_receipt_bytes(file_bytes)
+    finally:
+        # Always let the upload finish, so the receipt is stored (and the
+        # caller sees upload errors) whatever Textract did
+        s3_url = upload.result()
+
+    return s3_url, extracted_data
+
+
+def process_receipt(
+    file: IO[bytes],
+    file_name: str,
+    user_id: str,
+    digest: str,
+    report_stage: Optional[Callable[[str], None]] = None
+) -> Dict:
+    """
+    Upload a receipt and extract its data
+
+    Args:
+        file: The image, as a rewound file object (see upload_stream.py)
+        file_name: Original file name (used for the extension)
+        user_id: Owner's email (receipts are stored under their prefix)
+        digest: SHA-256 of the image, computed while it was received
+        report_stage: Called with the name of each step as it starts
+
+    Returns:
+        dict: Extracted data (merchant, total, items, ...) plus receipt_url
+    """
+    report = report_stage or (lambda stage: None)
+
+    # Step 1: Same image as before? Skip S3 and Textract entirely
+    cached = receipt_cache.get(user_id, digest)
+    if cached is not None:
+        logger.info("Receipt cache hit", extra={'user_id': user_id, 'digest': digest[:12]})
+        return {**cached['extraction'], 'receipt_url': cached['s3_url']}
+
+    pdf = is_pdf(file)
+    if pdf and not file_name.lower().endswith('.pdf'):
+        file_name = f"{file_name}.pdf"  # The S3 key's extension sets its content type
+
+    # Step 2: Shrink the photo before it's uploaded and read
+    preprocessing = None
+    if settings.RECEIPT_PREPROCESS_ENABLED and not pdf:
+        report('preprocessing')
+        file, file_name, preprocessing = shrink_image(file, file_name)
+
+    # Steps 3 + 4: Upload to S3 and extract data with Textract
+    if pdf:
+        s3_url, extracted_data = upload_then_analyze(file, file_name, user_id, report, pdf=True)
+    elif settings.RECEIPT_OVERLAP_UPLOAD and _file_size(file) <= settings.RECEIPT_OVERLAP_MAX_BYTES:
+        s3_url, extracted_data = upload_and_analyze(file, file_name, user_id, report)
+    else:
+        s3_url, extracted_data = upload_then_analyze(file, file_name, user_id, report)
+
+    # Step 5: Remember successful extractions, then add receipt URL to response
+    if extracted_data.get('confidence') != 'error':
+        receipt_cache.put(user_id, digest, extracted_data, _s3_key(s3_url), s3_url)
+
+    extracted_data = {**extracted_data, 'receipt_url': s3_url}
+    if preprocessing:
+        extracted_data['preprocessing'] = preprocessing
+
+    logger.info(
+        "Receipt processed",
+        extra={'user_id': user_id, 'merchant': extracted_data['merchant'], 'confidence': extracted_data.get('confidence'), 'pdf': pdf}
+    )
+    return extracted_data
+
+
+def process_stored_receipt(
+    s3_bucket: str,
+    s3_key: str,
+    report_stage: Optional[Callable[[str], None]] = None
+) -> Dict:
+    """
+    Extract data from a receipt the client already uploaded to S3 itself
+    (presigned POST) - no upload step, Textract reads the object directly
+
+    Returns:
+        dict: Extracted data plus receipt_url
+    """
+    report = report_stage or (lambda stage: None)
+
+    report('analyzing')
+
+    analyze = textract_service.analyze_document_async if s3_key.lower().endswith('.pdf') else textract_service.analyze_receipt
+    extracted_data = analyze(s3_bucket = s3_bucket, s3_key = s3_key)
+    extracted_data = {**extracted_data, 'receipt_url': s3_service.get_url(s3_key)}
+
+    logger.info(
+        "Receipt processed",
+        extra={'s3_key': s3_key, 'merchant': extracted_data['merchant'], 'confidence': extracted_data.get('confidence')}
+    )
+    return extracted_data
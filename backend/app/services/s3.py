@@ -1,29 +1,29 @@
 
-import boto3
+import logging
+from boto3.s3.transfer import TransferConfig
 from app.config import settings
+from app.services import aws_clients
+
+logger = logging.getLogger(__name__)
 
 
 class S3Service:
 
     def __init__(self):
         # Job 1: Connect to AWS S3
-        # Creates boto3 S3 client using credentials
-        print("Initializing S3 Service")
-        self.s3_client = boto3.client(
-            's3',
-            region_name=settings.AWS_REGION,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-        )
+        # Uses the shared, pooled S3 client from the registry
+        self.s3_client = aws_clients.get_client('s3')
 
         self.bucket_name = settings.S3_BUCKET_NAME
-        print(f"[SUCCESS] Connected to S3 bucket: {self.bucket_name}")
+        self.transfer_config = TransferConfig(
+            multipart_threshold = settings.S3_MULTIPART_THRESHOLD_BYTES,
+            multipart_chunksize = settings.S3_MULTIPART_CHUNK_BYTES,
+            max_concurrency = settings.S3_MULTIPART_CONCURRENCY
+        )
+        logger.info("S3 service ready", extra={'bucket': self.bucket_name})
     
-    def upload_file(self, file_bytes, file_name, user_id):
-        # Job 2: Upload file to S3
-        # Uploads file to S3 bucket with a unique key
-
-        print(f"Uploading receipt: {file_name} for user: {user_id}")
+    def build_key(self, file_name, user_id):
+        # Builds a unique key under the user's prefix
         import uuid
         from datetime import datetime
 
@@ -31,17 +31,77 @@ class S3Service:
         unique_id = str(uuid.uuid4())[:8]
         file_extension = file_name.split('.')[-1].lower()
 
-        s3_key = f"receipts/{user_id}/{timestamp}_{unique_id}.{file_extension}"
+        return f"receipts/{user_id}/{timestamp}_{unique_id}.{file_extension}"
+
+    def content_type(self, s3_key):
+        file_extension = s3_key.split('.')[-1]
+        return 'application/pdf' if file_extension == 'pdf' else f"image/{file_extension}"
+
+    def get_url(self, s3_key):
+        if settings.S3_ENDPOINT_URL:
+            return f"{settings.S3_ENDPOINT_URL.rstrip('/')}/{self.bucket_name}/{s3_key}"
+        return f"https://{self.bucket_name}.s3.{settings.AWS_REGION}.amazonaws.com/{s3_key}"
+
+    def key_from_url(self, s3_url):
+        # Inverse of get_url (every receipt key starts with receipts/)
+        return 'receipts/' + s3_url.split('/receipts/', 1)[1]
+
+    def presign_upload(self, file_name, user_id, content_type, max_bytes):
+        # Job 3: Let the browser upload straight to S3
+        # Returns a presigned POST for one new key under the user's prefix;
+        # S3 itself rejects other keys, content types or oversized files
+
+        s3_key = self.build_key(file_name, user_id)
+
+        presigned = self.s3_client.generate_presigned_post(
+            Bucket = self.bucket_name,
+            Key = s3_key,
+            Fields = {'Content-Type': content_type},
+            Conditions = [
+                {'Content-Type': content_type},
+                ['starts-with', '$key', f"receipts/{user_id}/"],
+                ['content-length-range', 1, max_bytes],
+            ],
+            ExpiresIn = settings.RECEIPT_PRESIGN_EXPIRES_SECONDS
+        )
+
+        return {'url': presigned['url'], 'fields': presigned['fields'], 'key': s3_key}
+
+    def upload_file(self, file_bytes, file_name, user_id):
+        # Job 2: Upload file to S3
+        # Uploads file to S3 bucket with a unique key
+
+        s3_key = self.build_key(file_name, user_id)
 
         self.s3_client.put_object(
             Bucket = self.bucket_name,
             Key = s3_key,
             Body = file_bytes,
-            ContentType = f"image/{file_extension}"
+            ContentType = self.content_type(s3_key)
+        )
+
+        s3_url = self.get_url(s3_key)
+        logger.debug("Uploaded receipt", extra={'user_id': user_id, 's3_key': s3_key, 'bytes': len(file_bytes)})
+        return s3_url
+
+    def upload_fileobj(self, fileobj, file_name, user_id):
+        # Job 2 (streaming): Upload a file object to S3
+        # boto3's transfer manager reads it in parts, switching to a multipart
+        # upload above S3_MULTIPART_THRESHOLD_BYTES - the whole file is never
+        # held in memory at once
+
+        s3_key = self.build_key(file_name, user_id)
+
+        self.s3_client.upload_fileobj(
+            fileobj,
+            self.bucket_name,
+            s3_key,
+            ExtraArgs = {'ContentType': self.content_type(s3_key)},
+            Config = self.transfer_config
         )
 
-        s3_url = f"https://{self.bucket_name}.s3.{settings.AWS_REGION}.amazonaws.com/{s3_key}"
-        print(f"[SUCCESS] File uploaded to S3: {s3_url}")
+        s3_url = self.get_url(s3_key)
+        logger.debug("Uploaded receipt", extra={'user_id': user_id, 's3_key': s3_key})
         return s3_url
 
 s3_service = S3Service()
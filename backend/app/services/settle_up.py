@@ -0,0 +1,87 @@
+"""
+Settle-Up Planner
+=================
+Turns a group's debts into the shortest list of payments that clears them.
+
+Example:
+    Alice owes Bob $10 and Bob owes Carol $10.
+    Paying each debt separately takes 2 transfers; the plan is just
+    "Alice pays Carol $10".
+
+How it works (greedy min-cash-flow):
+1. Net everyone's debts into one balance each (+ is owed, - owes)
+2. Put creditors and debtors in two max-heaps
+3. Repeatedly match the biggest debtor with the biggest creditor, pay the
+   smaller of the two amounts, and push whoever isn't settled back in
+
+Each step settles at least one person, so a group of n people needs at
+most n - 1 transfers, and the whole plan costs O(n log n).
+
+All arithmetic is Decimal, so cents never drift. This module has no AWS
+or settings dependencies - it's pure computation.
+"""
+
+import heapq
+from decimal import Decimal
+
+ZERO = Decimal('0')
+
+
+def net_balances(debts):
+    """
+    Collapse individual debts into one net balance per person
+
+    Args:
+        debts: Iterable of (creditor, debtor, amount) tuples
+
+    Returns:
+        dict: {email: Decimal} - positive means owed money, negative means owes
+    """
+    balances = {}
+
+    for creditor, debtor, amount in debts:
+        balances[creditor] = balances.get(creditor, ZERO) + amount
+        balances[debtor] = balances.get(debtor, ZERO) - amount
+
+    return balances
+
+
+def plan_transfers(balances):
+    """
+    Find a short list of payments that brings every balance to zero
+
+    Args:
+        balances (dict): {email: Decimal} net balances - must sum to zero
+
+    Returns:
+        list: [{'from': debtor, 'to': creditor, 'amount': Decimal}, ...]
+
+    Raises:
+        ValueError: If the balances don't sum to zero
+    """
+    if sum(balances.values(), ZERO) != ZERO:
+        raise ValueError("Balances must sum to zero")
+
+    # heapq is a min-heap, so amounts are stored negated to pop the largest
+    # first. The email breaks ties so plans are deterministic.
+    creditors = [(-amount, email) for email, amount in balances.items() if amount > ZERO]
+    debtors = [(amount, email) for email, amount in balances.items() if amount < ZERO]
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+
+    transfers = []
+
+    while creditors and debtors:
+        credit, creditor = heapq.heappop(creditors)
+        debt, debtor = heapq.heappop(debtors)
+
+        # Both are stored negative: -credit is owed, -debt is owing
+        payment = min(-credit, -debt)
+        transfers.append({'from': debtor, 'to': creditor, 'amount': payment})
+
+        if -credit > payment:
+            heapq.heappush(creditors, (credit + payment, creditor))
+        if -debt > payment:
+            heapq.heappush(debtors, (debt + payment, debtor))
+
+    return transfers
@@ -1,18 +1,89 @@
 
-from typing import Dict, List, Optional
+import logging
+import re
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
 from app.config import settings
-import boto3
+from app.services import aws_clients
+
+logger = logging.getLogger(__name__)
+
+# Pages of results per GetExpenseAnalysis call (the API maximum)
+TEXTRACT_PAGE_SIZE = 20
+
+# Summary field types we read, in order of preference
+MERCHANT_TYPES = ['VENDOR_NAME', 'MERCHANT_NAME']
+TOTAL_TYPES = ['TOTAL', 'AMOUNT_PAID']
+DATE_TYPES = ['INVOICE_RECEIPT_DATE', 'DATE']
+AMOUNT_TYPES = {*TOTAL_TYPES, 'TAX', 'TIP', 'SUBTOTAL'}
+WANTED_SUMMARY_TYPES = {*MERCHANT_TYPES, *DATE_TYPES, *AMOUNT_TYPES}
+
+# Line item name field types, in order of preference
+ITEM_NAME_TYPES = ['ITEM', 'DESCRIPTION', 'PRODUCT_CODE']
+
+# Compiled once - these run for every field of every receipt
+PLAIN_NUMBER_PATTERN = re.compile(r'-?\d+(\.\d+)?')  # Most values: "12.99"
+NUMBER_PATTERN = re.compile(r'\d[\d,.]*|\.\d+')  # 1,234.50 or .99
+MINUS_BEFORE_PATTERN = re.compile(r'(-|\()[$€£¥]?$')  # -5.00, -$5.00, $-5.00, (5.00)
+COMMA_THOUSANDS_PATTERN = re.compile(r'\d{1,3}(,\d{3})+')  # 1,234,567
+DOT_THOUSANDS_PATTERN = re.compile(r'\d{1,3}(\.\d{3})+')  # 1.234.567
+
+
+def parse_amount(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a currency string from a receipt
+
+    "$45.99" -> 45.99, "1,234.50" -> 1234.5, "1.234,50" -> 1234.5,
+    "$.50" -> 0.5, "-$5.00" / "5.00-" / "(5.00)" -> -5.0,
+    "2 @ 3.99" -> 3.99 (last number), "Coke - 2.50" -> 2.5
+
+    Returns:
+        float or None: None if there's no number in the string
+    """
+    if not value:
+        return None
+
+    if PLAIN_NUMBER_PATTERN.fullmatch(value):
+        return float(value)
+
+    match = None
+    for match in NUMBER_PATTERN.finditer(value):
+        pass
+    if match is None:
+        return None
+
+    number = match.group().rstrip('.,')
+
+    if ',' in number and '.' in number:
+        # Whichever separator comes last is the decimal point
+        if number.rfind(',') > number.rfind('.'):
+            number = number.replace('.', '').replace(',', '.')
+        else:
+            number = number.replace(',', '')
+    elif ',' in number:
+        # 1,234 is thousands; 12,50 is a decimal comma
+        number = number.replace(',', '') if COMMA_THOUSANDS_PATTERN.fullmatch(number) else number.replace(',', '.')
+    elif number.count('.') > 1 and DOT_THOUSANDS_PATTERN.fullmatch(number):
+        number = number.replace('.', '')
+
+    try:
+        amount = float(number)
+    except ValueError:
+        return None
+
+    # The sign must touch the number: "Coke - 2.50" is a name and a price
+    negative = MINUS_BEFORE_PATTERN.search(value, 0, match.start()) or value.startswith('-', match.end())
+    return -amount if negative else amount
+
 
 class TextractService:
 
     def __init__(self):
-        print("Initializing TextractService with AWS Textract")
-        self.textract_client = boto3.client(
+        self.textract_client = aws_clients.get_client(
             'textract',
-            region_name=settings.AWS_REGION,
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
+            read_timeout=settings.TEXTRACT_READ_TIMEOUT
         )
+        logger.info("Textract service ready")
 
 
     
@@ -21,11 +92,59 @@ class TextractService:
         """
         Analyzes a receipt image stored in an S3 bucket using Amazon Textract and returns the extracted information.
         """
-        print(f"Calling AWS Textract for: s3://{s3_bucket}/{s3_key}")
+        logger.debug("Calling Textract AnalyzeExpense", extra={'s3_key': s3_key})
+
+        return self._analyze({
+            'S3Object': {
+                'Bucket': s3_bucket,
+                'Name': s3_key
+            }
+        })
+
+    def analyze_receipt_bytes(self, file_bytes: bytes) -> Dict:
+
+        """
+        Analyzes a receipt image sent inline with the request, so Textract
+        doesn't have to wait for the image to land in S3 first.
+        """
+        logger.debug("Calling Textract AnalyzeExpense", extra={'bytes': len(file_bytes)})
+
+        return self._analyze({'Bytes': file_bytes})
+
+    def _analyze(self, document: Dict) -> Dict:
+
+        """
+        Runs AnalyzeExpense on an S3Object or Bytes document. Never raises -
+        failures come back as a receipt with confidence 'error'.
+        """
+        try:
+            response = self.textract_client.analyze_expense(Document = document)
+
+            # Parse the response
+            parsed_data = self._parse_expense_response(response)
+            return parsed_data
+        
+        except Exception as e:
+            logger.warning("Textract AnalyzeExpense failed: %s", e)
+            return self._error_receipt(e)
+
+    def analyze_document_async(self, s3_bucket: str, s3_key: str) -> Dict:
+
+        """
+        Analyzes a multi-page PDF (hotel folio, long invoice) stored in S3.
+        AnalyzeExpense only reads single pages, so this starts an
+        asynchronous StartExpenseAnalysis job, waits for it, and parses the
+        results one GetExpenseAnalysis page at a time. Never raises.
+
+        Blocks the calling thread for as long as the job runs (up to
+        TEXTRACT_ASYNC_TIMEOUT_SECONDS) - receipt_jobs runs PDFs on their
+        own workers, so they never hold up photos.
+        """
+        logger.debug("Starting Textract expense analysis", extra={'s3_key': s3_key})
 
         try:
-            response = self.textract_client.analyze_expense(
-                Document = {
+            job = self.textract_client.start_expense_analysis(
+                DocumentLocation = {
                     'S3Object': {
                         'Bucket': s3_bucket,
                         'Name': s3_key
@@ -33,27 +152,45 @@ class TextractService:
                 }
             )
 
-            print("[SUCCESS] Textract response received!")
+            return self._parse_expense_pages(self._iter_expense_analysis(job['JobId']))
 
-            # Parse the response
-            parsed_data = self._parse_expense_response(response)
-            return parsed_data
-        
         except Exception as e:
-            print(f"Error analyzing receipt: {e}")
-
-            # Return default values in case of an error
-            return {
-                'merchant': 'Unknown',
-                'total': 0.0,
-                'date': None,
-                'items': [],
-                'tax': 0.0,
-                'tip': 0.0,
-                'subtotal': 0.0,
-                'confidence': 'error',
-                'error': str(e)
-            }
+            logger.warning("Textract expense analysis failed: %s", e, extra={'s3_key': s3_key})
+            return self._error_receipt(e)
+
+    def _iter_expense_analysis(self, job_id: str) -> Iterator[Dict]:
+
+        """
+        Wait for an expense analysis job, then yield each page of its results
+        (following NextToken), so only one page is in memory at a time
+        """
+        delay = settings.TEXTRACT_POLL_INITIAL_SECONDS
+        deadline = time.monotonic() + settings.TEXTRACT_ASYNC_TIMEOUT_SECONDS
+
+        while True:
+            response = self.textract_client.get_expense_analysis(JobId = job_id, MaxResults = TEXTRACT_PAGE_SIZE)
+            status = response.get('JobStatus')
+
+            if status == 'FAILED':
+                raise RuntimeError(f"Textract job failed: {response.get('StatusMessage', 'unknown error')}")
+            if status != 'IN_PROGRESS':
+                break  # SUCCEEDED or PARTIAL_SUCCESS
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Textract job {job_id} still running after {settings.TEXTRACT_ASYNC_TIMEOUT_SECONDS}s")
+
+            time.sleep(delay)
+            delay = min(delay * 2, settings.TEXTRACT_POLL_MAX_SECONDS)
+
+        logger.debug("Textract job finished", extra={'job_id': job_id, 'status': status})
+        yield response
+
+        while response.get('NextToken'):
+            response = self.textract_client.get_expense_analysis(
+                JobId = job_id,
+                MaxResults = TEXTRACT_PAGE_SIZE,
+                NextToken = response['NextToken']
+            )
+            yield response
 
     def _parse_expense_response(self, response: Dict) -> Dict:
 
@@ -61,35 +198,64 @@ class TextractService:
         Parse Textract AnalyzeExpense response
         Textract returns complex nested JSON - we extract what we need
         """
-        print("Parsing Textract response...")
+        return self._parse_expense_pages([response])
 
-        expense_documents = response.get('ExpenseDocuments', [])
+    def _parse_expense_pages(self, responses: Iterable[Dict]) -> Dict:
 
-        if not expense_documents:
-            print("[WARNING] No expense documents found in response")
-            return self._empty_receipt()
-        
+        """
+        Parse one or more AnalyzeExpense/GetExpenseAnalysis responses into
+        one receipt. Every document on every page is read, in order, and
+        line items are appended as they come.
 
-        # Get the first document's summary fields and line items
-        summary_fields = expense_documents[0].get('SummaryFields', [])
-        line_items = expense_documents[0].get('LineItemGroups', [])
+        Summary fields, for multi-page folios and invoices:
+        - merchant and date: the first page that has them (the letterhead)
+        - total, subtotal, tax and tip: taken together from the last page
+          that shows a total. Earlier pages' figures are running balances
+          and carried-forward subtotals, and mixing them with the final
+          total would make the derived subtotal wrong. Until a page with
+          a total turns up, later values replace earlier ones.
 
-        # Extract all key fields
-        merchant = self._extract_field(summary_fields, ['VENDOR_NAME', 'MERCHANT_NAME'])
-        total = self._extract_amount(summary_fields, ['TOTAL', 'AMOUNT_PAID'])
-        date = self._extract_field(summary_fields, ['INVOICE_RECEIPT_DATE', 'DATE'])
-        tax = self._extract_amount(summary_fields, ['TAX'])
-        tip = self._extract_amount(summary_fields, ['TIP'])
-        subtotal = self._extract_amount(summary_fields, ['SUBTOTAL'])
+        Pages are consumed as they come - pass a generator to stream.
+        """
+        summary = {}
+        amounts = {}
+        items = []
+        documents = 0
+
+        for response in responses:
+            for document in response.get('ExpenseDocuments', []):
+                documents += 1
+                for fields in self._index_summary_fields(document.get('SummaryFields', [])):
+                    for field_type, value in fields.items():
+                        if field_type not in AMOUNT_TYPES:
+                            summary.setdefault(field_type, value)
+
+                    page_amounts = {field_type: value for field_type, value in fields.items() if field_type in AMOUNT_TYPES}
+                    if self._first(page_amounts, TOTAL_TYPES):
+                        amounts = page_amounts
+                    elif not self._first(amounts, TOTAL_TYPES):
+                        amounts.update(page_amounts)
+                items.extend(self._extract_line_items(document.get('LineItemGroups', [])))
 
-        # Extract line items
-        items = self._extract_line_items(line_items)
+        summary.update(amounts)
+
+        if not documents:
+            logger.warning("No expense documents in Textract response")
+            return self._empty_receipt()
+
+        # Extract all key fields (first listed type that's present wins)
+        merchant = self._first(summary, MERCHANT_TYPES)
+        total = parse_amount(self._first(summary, TOTAL_TYPES))
+        date = self._first(summary, DATE_TYPES)
+        tax = parse_amount(summary.get('TAX'))
+        tip = parse_amount(summary.get('TIP'))
+        subtotal = parse_amount(summary.get('SUBTOTAL'))
 
         # Calculate subtotal if not provided
         if not subtotal and total:
             subtotal = total - (tax or 0) - (tip or 0)
 
-        print(f"[EXTRACTED] merchant={merchant}, total={total}, items={len(items)}, tax={tax}, tip={tip}")
+        logger.debug("Parsed receipt", extra={'merchant': merchant, 'total': total, 'items': len(items)})
 
         return {
             'merchant': merchant or 'Unknown Merchant',
@@ -101,60 +267,61 @@ class TextractService:
             'subtotal': float(subtotal or 0),
             'confidence': 'high'
         }
-    
-    def _extract_field(self, fields: List[Dict], field_types: List[str]) -> Optional[str]:
+
+    def _index_summary_fields(self, fields: List[Dict]) -> List[Dict[str, str]]:
         """
-        Extracts a field value from the Textract response based on the provided keys.
+        One pass over SummaryFields, grouped by page:
+        [{field type: first non-empty value on that page}, ...] in page order
+        Replaces scanning the whole list once per field we look up.
         """
+        pages = {}
+
         for field in fields:
             field_type = field.get('Type', {}).get('Text', '')
-            if field_type in field_types:
-                value = field.get('ValueDetection', {}).get('Text')
-                if value:
-                    return value.strip()
-        
-        return None
-    
-    def _extract_amount(self, fields: List, field_types: List[str]) -> Optional[float]:
-        """Extract currency amount from Textract response"""
-        value = self._extract_field(fields, field_types)
-
-        if value:
-            # Clean currency string: "$45.99" -> 45.99
-            import re
-            cleaned = re.sub(r'[^\d.]', '', value)
-            try:
-                return float(cleaned)
-            except ValueError:
-                return None
+            if field_type in WANTED_SUMMARY_TYPES:
+                index = pages.setdefault(field.get('PageNumber', 1), {})
+                if field_type not in index:
+                    value = field.get('ValueDetection', {}).get('Text')
+                    if value and value.strip():
+                        index[field_type] = value.strip()
+
+        return [pages[page] for page in sorted(pages)]
+
+    def _first(self, index: Dict[str, str], field_types: List[str]) -> Optional[str]:
+        """Value of the first of `field_types` present in the index"""
+        for field_type in field_types:
+            if field_type in index:
+                return index[field_type]
         return None
 
     def _extract_line_items(self, line_item_groups: List) -> List[Dict]:
         """
         Extract individual items from receipt
         Returns: [{'name': 'Burger', 'price': 15.99}, ...]
+        Discounts come through with negative prices.
         """
         items = []
 
         for group in line_item_groups:
             for line_item in group.get('LineItems', []):
-                item_name = None
-                item_price = None
+                names = {}
+                price_text = row_text = None
 
                 for field in line_item.get('LineItemExpenseFields', []):
                     field_type = field.get('Type', {}).get('Text', '')
-                    value = field.get('ValueDetection', {}).get('Text', '')
-
-                    if field_type in ['ITEM', 'PRODUCT_CODE', 'DESCRIPTION']:
-                        item_name = value.strip()
-                    elif field_type in ['PRICE', 'EXPENSE_ROW']:
-                        # Extract price
-                        import re
-                        cleaned = re.sub(r'[^\d.]', '', value)
-                        try:
-                            item_price = float(cleaned)
-                        except ValueError:
-                            pass
+                    if field_type == 'PRICE':
+                        price_text = field.get('ValueDetection', {}).get('Text')
+                    elif field_type == 'EXPENSE_ROW':
+                        row_text = field.get('ValueDetection', {}).get('Text')
+                    elif field_type in ITEM_NAME_TYPES:
+                        names[field_type] = field.get('ValueDetection', {}).get('Text', '')
+
+                item_name = next((names[t].strip() for t in ITEM_NAME_TYPES if names.get(t, '').strip()), None)
+
+                # PRICE is the clean column; the whole row is the fallback
+                item_price = parse_amount(price_text)
+                if item_price is None:
+                    item_price = parse_amount(row_text)
 
                 if item_name and item_price:
                     items.append({
@@ -165,6 +332,20 @@ class TextractService:
         return items
     
 
+    def _error_receipt(self, error: Exception) -> Dict:
+        """Return default values in case of an error"""
+        return {
+            'merchant': 'Unknown',
+            'total': 0.0,
+            'date': None,
+            'items': [],
+            'tax': 0.0,
+            'tip': 0.0,
+            'subtotal': 0.0,
+            'confidence': 'error',
+            'error': str(error)
+        }
+
     def _empty_receipt(self) -> Dict:
         """Return a default receipt with no information"""
         return {
@@ -0,0 +1,108 @@
+"""
+Streaming Uploads
+=================
+Copies an upload out of the request into a bounded buffer one chunk at a
+time.
+
+Why?
+- `await file.read()` copies the whole file into a bytes object. Ten
+  people uploading 10MB photos at once meant 100MB sitting on the heap.
+- Reading in chunks keeps memory bounded, checks the per-type size limit
+  (photos vs PDFs) and hashes the file on the way through (for the
+  receipt cache).
+- The copy goes into a SpooledTemporaryFile: small files stay in memory,
+  anything bigger than RECEIPT_SPOOL_MEMORY_BYTES spills to a temp file.
+  Peak memory per upload is about one chunk plus the spool threshold.
+  Writes past the threshold touch the disk, so they run on a thread
+  instead of the event loop.
+
+This is not where oversized requests are stopped: by the time a route
+runs, Starlette has already received the whole multipart body and
+spooled each file. RequestSizeLimitMiddleware (app/middleware/
+request_size.py) turns those away before they're read.
+
+The copy is needed (rather than handing over the UploadFile itself)
+because Starlette closes the request's files when the response is sent,
+and background jobs outlive the request.
+
+Usage:
+    from app.services.upload_stream import spool_upload, UploadTooLargeError
+
+    try:
+        upload = await spool_upload(file, max_bytes=settings.RECEIPT_MAX_UPLOAD_BYTES)
+    except UploadTooLargeError:
+        ...
+
+    upload.file    # Rewound file object (the consumer closes it)
+    upload.size    # Bytes received
+    upload.digest  # SHA-256 hex digest
+"""
+
+import hashlib
+import tempfile
+from dataclasses import dataclass
+from typing import IO
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+
+
+class UploadTooLargeError(Exception):
+    """The upload is over its size limit"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        super().__init__(f"Upload exceeds {max_bytes} bytes")
+
+
+@dataclass
+class SpooledUpload:
+    file: IO[bytes]
+    size: int
+    digest: str
+
+
+async def spool_upload(upload, max_bytes=None, chunk_size=None, memory_bytes=None) -> SpooledUpload:
+    """
+    Copy an UploadFile into a spooled buffer, enforcing the size limit
+
+    Args:
+        upload: FastAPI UploadFile (anything with an async read(size))
+        max_bytes: Largest allowed upload (default: RECEIPT_MAX_UPLOAD_BYTES)
+        chunk_size: Bytes read per step (default: RECEIPT_UPLOAD_CHUNK_BYTES)
+        memory_bytes: Spill to disk past this (default: RECEIPT_SPOOL_MEMORY_BYTES)
+
+    Returns:
+        SpooledUpload: The rewound buffer, its size and SHA-256
+
+    Raises:
+        UploadTooLargeError: If the file is bigger than max_bytes
+    """
+    max_bytes = max_bytes or settings.RECEIPT_MAX_UPLOAD_BYTES
+    chunk_size = chunk_size or settings.RECEIPT_UPLOAD_CHUNK_BYTES
+    memory_bytes = memory_bytes or settings.RECEIPT_SPOOL_MEMORY_BYTES
+
+    spooled = tempfile.SpooledTemporaryFile(max_size=memory_bytes)
+    sha256 = hashlib.sha256()
+    size = 0
+
+    try:
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeError(max_bytes)
+
+            sha256.update(chunk)
+            if size > memory_bytes:
+                await run_in_threadpool(spooled.write, chunk)  # Spilling to (or already on) disk
+            else:
+                spooled.write(chunk)
+    except BaseException:
+        spooled.close()
+        raise
+
+    spooled.seek(0)
+    return SpooledUpload(file=spooled, size=size, digest=sha256.hexdigest())
@@ -0,0 +1,77 @@
+"""
+Participant Index Backfill Script
+=================================
+Indexes expenses that were created before the participant index table existed.
+
+Run once after `python setup_dynamodb.py` has created the index table:
+    python backfill_participant_index.py
+
+What this does:
+1. Scans the expenses table page by page (following LastEvaluatedKey)
+2. Writes one index item per creator/participant for every expense
+3. Adds attributes older expenses don't have yet: the `participant_emails`
+   list that status updates and deletes check in their DynamoDB
+   conditions, and the `item_count` shown by summary list views
+
+It's safe to run more than once - index items are keyed by
+(email, sort_key), so re-running just overwrites the same items.
+"""
+
+from app.config import settings
+from app.services import dynamodb_service
+
+
+def backfill():
+    """Write participant index items for every existing expense"""
+
+    table = dynamodb_service.get_table()
+    expenses_indexed = 0
+    index_items_written = 0
+
+    for expenses, _ in dynamodb_service.iter_pages(table.scan):
+        for expense in expenses:
+            dynamodb_service.index_expense_participants(expense)
+            expenses_indexed += 1
+            index_items_written += len(dynamodb_service.participant_index_items(expense))
+
+            if 'participant_emails' not in expense or 'item_count' not in expense:
+                derived = dynamodb_service.derived_attributes(expense)
+                table.update_item(
+                    Key={'id': expense['id']},
+                    UpdateExpression='SET participant_emails = :emails, item_count = :item_count',
+                    ExpressionAttributeValues={
+                        ':emails': derived['participant_emails'],
+                        ':item_count': derived['item_count']
+                    }
+                )
+
+        print(f"   ...{expenses_indexed} expenses indexed so far")
+
+    return expenses_indexed, index_items_written
+
+
+def main():
+    print("=" * 60)
+    print("🔁 Participant Index Backfill")
+    print("=" * 60)
+    print(f"Expenses Table: {settings.DYNAMODB_TABLE_EXPENSES}")
+    print(f"Index Table:    {settings.DYNAMODB_TABLE_EXPENSE_PARTICIPANTS}")
+    print()
+
+    try:
+        expenses_indexed, index_items_written = backfill()
+
+        print("\n" + "=" * 60)
+        print(f"✅ Indexed {expenses_indexed} expenses ({index_items_written} index items)")
+        print("=" * 60)
+
+    except Exception as e:
+        print(f"\n❌ Backfill Failed: {e}")
+        print("\n🔧 Troubleshooting:")
+        print("1. Run 'python setup_dynamodb.py' first to create the index table")
+        print("2. Check AWS credentials in backend/.env")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Response Compression Benchmark
+==============================
+Compresses realistic response bodies at several gzip levels and brotli
+qualities and reports the size, bytes saved and CPU time per response:
+- GET /api/expenses summaries and full expenses (15 receipt items each)
+- a Textract extraction result for a long grocery receipt
+
+Run from the backend directory (no AWS needed):
+    python -m benchmarks.bench_compression
+"""
+
+import random
+import time
+from benchmarks import textract_fixtures
+from benchmarks.bench_json_encoding import dynamodb_expense
+from app.middleware.compression import BrotliCompressor, GzipCompressor
+from app.models.expense import Expense, ExpenseSummary
+from app.responses import dumps
+from app.services.textract import textract_service
+
+REPEATS = 10
+
+SETTINGS = [
+    ('gzip 1', lambda: GzipCompressor(1)),
+    ('gzip 6', lambda: GzipCompressor(6)),
+    ('gzip 9', lambda: GzipCompressor(9)),
+    ('br 1', lambda: BrotliCompressor(1)),
+    ('br 4', lambda: BrotliCompressor(4)),
+    ('br 6', lambda: BrotliCompressor(6)),
+    ('br 11', lambda: BrotliCompressor(11)),
+]
+
+
+def payloads():
+    """Response bodies as the API sends them"""
+    rng = random.Random(42)
+    expenses = [dynamodb_expense(index, rng) for index in range(100)]
+
+    receipt = textract_service._parse_expense_response(textract_fixtures.grocery_receipt())
+
+    return [
+        ('100 summaries', dumps([ExpenseSummary.model_validate(expense) for expense in expenses])),
+        ('100 full expenses', dumps([Expense.model_validate(expense) for expense in expenses])),
+        ('grocery extraction', dumps(receipt)),
+    ]
+
+
+def best_ms(make_compressor, body):
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        compressed = make_compressor().finish(body)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000, compressed
+
+
+def main():
+    print("=" * 72)
+    print("RESPONSE COMPRESSION BENCHMARK")
+    print("=" * 72)
+
+    for name, body in payloads():
+        print(f"{name}: {len(body) / 1024:.1f} KB uncompressed")
+        print(f"{'setting':>10} {'KB':>9} {'ratio':>7} {'saved':>7} {'ms':>8} {'MB/s':>8}")
+        print("-" * 72)
+
+        for setting, make_compressor in SETTINGS:
+            ms, compressed = best_ms(make_compressor, body)
+            print(
+                f"{setting:>10} {len(compressed) / 1024:>9.1f} {len(body) / len(compressed):>6.1f}x "
+                f"{1 - len(compressed) / len(body):>7.0%} {ms:>8.2f} {len(body) / 1024 / 1024 / (ms / 1000):>8.0f}"
+            )
+        print()
+
+    print("=" * 72)
+    print("Defaults: brotli quality 4 (COMPRESSION_BROTLI_QUALITY), gzip level 6 (COMPRESSION_GZIP_LEVEL)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Expense Codec Benchmark
+=======================
+Times converting one expense to and from a DynamoDB item as its receipt
+grows from 10 to 2,000 line items:
+- write: expense_codec.encode() vs the recursive convert_floats_to_decimal
+  it replaced
+- read:  expense_codec.decode() vs FastAPI's generic jsonable_encoder
+
+Run from the backend directory (no AWS needed):
+    python -m benchmarks.bench_expense_codec
+"""
+
+import copy
+import random
+import time
+from decimal import Decimal
+from fastapi.encoders import jsonable_encoder
+from app.services.expense_codec import expense_codec
+
+ITEM_COUNTS = [10, 100, 500, 2000]
+PARTICIPANTS = 6
+REPEATS = 20
+
+
+def convert_floats_to_decimal(obj):
+    """The recursive converter from routes/expenses.py, kept for comparison"""
+    if isinstance(obj, list):
+        return [convert_floats_to_decimal(item) for item in obj]
+    elif isinstance(obj, dict):
+        return {key: convert_floats_to_decimal(value) for key, value in obj.items()}
+    elif isinstance(obj, float):
+        return Decimal(str(obj))
+    else:
+        return obj
+
+
+def api_expense(item_count, rng):
+    """An expense as build_expense_data assembles it (floats)"""
+    return {
+        'id': 'expense-1',
+        'user_id': 'bench@example.com',
+        'created_by_name': 'Bench',
+        'description': 'Costco run',
+        'total_amount': round(rng.uniform(50, 900), 2),
+        'participants': [
+            {'email': f"friend{n}@example.com", 'name': f"Friend {n}", 'amount': round(rng.uniform(5, 150), 2)}
+            for n in range(PARTICIPANTS)
+        ],
+        'receipt_url': 'https://bucket.s3.amazonaws.com/receipts/bench/receipt.jpg',
+        'created_at': '2024-01-01T12:00:00',
+        'status': 'pending',
+        'items': [{'name': f"Item {n}", 'price': round(rng.uniform(0.5, 40), 2)} for n in range(item_count)],
+        'tax': 8.25,
+        'tip': 0.0,
+        'subtotal': round(rng.uniform(50, 900), 2),
+    }
+
+
+def best_ms(function, make_input):
+    """Fastest of REPEATS runs; inputs are prepared outside the timing"""
+    timings = []
+    for _ in range(REPEATS):
+        value = make_input()
+        started = time.perf_counter()
+        function(value)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    rng = random.Random(42)
+
+    print("=" * 78)
+    print("EXPENSE CODEC BENCHMARK (one expense, growing receipt)")
+    print("=" * 78)
+    print(f"{'items':>7} {'old write':>10} {'encode':>9} {'speedup':>8} {'old read':>10} {'decode':>9} {'speedup':>8}")
+    print("-" * 78)
+
+    for item_count in ITEM_COUNTS:
+        expense = api_expense(item_count, rng)
+        item = expense_codec.encode(copy.deepcopy(expense))
+
+        # Same stored numbers (to the cent) and the same floats back out
+        old_item = convert_floats_to_decimal(expense)
+        assert all(
+            new['price'] == old['price'].quantize(Decimal('0.01'))
+            for new, old in zip(item['items'], old_item['items'])
+        )
+        assert expense_codec.decode(item)['items'] == expense['items']
+
+        old_write = best_ms(convert_floats_to_decimal, lambda: expense)
+        new_write = best_ms(expense_codec.encode, lambda: copy.deepcopy(expense))
+        old_read = best_ms(jsonable_encoder, lambda: item)
+        new_read = best_ms(expense_codec.decode, lambda: item)
+
+        print(
+            f"{item_count:>7} {old_write:>9.3f}ms {new_write:>7.3f}ms {old_write / new_write:>7.1f}x "
+            f"{old_read:>9.3f}ms {new_read:>7.3f}ms {old_read / new_read:>7.1f}x"
+        )
+
+    print("=" * 78)
+    print("encode quantizes money to the cent; decode copies, so cached items are never mutated")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+JSON Encoding Benchmark
+=======================
+Times rendering a GET /api/expenses response for 10 to 1,000 expenses:
+the old path (model_validate + jsonable_encoder + JSONResponse) against
+the orjson one (model_validate + FastJSONResponse). Items look like
+DynamoDB rows - amounts are Decimal - and full expenses carry 15 receipt
+line items each.
+
+Run from the backend directory (no AWS needed):
+    python -m benchmarks.bench_json_encoding
+"""
+
+import json
+import random
+import time
+from decimal import Decimal
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.models.expense import Expense, ExpenseSummary
+from app.responses import FastJSONResponse
+
+LIST_SIZES = [10, 100, 1000]
+PARTICIPANTS = 4
+ITEMS = 15
+REPEATS = 5
+
+
+def money(rng):
+    return Decimal(rng.randint(100, 20000)) / 100
+
+
+def dynamodb_expense(index, rng):
+    """An expense as DynamoDB returns it (numbers are Decimal)"""
+    participants = [
+        {'email': f"friend{n}@example.com", 'name': f"Friend {n}", 'amount': money(rng)}
+        for n in range(PARTICIPANTS)
+    ]
+    return {
+        'id': f"expense-{index}",
+        'user_id': 'bench@example.com',
+        'created_by_name': 'Bench',
+        'description': f"Dinner #{index}",
+        'total_amount': money(rng),
+        'participants': participants,
+        'participant_emails': [participant['email'] for participant in participants],
+        'receipt_url': f"https://bucket.s3.amazonaws.com/receipts/bench/{index}.jpg",
+        'items': [{'name': f"Item {n}", 'price': money(rng)} for n in range(ITEMS)],
+        'item_count': ITEMS,
+        'tax': Decimal('4.20'),
+        'tip': Decimal('10'),
+        'subtotal': money(rng),
+        'created_at': '2024-01-01T12:00:00',
+        'status': 'pending',
+    }
+
+
+def old_render(model, expenses):
+    return JSONResponse(content = jsonable_encoder([model.model_validate(expense) for expense in expenses])).body
+
+
+def new_render(model, expenses):
+    return FastJSONResponse(content = [model.model_validate(expense) for expense in expenses]).body
+
+
+def best_ms(render, model, expenses):
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        body = render(model, expenses)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000, body
+
+
+def main():
+    rng = random.Random(42)
+
+    print("=" * 72)
+    print("JSON ENCODING BENCHMARK (GET /api/expenses response)")
+    print("=" * 72)
+    print(f"{'view':>8} {'items':>7} {'KB':>8} {'old ms':>9} {'orjson ms':>10} {'speedup':>8}")
+    print("-" * 72)
+
+    for size in LIST_SIZES:
+        expenses = [dynamodb_expense(index, rng) for index in range(size)]
+
+        for view, model in (('summary', ExpenseSummary), ('full', Expense)):
+            old_ms, old_body = best_ms(old_render, model, expenses)
+            new_ms, new_body = best_ms(new_render, model, expenses)
+
+            # Same JSON either way, just produced faster
+            assert json.loads(old_body) == json.loads(new_body)
+
+            print(
+                f"{view:>8} {size:>7} {len(new_body) / 1024:>8.1f} "
+                f"{old_ms:>9.2f} {new_ms:>10.2f} {old_ms / new_ms:>7.1f}x"
+            )
+
+    print("=" * 72)
+    print("old    = model_validate + jsonable_encoder + JSONResponse (json.dumps)")
+    print("orjson = model_validate + FastJSONResponse (models dumped once by orjson)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Receipt Upload Load Benchmark
+=============================
+Fires concurrent POST /api/receipts/upload requests at the app in-process
+with Textract and S3 in replay mode, and reports throughput and tail
+latency. Nothing talks to AWS.
+
+Fixtures come from AWS_FIXTURES_DIR (record real ones with
+record_textract_fixtures.py). If none are recorded yet, generated
+responses from benchmarks/textract_fixtures.py are written to a
+temporary directory and used instead.
+
+Replay latency and error rate come from the REPLAY_* settings, so runs
+can be shaped from the environment:
+    REPLAY_TEXTRACT_LATENCY_MS=800 REPLAY_ERROR_RATE=0.05 python -m benchmarks.bench_receipt_load
+
+Needs httpx (pip install httpx) for the in-process HTTP client.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+os.environ['AWS_CLIENT_MODE'] = 'replay'  # Must be set before the clients are built
+os.environ.setdefault('REPLAY_TEXTRACT_LATENCY_MS', '300')  # Shorter than real so a run takes seconds
+os.environ.setdefault('REPLAY_SEED', '42')
+
+import httpx
+from app.config import settings
+from benchmarks import textract_fixtures
+
+REQUESTS = 100
+CONCURRENCY = [4, 16, 64]
+IMAGE_BYTES = 300 * 1024  # A preprocessed phone photo
+
+
+def ensure_fixtures():
+    """Use recorded fixtures if there are any, otherwise generate a few"""
+    recorded = Path(settings.AWS_FIXTURES_DIR) / 'textract' / 'analyze_expense'
+    if any(recorded.glob('*.json')):
+        return f"{len(list(recorded.glob('*.json')))} recorded"
+
+    settings.AWS_FIXTURES_DIR = tempfile.mkdtemp(prefix='receipt-fixtures-')
+    directory = Path(settings.AWS_FIXTURES_DIR) / 'textract' / 'analyze_expense'
+    directory.mkdir(parents=True)
+    for index, response in enumerate([
+        textract_fixtures.restaurant_receipt(),
+        textract_fixtures.grocery_receipt(),
+        textract_fixtures.analyze_expense_response(pages=2, items_per_page=60, seed=7),
+    ]):
+        (directory / f"generated-{index}.json").write_text(json.dumps(response))
+    return "3 generated"
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+async def run_load(client, concurrency, rng):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one_upload(index):
+        nonlocal errors
+        # Unique bytes per request so the receipt cache can't short-circuit
+        image = rng.randbytes(IMAGE_BYTES)
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/receipts/upload",
+                params = {"wait": "true"},  # Time the whole receipt, not just the 202
+                files = {"file": (f"receipt{index}.jpg", image, "image/jpeg")}
+            )
+            latencies.append(time.perf_counter() - started)
+        if response.status_code != 200 or response.json().get('confidence') == 'error':
+            errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_upload(index) for index in range(REQUESTS)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return elapsed, latencies, errors
+
+
+async def main():
+    fixtures = ensure_fixtures()
+
+    # Imported only now: the replay clients are built on import and read
+    # AWS_FIXTURES_DIR then
+    from app.main import app
+    from app.middleware.auth import get_current_user
+    from app.services.receipt_cache import receipt_cache
+
+    logging.getLogger('app').setLevel(logging.ERROR)  # The pipeline logs every receipt (and replayed failures)
+    settings.RECEIPT_PREPROCESS_ENABLED = False  # Random bytes aren't an image
+    receipt_cache.enabled = False
+
+    async def benchmark_user():
+        return {'email': 'bench@example.com', 'name': 'Bench'}
+    app.dependency_overrides[get_current_user] = benchmark_user
+
+    rng = random.Random(42)
+    rows = []
+    transport = httpx.ASGITransport(app = app)
+    async with httpx.AsyncClient(transport = transport, base_url = "http://bench", timeout = None) as client:
+        for concurrency in CONCURRENCY:
+            rows.append((concurrency, *await run_load(client, concurrency, rng)))
+
+    print("=" * 78)
+    print("RECEIPT UPLOAD LOAD BENCHMARK (replay mode)")
+    print("=" * 78)
+    print(f"fixtures: {fixtures}, Textract {settings.REPLAY_TEXTRACT_LATENCY_MS:.0f}ms, "
+          f"S3 {settings.REPLAY_S3_LATENCY_MS:.0f}ms + {settings.REPLAY_S3_MS_PER_MB:.0f}ms/MB, "
+          f"jitter {settings.REPLAY_LATENCY_JITTER:.0%}, errors {settings.REPLAY_ERROR_RATE:.0%}")
+    print(f"{REQUESTS} uploads per run, RECEIPT_WORKERS={settings.RECEIPT_WORKERS}")
+    print(f"{'clients':>8} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    print("-" * 78)
+    for concurrency, elapsed, latencies, errors in rows:
+        print(
+            f"{concurrency:>8} {REQUESTS / elapsed:>8.1f} "
+            f"{percentile(latencies, 0.50) * 1000:>9.0f} {percentile(latencies, 0.95) * 1000:>9.0f} "
+            f"{percentile(latencies, 0.99) * 1000:>9.0f} {latencies[-1] * 1000:>9.0f} {errors:>7}"
+        )
+    print("=" * 78)
+    print("Latency includes queueing for a receipt worker - raise RECEIPT_WORKERS to trade it for throughput")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
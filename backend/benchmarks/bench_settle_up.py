@@ -0,0 +1,90 @@
+"""
+Settle-Up Planner Benchmark
+===========================
+Times plan_transfers() on random groups of 10 to 10,000 members and
+compares its plan size with paying every pairwise debt separately.
+
+Run from the backend directory (no AWS or .env needed):
+    python -m benchmarks.bench_settle_up
+"""
+
+import random
+import time
+from decimal import Decimal
+from app.services import settle_up
+
+GROUP_SIZES = [10, 100, 1000, 10000]
+EXPENSES_PER_MEMBER = 5
+MAX_PARTICIPANTS = 6
+REPEATS = 5
+
+
+def random_debts(members, rng):
+    """Simulate expenses: one payer, a few participants each owing a share in cents"""
+    debts = []
+
+    for _ in range(len(members) * EXPENSES_PER_MEMBER):
+        payer = rng.choice(members)
+        participants = rng.sample(members, min(len(members), rng.randint(2, MAX_PARTICIPANTS)))
+        for participant in participants:
+            if participant != payer:
+                debts.append((payer, participant, Decimal(rng.randint(100, 20000)) / 100))
+
+    return debts
+
+
+def pairwise_transfer_count(debts):
+    """How many payments it takes if each pair settles between themselves"""
+    pair_totals = {}
+
+    for creditor, debtor, amount in debts:
+        pair = tuple(sorted((creditor, debtor)))
+        sign = 1 if pair[0] == creditor else -1
+        pair_totals[pair] = pair_totals.get(pair, Decimal('0')) + amount * sign
+
+    return sum(1 for total in pair_totals.values() if total)
+
+
+def main():
+    rng = random.Random(42)
+
+    print("=" * 72)
+    print("SETTLE-UP PLANNER BENCHMARK")
+    print("=" * 72)
+    print(f"{'members':>8} {'debts':>9} {'pairwise':>10} {'planned':>9} {'net ms':>9} {'plan ms':>9}")
+    print("-" * 72)
+
+    for size in GROUP_SIZES:
+        members = [f"member{i}@example.com" for i in range(size)]
+        debts = random_debts(members, rng)
+
+        net_times = []
+        plan_times = []
+        for _ in range(REPEATS):
+            started = time.perf_counter()
+            balances = settle_up.net_balances(debts)
+            net_times.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            transfers = settle_up.plan_transfers(balances)
+            plan_times.append(time.perf_counter() - started)
+
+        # Sanity check: applying the plan clears every balance exactly
+        remaining = dict(balances)
+        for transfer in transfers:
+            remaining[transfer['from']] += transfer['amount']
+            remaining[transfer['to']] -= transfer['amount']
+        assert all(amount == 0 for amount in remaining.values())
+
+        print(
+            f"{size:>8} {len(debts):>9} {pairwise_transfer_count(debts):>10} {len(transfers):>9} "
+            f"{min(net_times) * 1000:>9.2f} {min(plan_times) * 1000:>9.2f}"
+        )
+
+    print("=" * 72)
+    print("pairwise = payments if every pair settles separately")
+    print("planned  = payments in the settle-up plan (at most members - 1)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Textract Parser Benchmark
+=========================
+Times TextractService._parse_expense_response() on generated
+AnalyzeExpense responses, from a 10-item restaurant bill up to a
+4,000-item multi-page grocery receipt, next to the parser it replaced
+(one SummaryFields scan per lookup, regex rebuilt per field).
+
+Checks parse_amount() against AMOUNT_CASES first, and fails if any
+receipt amount is misread.
+
+Run from the backend directory (no AWS needed):
+    python -m benchmarks.bench_textract_parser
+"""
+
+import re
+import time
+from benchmarks import textract_fixtures
+from app.services.textract import parse_amount, textract_service
+
+REPEATS = 5
+
+FIXTURES = [
+    ('restaurant', textract_fixtures.restaurant_receipt()),
+    ('grocery', textract_fixtures.grocery_receipt()),
+    ('multi-page x5', textract_fixtures.multi_page_grocery(pages=5)),
+    ('multi-page x20', textract_fixtures.multi_page_grocery(pages=20)),
+]
+
+# Receipt amounts the parser must read exactly (checked before timing)
+AMOUNT_CASES = [
+    ('12.99', 12.99),
+    ('$45.99', 45.99),
+    ('.99', 0.99),
+    ('$.50', 0.5),
+    ('-.50', -0.5),
+    ('1,234.50', 1234.5),
+    ('1.234,50', 1234.5),
+    ('1.234.567', 1234567.0),
+    ('12,50', 12.5),
+    ('-$5.00', -5.0),
+    ('$-5.00', -5.0),
+    ('5.00-', -5.0),
+    ('(5.00)', -5.0),
+    ('2 @ 3.99', 3.99),
+    ('2 @ .99', 0.99),
+    ('Coke - 2.50', 2.5),
+    ('FREE', None),
+    ('', None),
+]
+
+
+class PreviousParser:
+    """The parser before the single-pass rewrite, kept for comparison"""
+
+    def parse(self, response):
+        document = response['ExpenseDocuments'][0]
+        fields = document.get('SummaryFields', [])
+        return {
+            'merchant': self._extract_field(fields, ['VENDOR_NAME', 'MERCHANT_NAME']),
+            'total': self._extract_amount(fields, ['TOTAL', 'AMOUNT_PAID']),
+            'date': self._extract_field(fields, ['INVOICE_RECEIPT_DATE', 'DATE']),
+            'tax': self._extract_amount(fields, ['TAX']),
+            'tip': self._extract_amount(fields, ['TIP']),
+            'subtotal': self._extract_amount(fields, ['SUBTOTAL']),
+            'items': self._extract_line_items(document.get('LineItemGroups', [])),
+        }
+
+    def _extract_field(self, fields, field_types):
+        for field in fields:
+            if field.get('Type', {}).get('Text', '') in field_types:
+                value = field.get('ValueDetection', {}).get('Text')
+                if value:
+                    return value.strip()
+        return None
+
+    def _extract_amount(self, fields, field_types):
+        value = self._extract_field(fields, field_types)
+        if value:
+            try:
+                return float(re.sub(r'[^\d.]', '', value))
+            except ValueError:
+                return None
+        return None
+
+    def _extract_line_items(self, groups):
+        items = []
+        for group in groups:
+            for line_item in group.get('LineItems', []):
+                name = price = None
+                for field in line_item.get('LineItemExpenseFields', []):
+                    field_type = field.get('Type', {}).get('Text', '')
+                    value = field.get('ValueDetection', {}).get('Text', '')
+                    if field_type in ['ITEM', 'PRODUCT_CODE', 'DESCRIPTION']:
+                        name = value.strip()
+                    elif field_type in ['PRICE', 'EXPENSE_ROW']:
+                        try:
+                            price = float(re.sub(r'[^\d.]', '', value))
+                        except ValueError:
+                            pass
+                if name and price:
+                    items.append({'name': name, 'price': price})
+        return items
+
+
+def best_time(function, response):
+    times = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        result = function(response)
+        times.append(time.perf_counter() - started)
+    return min(times), result
+
+
+def check_amounts():
+    for text, expected in AMOUNT_CASES:
+        assert parse_amount(text) == expected, f"parse_amount({text!r}) = {parse_amount(text)!r}, expected {expected!r}"
+
+
+def main():
+    check_amounts()
+    previous = PreviousParser()
+
+    print("=" * 78)
+    print("TEXTRACT PARSER BENCHMARK")
+    print("=" * 78)
+    print(f"{'fixture':<16} {'lines':>7} {'parsed':>7} {'discounts':>10} "
+          f"{'previous ms':>12} {'current ms':>11} {'speedup':>8}")
+    print("-" * 78)
+
+    for name, response in FIXTURES:
+        lines = sum(len(group['LineItems']) for group in response['ExpenseDocuments'][0]['LineItemGroups'])
+
+        previous_time, previous_result = best_time(previous.parse, response)
+        current_time, current_result = best_time(textract_service._parse_expense_response, response)
+
+        # The rewrite keeps discounts and reads thousands separators correctly
+        discounts = sum(1 for item in current_result['items'] if item['price'] < 0)
+        expected_total = float(response['ExpenseDocuments'][0]['SummaryFields'][5]['ValueDetection']['Text']
+                               .lstrip('$').replace(',', ''))
+        assert current_result['total'] == expected_total
+        assert len(current_result['items']) == lines
+
+        print(
+            f"{name:<16} {lines:>7} {len(current_result['items']):>7} {discounts:>10} "
+            f"{previous_time * 1000:>12.2f} {current_time * 1000:>11.2f} "
+            f"{previous_time / current_time:>7.1f}x"
+        )
+        misread = sum(
+            1 for old, new in zip(previous_result['items'], current_result['items']) if old['price'] != new['price']
+        )
+        if misread:
+            print(f"{'':<16} previous parser misread {misread} prices (quantity digits glued on, minus signs dropped)")
+
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Textract Response Fixtures
+==========================
+Builds AnalyzeExpense responses shaped like the real thing (summary
+fields, line item groups, confidences, page numbers), so the parser can
+be benchmarked without calling AWS.
+
+Sizes:
+    restaurant_receipt()       - 1 page, ~10 items
+    grocery_receipt()          - 1 page, ~150 items
+    multi_page_grocery(pages)  - a huge itemised receipt split over pages
+"""
+
+import random
+
+MERCHANTS = ['Trader Joe\'s', 'Whole Foods Market', 'Costco Wholesale', 'Sakura Sushi Bar']
+PRODUCTS = [
+    'ORGANIC BANANAS', 'WHOLE MILK 1GAL', 'SOURDOUGH LOAF', 'AVOCADO HASS', 'CHEDDAR SHARP',
+    'GREEK YOGURT', 'OLIVE OIL XV', 'BASMATI RICE 5LB', 'CHICKEN THIGHS', 'SPARKLING WATER',
+]
+
+
+def _field(field_type, text, page=1):
+    return {
+        'Type': {'Text': field_type, 'Confidence': 99.1},
+        'LabelDetection': {'Text': field_type.title(), 'Confidence': 93.4},
+        'ValueDetection': {'Text': text, 'Confidence': 97.8},
+        'PageNumber': page,
+    }
+
+
+def _line_item(name, price, page, rng):
+    quantity = rng.randint(1, 4)
+    return {
+        'LineItemExpenseFields': [
+            _field('ITEM', name, page),
+            _field('QUANTITY', str(quantity), page),
+            _field('PRICE', f"{price:,.2f}", page),
+            _field('EXPENSE_ROW', f"{quantity} {name} {price:,.2f}", page),
+        ]
+    }
+
+
+def analyze_expense_response(pages=1, items_per_page=10, seed=42):
+    """
+    Build an AnalyzeExpense response
+
+    Every 15th line is a discount ("-1.50"), and prices over 1,000 get a
+    thousands separator, so the fast paths and the edge cases both run.
+    """
+    rng = random.Random(seed)
+    groups = []
+    total = 0.0
+
+    for page in range(1, pages + 1):
+        line_items = []
+        for index in range(items_per_page):
+            if index % 15 == 14:
+                price = -round(rng.uniform(0.5, 5), 2)
+                line_items.append(_line_item('COUPON SAVINGS', price, page, rng))
+            else:
+                price = round(rng.uniform(0.99, 1500 if index % 50 == 0 else 25), 2)
+                line_items.append(_line_item(rng.choice(PRODUCTS), price, page, rng))
+            total += price
+
+        groups.append({'GroupIndex': page, 'LineItems': line_items})
+
+    tax = round(total * 0.08, 2)
+    summary = [
+        _field('VENDOR_NAME', rng.choice(MERCHANTS)),
+        _field('ADDRESS', '123 Main St, Springfield'),
+        _field('INVOICE_RECEIPT_DATE', '03/14/2025'),
+        _field('SUBTOTAL', f"${total:,.2f}", pages),
+        _field('TAX', f"${tax:,.2f}", pages),
+        _field('TOTAL', f"${total + tax:,.2f}", pages),
+        _field('AMOUNT_PAID', f"${total + tax:,.2f}", pages),
+    ]
+
+    return {
+        'DocumentMetadata': {'Pages': pages},
+        'ExpenseDocuments': [{
+            'ExpenseIndex': 1,
+            'SummaryFields': summary,
+            'LineItemGroups': groups,
+        }]
+    }
+
+
+def restaurant_receipt():
+    return analyze_expense_response(pages=1, items_per_page=10)
+
+
+def grocery_receipt():
+    return analyze_expense_response(pages=1, items_per_page=150)
+
+
+def multi_page_grocery(pages=20):
+    return analyze_expense_response(pages=pages, items_per_page=200)
@@ -0,0 +1,47 @@
+"""
+Balance Ledger Rebuild Script
+=============================
+Recomputes the "who owes whom" ledger from the expenses table.
+
+Run it once after `python setup_dynamodb.py` creates the balances table,
+or any time the ledger looks wrong:
+    python rebuild_balances.py
+
+What this does:
+1. Reads every expense page by page
+2. Sums each participant's share of every pending expense
+3. Overwrites the balances table with those totals (and removes stale pairs)
+
+Run it while nobody is using the app - expense changes made during the
+rebuild can be overwritten.
+"""
+
+from app.config import settings
+from app.services import balance_ledger, dynamodb_service
+
+
+def main():
+    print("=" * 60)
+    print("🧮 Balance Ledger Rebuild")
+    print("=" * 60)
+    print(f"Expenses Table: {settings.DYNAMODB_TABLE_EXPENSES}")
+    print(f"Balances Table: {settings.DYNAMODB_TABLE_BALANCES}")
+    print()
+
+    try:
+        pairs_written, pairs_removed = balance_ledger.rebuild(dynamodb_service.iter_all_expenses())
+
+        print("\n" + "=" * 60)
+        print(f"✅ Wrote {pairs_written} balances, removed {pairs_removed} stale ones")
+        print("=" * 60)
+
+    except Exception as e:
+        print(f"\n❌ Rebuild Failed: {e}")
+        print("\n🔧 Troubleshooting:")
+        print("1. Run 'python setup_dynamodb.py' first to create the balances table")
+        print("2. Check AWS credentials in backend/.env")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Record Textract Fixtures
+========================
+Runs real receipt images through Textract AnalyzeExpense once and saves
+the responses as replay fixtures (see app/services/aws_replay.py).
+PDFs are uploaded to S3 and read with the asynchronous expense analysis,
+whose result pages are saved the same way.
+
+Needs AWS credentials in .env. Afterwards, AWS_CLIENT_MODE=replay serves
+these responses without calling AWS.
+
+Usage (from the backend directory):
+    python record_textract_fixtures.py path/to/receipt1.jpg path/to/receipt2.png path/to/folio.pdf ...
+"""
+
+import os
+import sys
+
+os.environ['AWS_CLIENT_MODE'] = 'record'  # Must be set before the clients are built
+
+from app.config import settings
+from app.services.s3 import s3_service
+from app.services.textract import textract_service
+
+
+def main(paths):
+    print("=" * 60)
+    print("Recording Textract fixtures")
+    print("=" * 60)
+
+    if not paths:
+        print("❌ Pass one or more receipt images to record")
+        sys.exit(1)
+
+    for path in paths:
+        with open(path, 'rb') as receipt:
+            if path.lower().endswith('.pdf'):
+                s3_url = s3_service.upload_fileobj(receipt, os.path.basename(path), 'fixtures')
+                result = textract_service.analyze_document_async(settings.S3_BUCKET_NAME, s3_service.key_from_url(s3_url))
+            else:
+                result = textract_service.analyze_receipt_bytes(receipt.read())
+
+        if result.get('confidence') == 'error':
+            print(f"❌ {path}: {result['error']}")
+        else:
+            print(f"✅ {path}: {result['merchant']}, total {result['total']}, {len(result['items'])} items")
+
+    print("=" * 60)
+    print(f"Fixtures saved under {settings.AWS_FIXTURES_DIR}/textract/")
+    print("Replay them with AWS_CLIENT_MODE=replay")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
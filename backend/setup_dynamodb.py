@@ -10,6 +10,8 @@ What this does:
 1. Connects to AWS using credentials from .env
 2. Creates an 'expenses' table with proper structure
 3. Sets up an index for querying expenses by user
+4. Creates an 'expense_participants' table (who is involved in which expense)
+5. Creates a 'balances' table (running "who owes whom" totals)
 
 Learning Goals:
 - Understand DynamoDB table structure
@@ -118,6 +120,157 @@ def create_expenses_table():
         print(f"❌ Error: {e}")
         raise
 
+def create_participants_table():
+    """
+    Create the participant index table in DynamoDB
+
+    Table Structure:
+    ----------------
+    Partition Key: email (creator or participant)
+    Sort Key: sort_key ("<created_at>#<expense id>")
+
+    Why a separate table?
+    - participants is a list inside each expense, and DynamoDB indexes
+      can't key on list elements
+    - One small item per (person, expense) lets us query "everything
+      this user is involved in" without scanning the expenses table
+    """
+
+    dynamodb = boto3.resource(
+        'dynamodb',
+        region_name=settings.AWS_REGION,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
+    )
+
+    table_name = settings.DYNAMODB_TABLE_EXPENSE_PARTICIPANTS
+
+    try:
+        existing_tables = [table.name for table in dynamodb.tables.all()]
+        if table_name in existing_tables:
+            print(f"✅ Table '{table_name}' already exists!")
+            return dynamodb.Table(table_name)
+
+        print(f"📝 Creating table '{table_name}'...")
+
+        table = dynamodb.create_table(
+            TableName=table_name,
+            KeySchema=[
+                {
+                    'AttributeName': 'email',
+                    'KeyType': 'HASH'   # One partition per user
+                },
+                {
+                    'AttributeName': 'sort_key',
+                    'KeyType': 'RANGE'  # Expenses sorted by creation time
+                }
+            ],
+            AttributeDefinitions=[
+                {
+                    'AttributeName': 'email',
+                    'AttributeType': 'S'
+                },
+                {
+                    'AttributeName': 'sort_key',
+                    'AttributeType': 'S'
+                }
+            ],
+            BillingMode='PAY_PER_REQUEST',
+        )
+
+        print("⏳ Waiting for table to be created...")
+        table.meta.client.get_waiter('table_exists').wait(TableName=table_name)
+
+        print(f"✅ Table '{table_name}' created successfully!")
+        print("   Run 'python backfill_participant_index.py' to index existing expenses")
+        return table
+
+    except ClientError as e:
+        print(f"❌ Error: {e}")
+        raise
+
+def create_balances_table():
+    """
+    Create the balance ledger table in DynamoDB
+
+    Table Structure:
+    ----------------
+    Partition Key: creditor (who is owed)
+    Sort Key: debtor (who owes)
+    Index: debtor-index (to find everything a user owes)
+    """
+
+    dynamodb = boto3.resource(
+        'dynamodb',
+        region_name=settings.AWS_REGION,
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
+    )
+
+    table_name = settings.DYNAMODB_TABLE_BALANCES
+
+    try:
+        existing_tables = [table.name for table in dynamodb.tables.all()]
+        if table_name in existing_tables:
+            print(f"✅ Table '{table_name}' already exists!")
+            return dynamodb.Table(table_name)
+
+        print(f"📝 Creating table '{table_name}'...")
+
+        table = dynamodb.create_table(
+            TableName=table_name,
+            KeySchema=[
+                {
+                    'AttributeName': 'creditor',
+                    'KeyType': 'HASH'
+                },
+                {
+                    'AttributeName': 'debtor',
+                    'KeyType': 'RANGE'
+                }
+            ],
+            AttributeDefinitions=[
+                {
+                    'AttributeName': 'creditor',
+                    'AttributeType': 'S'
+                },
+                {
+                    'AttributeName': 'debtor',
+                    'AttributeType': 'S'
+                }
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    'IndexName': 'debtor-index',
+                    'KeySchema': [
+                        {
+                            'AttributeName': 'debtor',
+                            'KeyType': 'HASH'   # Query by who owes
+                        },
+                        {
+                            'AttributeName': 'creditor',
+                            'KeyType': 'RANGE'
+                        }
+                    ],
+                    'Projection': {
+                        'ProjectionType': 'ALL'
+                    }
+                }
+            ],
+            BillingMode='PAY_PER_REQUEST',
+        )
+
+        print("⏳ Waiting for table to be created...")
+        table.meta.client.get_waiter('table_exists').wait(TableName=table_name)
+
+        print(f"✅ Table '{table_name}' created successfully!")
+        print("   Run 'python rebuild_balances.py' to fill it from existing expenses")
+        return table
+
+    except ClientError as e:
+        print(f"❌ Error: {e}")
+        raise
+
 def verify_table(table_name):
     """Show table details to confirm it was created correctly"""
 
@@ -148,14 +301,24 @@ def main():
     print("=" * 60)
     print(f"AWS Region: {settings.AWS_REGION}")
     print(f"Table Name: {settings.DYNAMODB_TABLE_EXPENSES}")
+    print(f"Participant Index Table: {settings.DYNAMODB_TABLE_EXPENSE_PARTICIPANTS}")
+    print(f"Balances Table: {settings.DYNAMODB_TABLE_BALANCES}")
     print()
 
     try:
         # Create the table
         table = create_expenses_table()
 
+        # Create the participant index table
+        create_participants_table()
+
+        # Create the balance ledger table
+        create_balances_table()
+
         # Show what was created
         verify_table(settings.DYNAMODB_TABLE_EXPENSES)
+        verify_table(settings.DYNAMODB_TABLE_EXPENSE_PARTICIPANTS)
+        verify_table(settings.DYNAMODB_TABLE_BALANCES)
 
         print("\n" + "=" * 60)
         print("✅ Setup Complete!")
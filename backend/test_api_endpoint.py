@@ -46,6 +46,7 @@ headers = {
 
 upload_response = requests.post(
     f"{BASE_URL}/api/receipts/upload",
+    params={'wait': 'true'},
     files=files,
     headers=headers
 )
@@ -3,8 +3,27 @@ import { Card, CardContent } from "@/components/ui/card";
 import { Check, SendIcon, Trash2Icon, ChevronDown, ChevronUp } from "lucide-react";
 import { useState } from "react";
 
-const ExpenseCard = ( { location, status, date, paidBy, totalAmount, perPersonAmount, participants, items, tax, tip, subtotal, isCreator, onDelete, onSendReminder, onMarkPaid, onMarkSettled } ) => {
+const ExpenseCard = ( { location, status, date, paidBy, totalAmount, perPersonAmount, participants, items, tax, tip, subtotal, isCreator, onDelete, onSendReminder, onMarkPaid, onMarkSettled, onExpand } ) => {
     const [isExpanded, setIsExpanded] = useState(false);
+    const [loadingDetails, setLoadingDetails] = useState(false);
+
+    const hasDetails = items || tax !== undefined || tip !== undefined;
+
+    // Receipt details aren't in the list - onExpand fetches them the first time
+    const toggleExpanded = async () => {
+        if (isExpanded || hasDetails || !onExpand) {
+            setIsExpanded(!isExpanded);
+            return;
+        }
+
+        setIsExpanded(true);
+        setLoadingDetails(true);
+        try {
+            await onExpand();
+        } finally {
+            setLoadingDetails(false);
+        }
+    };
 
     // Determine status badge display
     const getStatusBadge = () => {
@@ -56,9 +75,9 @@ const ExpenseCard = ( { location, status, date, paidBy, totalAmount, perPersonAm
                     <span className = "text-2xl font-bold text-foreground"> Total: {totalAmount} </span>
                     <div className="flex items-center gap-3">
                         <p className = "text-sm text-muted-foreground"> Per Person: {perPersonAmount} </p>
-                        {(items || tax !== undefined || tip !== undefined) && (
+                        {(hasDetails || onExpand) && (
                             <button
-                                onClick={() => setIsExpanded(!isExpanded)}
+                                onClick={toggleExpanded}
                                 className="p-1 hover:bg-gray-100 dark:hover:bg-gray-800 rounded transition-colors"
                             >
                                 {isExpanded ? (
@@ -71,8 +90,12 @@ const ExpenseCard = ( { location, status, date, paidBy, totalAmount, perPersonAm
                     </div>
                 </div>
 
+                {isExpanded && loadingDetails && (
+                    <p className="mt-4 text-sm text-muted-foreground"> Loading receipt details... </p>
+                )}
+
                 {/* Expandable Details Section */}
-                {isExpanded && (items || tax !== undefined || tip !== undefined) && (
+                {isExpanded && hasDetails && (
                     <div className="mt-4 p-4 bg-gray-50 dark:bg-gray-800 rounded-lg border border-gray-200 dark:border-gray-700">
                         <h4 className="font-semibold text-sm mb-3 text-gray-900 dark:text-gray-100">Receipt Details</h4>
 
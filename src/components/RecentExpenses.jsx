@@ -102,6 +102,18 @@ const RecentExpenses = forwardRef(({ onExpenseDeleted }, ref) => {
         }
     }
 
+    // The list only has summaries - fetch the receipt details when a card is expanded
+    const handleExpand = async (expenseId) => {
+        try {
+            const fullExpense = await expenseAPI.getExpense(expenseId);
+            setExpenses(prevExpenses => prevExpenses.map(exp =>
+                exp.id === expenseId ? { ...exp, ...fullExpense, detailsLoaded: true } : exp
+            ));
+        } catch (error) {
+            alert("Failed to load receipt details: " + error.message);
+        }
+    };
+
     const handleMarkPaid = async (expenseId) => {
         if (!window.confirm("Confirm that you have paid this expense? The creator will be notified.")) {
             return;
@@ -200,6 +212,7 @@ const RecentExpenses = forwardRef(({ onExpenseDeleted }, ref) => {
                         onSendReminder={() => handleSendReminder(expense.id)}
                         onMarkPaid={() => handleMarkPaid(expense.id)}
                         onMarkSettled={() => handleMarkSettled(expense.id)}
+                        onExpand={expense.detailsLoaded ? undefined : () => handleExpand(expense.id)}
                     />
                 )
             })}
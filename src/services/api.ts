@@ -53,9 +53,11 @@ async function apiRequest(endpoint: string, options: RequestInit = {}) {
     },
 
     getAllExpenses: async () => {
+        // Summaries (no receipt line items) - a card fetches its full expense when expanded
         return apiRequest('/expenses/');
     },
 
+    // The whole expense, receipt line items included
     getExpense: async (expenseId: string) => {
         return apiRequest(`/expenses/${expenseId}`);
     },
@@ -74,8 +76,13 @@ async function apiRequest(endpoint: string, options: RequestInit = {}) {
     },
 };
 
+// How often to check on a receipt that's still being processed
+const RECEIPT_POLL_INTERVAL_MS = 1000;
+
 // Receipt API calls (file uploads)
 export const receiptAPI = {
+    // Uploads the receipt, then polls its processing job until the extracted
+    // data is ready - no single request stays open for the S3 upload + OCR
     uploadAndProcess: async (file: File) => {
         const token = localStorage.getItem('token');
 
@@ -97,7 +104,21 @@ export const receiptAPI = {
             throw new Error(error.detail || 'Failed to process receipt');
         }
 
-        return response.json();
+        // 202: processing continues in the background under this job ID
+        const { job_id } = await response.json();
+
+        while (true) {
+            const job = await apiRequest(`/receipts/jobs/${job_id}`);
+
+            if (job.status === 'done') {
+                return job.result;
+            }
+            if (job.status === 'failed') {
+                throw new Error(job.error || 'Failed to process receipt');
+            }
+
+            await new Promise((resolve) => setTimeout(resolve, RECEIPT_POLL_INTERVAL_MS));
+        }
     },
 };
 